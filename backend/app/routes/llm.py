@@ -5,18 +5,35 @@ import asyncio
 import json
 import httpx
 import uuid
+import time
+import heapq
 from fastapi import APIRouter, HTTPException, Response, Depends, Request
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from langgraph.graph import END, StateGraph
 from collections import defaultdict
-from qdrant_client import QdrantClient
 from app.utils.config import (
     OPENAI_API_KEY, OPENAI_BASE_URL,
     QDRANT_HOST, QDRANT_PORT, QDRANT_COLLECTION,
-    IMAGE_BASE_URL, IMAGE_PATH_PREFIX
+    IMAGE_BASE_URL, IMAGE_PATH_PREFIX,
+    RAG_SEARCH_CONCURRENCY, RAG_QUERY_CHUNK_SIZE, RAG_CANDIDATE_LIMIT, RAG_STREAMING_SEARCH,
+    RAG_SPECULATIVE_SEARCH, RAG_SPECULATIVE_TTL,
+    RAG_REQUEST_BUDGET, RAG_KEYWORD_MIN_BUDGET, RAG_DEGRADED_KEYWORD_COUNT, RAG_ANSWER_MIN_BUDGET,
+    RAG_RETRIEVAL_MIN_BUDGET, RAG_FALLBACK_SEARCH_TIMEOUT,
+    RETRIEVAL_MODE, HYBRID_CANDIDATE_LIMIT, KEYWORD_MODEL, ANSWER_MODEL
 )
+from app.utils.features import STOPWORDS, DocumentFeatures, Vocabulary, feature_store, tokenize, build_document_text
+from app.utils.corpus import corpus_store, fetch_payloads
+from app.utils.qdrant import get_qdrant_connection
+from app.utils.concurrency import bounded_gather, gather_within, SpeculativeTasks
+from app.utils.scoring_pool import scoring_executor
+from app.utils.streaming_search import stream_search
+from app.utils.cache import query_result_cache, keyword_cache, answer_cache, cache_stats
+from app.utils.keyword_stream import KeywordStreamParser
+from app.utils.metrics import track_llm_stream, instrument_node, instrument_router
+from app.utils.deadline import new_deadline, remaining_budget, has_budget, upstream_timeout, run_within, iter_within
+from app.utils.hybrid import get_embedding_function, dense_search, fuse_rankings
 from app.database import get_db
 from app.models import Conversation, Message
 from sqlalchemy.orm import Session
@@ -26,6 +43,9 @@ from datetime import datetime
 # Create router 
 router = APIRouter()
 
+# 외부 호출 시간 초과 예외 (마감 시각 초과로 중단된 경우)
+UPSTREAM_TIMEOUTS = (asyncio.TimeoutError, httpx.TimeoutException, openai.APITimeoutError)
+
 # Redis 제거됨 - SSE 방식 사용
 
 # 환경 변수 로딩 확인
@@ -35,88 +55,42 @@ print(f"[Config] Qdrant: {QDRANT_HOST}:{QDRANT_PORT} (컬렉션: {QDRANT_COLLECT
 # 직접 구현한 텍스트 유사도 계산 클래스
 class DirectSimilarityCalculator:
     def __init__(self):
-        self.stopwords = {'은', '는', '이', '가', '을', '를', '에', '에서', '와', '과', '의', '로', '으로', '한', '하는', '하다', '있다', '없다', '그', '그것', '이것', '저것'}
+        self.stopwords = STOPWORDS
         
     def preprocess_text(self, text: str) -> List[str]:
         """텍스트 전처리 및 토큰화"""
-        import re
-        # 특수문자 제거 및 소문자 변환
-        text = re.sub(r'[^가-힣a-zA-Z0-9\s]', ' ', text.lower())
-        # 토큰화
-        tokens = text.split()
-        # 불용어 제거 및 길이 2 이상 토큰만 유지
-        tokens = [token for token in tokens if token not in self.stopwords and len(token) >= 2]
-        return tokens
+        return tokenize(text)
+    
+    def text_features(self, text1: str, text2: str) -> Tuple[DocumentFeatures, DocumentFeatures]:
+        """두 텍스트의 토큰 통계 (호출마다 임시 사전을 써서 전역 사전에 토큰이 쌓이지 않음)"""
+        vocab = Vocabulary()
+        return DocumentFeatures.from_text(text1, vocab), DocumentFeatures.from_text(text2, vocab)
     
     def calculate_jaccard_similarity(self, text1: str, text2: str) -> float:
         """자카드 유사도 계산"""
-        tokens1 = set(self.preprocess_text(text1))
-        tokens2 = set(self.preprocess_text(text2))
-        
-        if not tokens1 and not tokens2:
-            return 1.0
-        if not tokens1 or not tokens2:
-            return 0.0
-            
-        intersection = len(tokens1.intersection(tokens2))
-        union = len(tokens1.union(tokens2))
-        
-        return intersection / union if union > 0 else 0.0
+        features1, features2 = self.text_features(text1, text2)
+        return features1.jaccard(features2)
     
     def calculate_cosine_similarity(self, text1: str, text2: str) -> float:
         """코사인 유사도 계산 (TF 기반)"""
-        tokens1 = self.preprocess_text(text1)
-        tokens2 = self.preprocess_text(text2)
-        
-        # TF 계산
-        tf1 = {}
-        tf2 = {}
-        
-        for token in tokens1:
-            tf1[token] = tf1.get(token, 0) + 1
-        for token in tokens2:
-            tf2[token] = tf2.get(token, 0) + 1
-        
-        # 전체 단어 집합
-        all_tokens = set(tokens1 + tokens2)
-        
-        if not all_tokens:
-            return 1.0
-        
-        # 벡터 생성
-        vector1 = [tf1.get(token, 0) for token in all_tokens]
-        vector2 = [tf2.get(token, 0) for token in all_tokens]
-        
-        # 코사인 유사도 계산
-        dot_product = sum(a * b for a, b in zip(vector1, vector2))
-        magnitude1 = sum(a * a for a in vector1) ** 0.5
-        magnitude2 = sum(b * b for b in vector2) ** 0.5
-        
-        if magnitude1 == 0 or magnitude2 == 0:
-            return 0.0
-            
-        return dot_product / (magnitude1 * magnitude2)
+        features1, features2 = self.text_features(text1, text2)
+        return features1.cosine(features2)
     
     def calculate_combined_similarity(self, text1: str, text2: str) -> float:
-        """자카드와 코사인 유사도를 결합한 최종 유사도"""
-        jaccard_sim = self.calculate_jaccard_similarity(text1, text2)
-        cosine_sim = self.calculate_cosine_similarity(text1, text2)
-        
-        # 가중 평균 (자카드 0.4, 코사인 0.6)
-        combined_sim = (jaccard_sim * 0.4) + (cosine_sim * 0.6)
-        return combined_sim
+        """자카드와 코사인 유사도를 결합한 최종 유사도 (텍스트별 토큰화 1회)"""
+        return self.calculate_feature_similarity(*self.text_features(text1, text2))
+    
+    def calculate_feature_similarity(self, features1: DocumentFeatures, features2: DocumentFeatures) -> float:
+        """미리 계산된 토큰 통계로 결합 유사도 계산 (가중 평균: 자카드 0.4, 코사인 0.6)"""
+        return features1.similarity(features2)
     
     def find_similar_documents(self, query: str, documents: List[dict], top_k: int = 5) -> List[dict]:
         """쿼리와 유사한 문서들을 찾아 반환"""
         results = []
         
         for doc in documents:
-            # 문서 텍스트 추출 (제목 + 내용)document_name
-            doc_title = doc.get('document_name', '')
-            vector_data = doc.get("vector", {})
-            # vector가 dict인지 확인 후 특정 키값만 추출
-            doc_content = vector_data.get("text") if isinstance(vector_data, dict) else None
-            doc_text = f"{doc_title} {doc_content}"
+            # 문서 텍스트 추출 (제목 + 내용)
+            doc_text = build_document_text(doc)
             
             # 유사도 계산
             similarity = self.calculate_combined_similarity(query, doc_text)
@@ -127,99 +101,281 @@ class DirectSimilarityCalculator:
                 'matched_text': doc_text[:200] + '...' if len(doc_text) > 200 else doc_text
             })
         
-        # 유사도 순으로 정렬하여 상위 k개 반환
-        results.sort(key=lambda x: x['similarity'], reverse=True)
-        return results[:top_k]
+        # 전체 정렬 없이 크기 k 힙으로 상위 k개 반환
+        return heapq.nlargest(top_k, results, key=lambda x: x['similarity'])
 
 # 직접 구현한 문서 검색 함수
-async def direct_document_search(question_type: str, limit: int, queries: List[str], 
-                               ip: str, port: int, collection: str) -> List[dict]:
-    """직접 구현한 문서 검색 (유사도 기반)"""
+async def direct_document_search_many(searches: List[Tuple[str, int, List[str]]],
+                                      ip: str, port: int, collection: str) -> List[List[dict]]:
+    """여러 검색 그룹 (질문 유형, 결과 수, 쿼리 목록)의 모든 쿼리를 한 번의 희소 행렬곱으로 검색"""
     try:
-        print(f"[DIRECT_SEARCH] 직접 검색 시작: {len(queries)}개 쿼리")
+        all_queries = [query for _, _, queries in searches for query in queries]
+        print(f"[DIRECT_SEARCH] 직접 검색 시작: {len(searches)}개 그룹, {len(all_queries)}개 쿼리")
         
-        # Qdrant에서 모든 문서 가져오기
-        client = QdrantClient(host=ip, port=port)
+        # 공유 Qdrant 연결 (시작 시 생성, 컬렉션 목록은 백그라운드 갱신)
+        connection = get_qdrant_connection(ip, port)
         
-        # 컬렉션 존재 확인
+        # 컬렉션 존재 확인 (캐시된 목록 사용)
         try:
-            collections = client.get_collections()
-            print(f"[DIRECT_SEARCH] 사용 가능한 컬렉션: {[col.name for col in collections.collections]}")
-            
-            if not collection or collection not in [col.name for col in collections.collections]:
-                print(f"[DIRECT_SEARCH] 컬렉션 '{collection}' 사용 불가")
-                return []
+            if not await connection.has_collection(collection):
+                print(f"[DIRECT_SEARCH] 컬렉션 '{collection}' 사용 불가 (사용 가능: {sorted(connection.collections)})")
+                return [[] for _ in searches]
+            client = await connection.get_client()
                 
         except Exception as e:
             print(f"[DIRECT_SEARCH] Qdrant 연결 오류: {e}")
-            return []
+            return [[] for _ in searches]
+        
+        if not all_queries:
+            print(f"[DIRECT_SEARCH] 검색할 쿼리가 없습니다")
+            return [[] for _ in searches]
+        max_limit = max(limit for _, limit, _ in searches)
         
-        # 모든 문서 가져오기 (스크롤 방식)
-        all_documents = []
+        # 공유 스냅샷 로드 (TTL 만료 또는 포인트 수 변경 시에만 재스크롤)
         try:
-            scroll_result = client.scroll(
-                collection_name=collection,
-                limit=1000,  # 한 번에 가져올 문서 수
-                with_payload=True
-            )
-            
-            for point in scroll_result[0]:
-                if point.payload:
-                    all_documents.append({
-                        'id': point.id,
-                        'payload': point.payload
-                    })
-            
-            print(f"[DIRECT_SEARCH] 총 {len(all_documents)}개 문서 로드")
-            
+            if RAG_STREAMING_SEARCH == "always":
+                snapshot = None
+            elif RAG_STREAMING_SEARCH == "fallback":
+                # 색인이 아직 없으면 백그라운드 구축을 예약하고 이번 요청은 스트리밍으로 처리
+                snapshot = await corpus_store.get_ready(client, collection)
+                if snapshot is None:
+                    corpus_store.schedule_sync(client, collection)
+            else:
+                snapshot = await corpus_store.get(client, collection)
         except Exception as e:
             print(f"[DIRECT_SEARCH] 문서 로드 오류: {e}")
-            return []
-        
-        if not all_documents:
-            print(f"[DIRECT_SEARCH] 검색할 문서가 없습니다")
-            return []
+            return [[] for _ in searches]
         
-        # 유사도 계산기 초기화
-        similarity_calc = DirectSimilarityCalculator()
-        
-        # 각 쿼리에 대해 유사도 계산
-        all_results = []
-        for query in queries:
-            print(f"[DIRECT_SEARCH] 쿼리 처리: {query}")
+        if snapshot is None:
+            # 스크롤 페이지를 받는 대로 점수 계산 (메모리는 페이지 크기 + k 로 제한)
+            query_hits = await stream_search(client, collection, all_queries, max_limit)
+        else:
+            if not len(snapshot):
+                print(f"[DIRECT_SEARCH] 검색할 문서가 없습니다")
+                return [[] for _ in searches]
             
-            # 문서들과 유사도 계산
-            query_results = similarity_calc.find_similar_documents(
-                query=query,
-                documents=[doc['payload'] for doc in all_documents],
-                top_k=limit
-            )
+            # 캐시에 없는 쿼리만 계산 (같은 요청 내 중복 쿼리는 1회)
+            cached_hits = {}
+            for query in all_queries:
+                if query not in cached_hits:
+                    cached_hits[query] = query_result_cache.get(query, collection, max_limit, snapshot.version)
+            missing = [query for query, hits in cached_hits.items() if hits is None]
+            print(f"[DIRECT_SEARCH] 결과 캐시 적중 {len(cached_hits) - len(missing)}/{len(cached_hits)}건")
             
-            # 결과 변환
-            for i, result in enumerate(query_results):
-                all_results.append({
-                    'res_id': all_documents[i]['id'] if i < len(all_documents) else f"doc_{i}",
-                    'res_score': result['similarity'],
-                    'type_question': question_type,
-                    'type_vector': 'direct_similarity',
-                    'res_payload': result['document']
-                })
-        
-        # 유사도 순으로 정렬하여 상위 결과만 반환
-        all_results.sort(key=lambda x: x['res_score'], reverse=True)
-        final_results = all_results[:limit]
+            # 쿼리를 묶음 단위로 나눠 병렬 계산 (이벤트 루프 차단 방지를 위해 스레드/프로세스 풀에서 실행)
+            chunks = [missing[i:i + RAG_QUERY_CHUNK_SIZE] for i in range(0, len(missing), RAG_QUERY_CHUNK_SIZE)]
+            chunk_rankings = await bounded_gather(
+                [scoring_executor.score(snapshot, chunk, max_limit) for chunk in chunks],
+                RAG_SEARCH_CONCURRENCY
+            )
+            rankings = [ranking for rankings in chunk_rankings for ranking in rankings]
+            for query, ranking in zip(missing, rankings):
+                hits = [(*snapshot.get_document(doc_no), similarity) for doc_no, similarity in ranking]
+                query_result_cache.set(query, collection, max_limit, snapshot.version, hits)
+                cached_hits[query] = hits
+            query_hits = [cached_hits[query] for query in all_queries]
         
-        print(f"[DIRECT_SEARCH] 최종 검색 결과: {len(final_results)}건")
-        for i, result in enumerate(final_results[:3]):
-            title = result['res_payload'].get('document_name', '제목없음')
-            score = result['res_score']
-            print(f"[DIRECT_SEARCH]   {i+1}. {title} (유사도: {score:.4f})")
+        grouped_results = []
+        position = 0
+        for question_type, limit, queries in searches:
+            # 결과 변환
+            all_results = []
+            for query, hits in zip(queries, query_hits[position:position + len(queries)]):
+                print(f"[DIRECT_SEARCH] 쿼리 처리: {query}")
+                for doc_id, payload, similarity in hits[:limit]:
+                    all_results.append({
+                        'res_id': doc_id,
+                        'res_score': similarity,
+                        'type_question': question_type,
+                        'type_vector': 'direct_similarity',
+                        'res_payload': payload
+                    })
+            position += len(queries)
+            
+            # 유사도 상위 결과만 힙으로 선택
+            final_results = heapq.nlargest(limit, all_results, key=lambda x: x['res_score'])
+            
+            print(f"[DIRECT_SEARCH] [{question_type}] 최종 검색 결과: {len(final_results)}건")
+            for i, result in enumerate(final_results[:3]):
+                title = result['res_payload'].get('document_name', '제목없음')
+                score = result['res_score']
+                print(f"[DIRECT_SEARCH]   {i+1}. {title} (유사도: {score:.4f})")
+            grouped_results.append(final_results)
         
-        return final_results
+        return grouped_results
         
     except Exception as e:
         print(f"[DIRECT_SEARCH] 검색 오류: {e}")
-        return []
+        return [[] for _ in searches]
+
+async def direct_document_search(question_type: str, limit: int, queries: List[str], 
+                               ip: str, port: int, collection: str) -> List[dict]:
+    """직접 구현한 문서 검색 (유사도 기반)"""
+    results = await direct_document_search_many([(question_type, limit, queries)], ip, port, collection)
+    return results[0]
+
+# 최종 후보 payload 조회 함수
+async def hydrate_candidates(candidates: List[dict], ip: str, port: int, collection: str) -> List[dict]:
+    """축약 payload 로 선정된 최종 후보의 전체 payload 를 ID 로 조회하여 채움"""
+    if not candidates:
+        return candidates
+    try:
+        client = await get_qdrant_connection(ip, port).get_client()
+        full_payloads = await fetch_payloads(client, collection, [candidate['res_id'] for candidate in candidates])
+        for candidate in candidates:
+            if candidate['res_id'] in full_payloads:
+                candidate['res_payload'] = full_payloads[candidate['res_id']]
+        print(f"[HYDRATE] 전체 payload 조회: {len(full_payloads)}/{len(candidates)}건")
+    except Exception as e:
+        print(f"[HYDRATE] payload 조회 오류 (축약 payload 유지): {e}")
+    return candidates
+
+# 후보 유사도 구성 요소 첨부 함수
+async def attach_candidate_features(candidates: List[dict], question: str, collection: str) -> List[dict]:
+    """검색 스냅샷으로 질문-후보 유사도 구성 요소를 계산해 후보에 첨부 (재순위 단계에서 재사용)"""
+    snapshot = corpus_store.snapshots.get(collection)
+    if not candidates or not question or snapshot is None:
+        return candidates
+    try:
+        features = await asyncio.to_thread(
+            snapshot.candidate_features, question, [candidate['res_id'] for candidate in candidates]
+        )
+        for candidate in candidates:
+            if candidate['res_id'] in features:
+                candidate['res_features'] = features[candidate['res_id']]
+        print(f"[FEATURES] 후보 유사도 구성 요소 첨부: {len(features)}/{len(candidates)}건")
+    except Exception as e:
+        print(f"[FEATURES] 후보 유사도 계산 오류 (재순위 단계에서 계산): {e}")
+    return candidates
+
+# 질문/키워드 검색 함수 (노드 간 선행 실행 지원)
+QUESTION_SEARCH_LIMIT = 5
+KEYWORD_SEARCH_LIMIT = 3
+MAX_KEYWORDS = 20
+
+# 앞 노드에서 미리 시작한 검색 (키: (컬렉션, 검색 유형, 쿼리))
+speculative_searches = SpeculativeTasks(ttl=RAG_SPECULATIVE_TTL)
+
+def get_search_function():
+    """검색 모드에 따른 검색 함수 (어휘 검색 또는 하이브리드)"""
+    return hybrid_document_search if RETRIEVAL_MODE == "hybrid" else direct_document_search
+
+def start_question_search(question: str, ip: str, port: int, collection: str):
+    """질문 검색을 백그라운드로 시작 (키워드 LLM 호출과 겹쳐 실행)"""
+    search_documents = get_search_function()
+    speculative_searches.start(
+        (collection, 'question', question),
+        lambda: search_documents('question', QUESTION_SEARCH_LIMIT, [question], ip, port, collection)
+    )
+    print(f"[SPECULATIVE] 질문 검색 선행 시작 (대기 중 {len(speculative_searches)}건)")
+
+def keyword_streaming_enabled() -> bool:
+    """키워드별 선행 검색 사용 여부 (하이브리드는 그룹 단위 융합이라 제외)"""
+    return RAG_SPECULATIVE_SEARCH and RETRIEVAL_MODE != "hybrid"
+
+def keyword_index_ready(collection: str) -> bool:
+    """키워드별 검색이 스크롤 없이 준비된 스냅샷으로 처리되는지 여부"""
+    return RAG_STREAMING_SEARCH != "always" and corpus_store.snapshots.get(collection) is not None
+
+def start_keyword_search(keyword: str, ip: str, port: int, collection: str):
+    """키워드 1개 검색을 백그라운드로 시작 (키워드 스트림이 끝나기 전에 실행)
+
+    준비된 스냅샷이 없으면 키워드마다 컬렉션 전체를 스크롤하게 되므로 시작하지 않는다.
+    이 경우 search_keywords 가 남은 키워드를 모아 한 번의 검색으로 처리한다.
+    """
+    if not keyword_index_ready(collection):
+        return
+    speculative_searches.start(
+        (collection, 'keyword', keyword),
+        lambda: direct_document_search('keyword', KEYWORD_SEARCH_LIMIT, [keyword], ip, port, collection)
+    )
+
+async def search_keywords(keywords: List[str], ip: str, port: int, collection: str) -> List[dict]:
+    """키워드 그룹 검색 (미리 시작한 키워드별 검색을 재사용하고 나머지만 한 번에 검색)
+
+    키워드별 상위 결과를 키워드 순서대로 이어 붙인 뒤 상위 KEYWORD_SEARCH_LIMIT 개를 고르므로
+    키워드 목록 전체를 한 그룹으로 검색한 결과와 같다.
+    """
+    started = {}
+    for keyword in dict.fromkeys(keywords):
+        task = speculative_searches.take((collection, 'keyword', keyword))
+        if task is not None:
+            started[keyword] = task
+    missing = [keyword for keyword in dict.fromkeys(keywords) if keyword not in started]
+    print(f"[SPECULATIVE] 선행 키워드 검색 사용 {len(started)}/{len(started) + len(missing)}건")
+
+    async def search_missing() -> List[List[dict]]:
+        if not missing:
+            return []
+        return await direct_document_search_many(
+            [('keyword', KEYWORD_SEARCH_LIMIT, [keyword]) for keyword in missing], ip, port, collection
+        )
+
+    missing_results, *started_results = await asyncio.gather(search_missing(), *started.values())
+    results_by_keyword = dict(zip(missing, missing_results))
+    results_by_keyword.update(zip(started, started_results))
+    all_results = [item for keyword in keywords for item in results_by_keyword.get(keyword, [])]
+    return heapq.nlargest(KEYWORD_SEARCH_LIMIT, all_results, key=lambda x: x['res_score'])
+
+# 하이브리드 (어휘 + 벡터) 문서 검색 함수
+async def hybrid_document_search(question_type: str, limit: int, queries: List[str],
+                                 ip: str, port: int, collection: str) -> List[dict]:
+    """어휘 검색과 Qdrant 벡터(ANN) 검색 결과를 융합한 문서 검색"""
+    embed = get_embedding_function()
+    if embed is None:
+        print(f"[HYBRID_SEARCH] 임베딩 함수가 설정되지 않아 어휘 검색만 수행")
+        return await direct_document_search(question_type, limit, queries, ip, port, collection)
+    
+    async def search_dense() -> List[List[Any]]:
+        connection = get_qdrant_connection(ip, port)
+        if not await connection.has_collection(collection):
+            return []
+        client = await connection.get_client()
+        return await dense_search(client, collection, queries, HYBRID_CANDIDATE_LIMIT, embed)
+    
+    lexical_results, dense_results = await asyncio.gather(
+        direct_document_search(question_type, HYBRID_CANDIDATE_LIMIT, queries, ip, port, collection),
+        search_dense(),
+        return_exceptions=True
+    )
+    if isinstance(lexical_results, Exception):
+        print(f"[HYBRID_SEARCH] 어휘 검색 오류: {lexical_results}")
+        lexical_results = []
+    if isinstance(dense_results, Exception):
+        print(f"[HYBRID_SEARCH] 벡터 검색 오류: {dense_results}")
+        dense_results = []
+    
+    # 문서별 최고 점수로 순위 목록 구성
+    payloads = {}
+    lexical_scores = {}
+    for item in lexical_results:
+        res_id = item['res_id']
+        lexical_scores[res_id] = max(lexical_scores.get(res_id, 0.0), item['res_score'])
+        payloads.setdefault(res_id, item['res_payload'])
+    dense_scores = {}
+    for hits in dense_results:
+        for hit in hits:
+            dense_scores[hit.id] = max(dense_scores.get(hit.id, float('-inf')), hit.score)
+            payloads.setdefault(hit.id, hit.payload or {})
+    
+    fused = fuse_rankings(
+        sorted(lexical_scores.items(), key=lambda x: x[1], reverse=True),
+        sorted(dense_scores.items(), key=lambda x: x[1], reverse=True),
+        top_k=limit
+    )
+    
+    final_results = [
+        {
+            'res_id': res_id,
+            'res_score': score,
+            'type_question': question_type,
+            'type_vector': 'hybrid',
+            'res_payload': payloads[res_id]
+        }
+        for res_id, score in fused
+    ]
+    print(f"[HYBRID_SEARCH] [{question_type}] 어휘 {len(lexical_scores)}건 + 벡터 {len(dense_scores)}건 → 융합 {len(final_results)}건")
+    return final_results
 
 # 기존 벡터 검색 함수들 제거 - 직접 검색으로 대체
 
@@ -245,6 +401,9 @@ class SearchState(dict):
     candidates_each: List[dict] 
     candidates_total: List[dict] 
     response: List[dict]     # LLM이 생성한 응답
+    deadline: float     # 요청 마감 시각 (time.monotonic 기준, node_rc_init 에서 설정)
+    started_at: float   # 요청 시작 시각 (time.monotonic 기준, node_rc_init 에서 설정)
+    generator_id: str   # SSE 제너레이터 ID (상태에 선언해야 노드 사이에 전달됨)
 
 # SSE 스트리밍을 위한 제너레이터 클래스
 class SSEGenerator:
@@ -294,6 +453,20 @@ async def yield_node_status(generator_id: str, node_name: str, status: str, data
         print(f"[SSE] 오류 상세: {traceback.format_exc()}")
         pass
 
+# SSE 답변 토큰 발행 함수
+async def publish_answer_delta(generator_id: Optional[str], content: Optional[str], index: int):
+    """답변 토큰을 SSE 큐에 answer_delta 이벤트로 전달 (토큰마다 호출되므로 로그 생략)"""
+    if not generator_id or not content:
+        return
+    generator = sse_generators.get(generator_id)
+    if generator and generator.is_active:
+        await generator.send_message({
+            "stage": "D",
+            "status": "answer_delta",
+            "result": {"delta": content, "index": index},
+            "timestamp": asyncio.get_event_loop().time()
+        })
+
 # LangGraph 노드 함수들
 async def node_rc_init(state: SearchState) -> SearchState:
     """초기화 노드"""
@@ -301,6 +474,13 @@ async def node_rc_init(state: SearchState) -> SearchState:
     try: 
         question = state['question']
         generator_id = state.get('generator_id')
+        # 요청 전체 시간 예산 (호출 측이 지정하지 않았으면 여기서 시작)
+        started_at = state.get('started_at') or time.monotonic()
+        deadline = state.get('deadline') or new_deadline()
+        
+        if RAG_SPECULATIVE_SEARCH and question:
+            # 질문 검색은 키워드와 무관하므로 키워드 LLM 호출 동안 미리 실행
+            start_question_search(question, QDRANT_HOST, QDRANT_PORT, QDRANT_COLLECTION)
         
         if generator_id:
             await yield_node_status(
@@ -308,13 +488,8 @@ async def node_rc_init(state: SearchState) -> SearchState:
                 "A",
                 "completed",
                 {
-                    "message": "RAG 검색 완료",
-                    "documents_count": len(candidates_total),
-                    "documents": candidates_total,
-                    "document_titles": [
-                        candidate.get("res_payload", {}).get("document_name", "제목 없음3")
-                        for candidate in candidates_total
-                    ],
+                    "message": "입력 정리 완료",
+                    "question": question,
                 },
             )
         
@@ -324,6 +499,8 @@ async def node_rc_init(state: SearchState) -> SearchState:
             "candidates_each": [],
             "candidates_total": [],
             "response": [],
+            "deadline": deadline,
+            "started_at": started_at,
             "generator_id": generator_id
         }
     except Exception as e:
@@ -349,13 +526,8 @@ async def node_rc_keyword(state: SearchState) -> SearchState:
                 "B",
                 "completed",
                 {
-                    "message": "RAG 검색 완료",
-                    "documents_count": len(candidates_total),
-                    "documents": candidates_total,
-                    "document_titles": [
-                        candidate.get("res_payload", {}).get("document_name", "제목 없음3")
-                        for candidate in candidates_total
-                    ],
+                    "message": "키워드 생성 완료",
+                    "keywords": base_keywords,
                 },
             )
             
@@ -368,72 +540,106 @@ async def node_rc_keyword(state: SearchState) -> SearchState:
                 "generator_id": generator_id
             }
         
-        try:
-            # LLM을 사용하여 키워드 증강 - 새로운 LLM 방식
-            messages = [
-                {"role": "system", "content": "당신은 전문적인 키워드 분석가입니다. 주어진 질문을 분석하여 관련된 전문 키워드들을 생성해주세요. 각 키워드는 쉼표로 구분하고, 최대 15개까지 생성하세요."},
-                {"role": "user", "content": f"다음 질문에 대한 관련 키워드들을 생성해주세요: {question}"}
-            ]
+        # 키워드가 완성되는 즉시 해당 키워드 검색을 시작 (원 질문은 바로 시작)
+        stream_searches = keyword_streaming_enabled()
+        ip, port, collection = QDRANT_HOST, QDRANT_PORT, QDRANT_COLLECTION
+        if stream_searches:
+            start_keyword_search(question, ip, port, collection)
+        
+        # 같은 질문(모델/프롬프트 버전 포함)의 키워드가 캐시에 있으면 LLM 호출 생략
+        llm_keywords = await keyword_cache.get(question)
+        if llm_keywords is not None:
+            print(f"[KEYWORD_CACHE] 캐시 적중 - LLM 호출 생략 (누적 절약 {keyword_cache.saved_seconds:.1f}초)")
+            if stream_searches:
+                for keyword in llm_keywords:
+                    start_keyword_search(keyword, ip, port, collection)
+        elif not has_budget(state, RAG_KEYWORD_MIN_BUDGET):
+            # 남은 시간이 부족하면 키워드 증강을 건너뛰고 원 질문만 사용
+            print(f"[DEADLINE] 남은 시간 {remaining_budget(state):.1f}초 - 키워드 증강 생략")
+            llm_keywords = []
+        else:
+            started_at = time.perf_counter()
+            parser = KeywordStreamParser(exclude=[question], limit=MAX_KEYWORDS - 1)
+            # 검색·답변 단계 몫을 남긴 시간만 키워드 생성에 사용
+            keyword_timeout = upstream_timeout(state, reserve=RAG_RETRIEVAL_MIN_BUDGET + RAG_ANSWER_MIN_BUDGET)
+            timed_out = False
+            try:
+                # LLM을 사용하여 키워드 증강 - 새로운 LLM 방식
+                messages = [
+                    {"role": "system", "content": "당신은 전문적인 키워드 분석가입니다. 주어진 질문을 분석하여 관련된 전문 키워드들을 생성해주세요. 각 키워드는 쉼표로 구분하고, 최대 15개까지 생성하세요."},
+                    {"role": "user", "content": f"다음 질문에 대한 관련 키워드들을 생성해주세요: {question}"}
+                ]
             
-            # httpx 클라이언트 설정
-            httpx_client = httpx.AsyncClient(verify=False, timeout=None)
+                # httpx 클라이언트 설정 (남은 시간 예산을 타임아웃으로 사용, 중단 시에도 연결을 닫음)
+                async with httpx.AsyncClient(verify=False, timeout=keyword_timeout) as httpx_client:
 
-            # print(f"[messages 확인] {messages}")              
+                    # print(f"[messages 확인] {messages}")              
             
-            # AsyncOpenAI 클라이언트 생성
-            client = AsyncOpenAI(
-                api_key=OPENAI_API_KEY,
-                base_url=OPENAI_BASE_URL,
-                http_client=httpx_client,
-                default_headers={
-                    "x-dep-ticket": OPENAI_API_KEY,
-                    "Send-System-Name": "ds2llm",
-                    "User-Id": "c.seunghoon",
-                    "User-Type": "AD_ID",
-                    "Prompt-Msg-Id": str(uuid.uuid4()),
-                    "Completion-Msg-Id": str(uuid.uuid4()),
-                }
-            )
+                    # AsyncOpenAI 클라이언트 생성
+                    client = AsyncOpenAI(
+                        api_key=OPENAI_API_KEY,
+                        base_url=OPENAI_BASE_URL,
+                        http_client=httpx_client,
+                        default_headers={
+                            "x-dep-ticket": OPENAI_API_KEY,
+                            "Send-System-Name": "ds2llm",
+                            "User-Id": "c.seunghoon",
+                            "User-Type": "AD_ID",
+                            "Prompt-Msg-Id": str(uuid.uuid4()),
+                            "Completion-Msg-Id": str(uuid.uuid4()),
+                        }
+                    )
             
-            # 비동기 호출
-            response = await client.chat.completions.create(
-                model="openai/gpt-oss-120b",
-                messages=messages,
-                stream=True,
-            )
-            # 스트림 청크 수신
-            async for chunk in response:
-                if not chunk.choices:
-                    continue
-                delta = chunk.choices[0].delta
-                content = getattr(delta, "content", None)
-                if not content:
-                    continue
+                    # 비동기 호출 (호출 횟수·첫 토큰 시간 기록)
+                    response = track_llm_stream("keyword", client.chat.completions.create(
+                        model=KEYWORD_MODEL,
+                        messages=messages,
+                        stream=True,
+                    ))
+                    # 스트림 청크 수신
+                    async for chunk in iter_within(response, keyword_timeout, "키워드 증강"):
+                        if not chunk.choices:
+                            continue
+                        delta = chunk.choices[0].delta
+                        content = getattr(delta, "content", None)
+                        if not content:
+                            continue
 
-                # 부분 응답 누적
-                full_text_parts.append(content)
+                        # 부분 응답 누적
+                        full_text_parts.append(content)
+                    
+                        # 쉼표가 도착해 완성된 키워드는 바로 검색 시작
+                        for keyword in parser.feed(content):
+                            if stream_searches:
+                                start_keyword_search(keyword, ip, port, collection)
 
-                # 너무 빡빡한 루프 방지
-                await asyncio.sleep(0)
+                        # 너무 빡빡한 루프 방지
+                        await asyncio.sleep(0)
 
-        except Exception as e:
-            print(f"[error] streaming failed: {type(e).__name__}: {e}")
-            full_text_parts = []
+            except UPSTREAM_TIMEOUTS as e:
+                print(f"[DEADLINE] 키워드 증강 시간 초과 - 완성된 키워드 {len(parser.keywords)}개만 사용: {type(e).__name__}")
+                timed_out = True
+            except Exception as e:
+                print(f"[error] streaming failed: {type(e).__name__}: {e}")
+                full_text_parts = []
 
-        # 스트리밍 종료 후 전체 응답 문자열 조립
-        llm_response = "".join(full_text_parts).strip()
+            # 스트리밍 종료 후 마지막 키워드 처리 (실패 시 부분 응답은 버림)
+            if timed_out:
+                # 쉼표로 끝나지 않은 마지막 조각은 잘린 키워드일 수 있어 버리고, 불완전한 결과는 캐시하지 않음
+                llm_keywords = parser.keywords
+            elif full_text_parts:
+                for keyword in parser.finish():
+                    if stream_searches:
+                        start_keyword_search(keyword, ip, port, collection)
+                llm_keywords = parser.keywords
+                # LLM 응답이 있을 때만 캐시 (실패 시 기본 키워드는 저장하지 않음)
+                if llm_keywords:
+                    await keyword_cache.set(question, llm_keywords, time.perf_counter() - started_at)
+            else:
+                llm_keywords = []
 
-        # ⚙️ 키워드 변환 로직 (기존 동일)
-        if not llm_response:
-            augmented_keywords = [question]
-        else:
-            keywords_text = llm_response.strip()
-            # 쉼표 기준 분리 및 정리
-            augmented_keywords = [kw.strip() for kw in keywords_text.split(",") if kw.strip()]
-            # 원 질문 추가
-            augmented_keywords.insert(0, question)
-            # 중복 제거 및 20개 제한
-            augmented_keywords = list(dict.fromkeys(augmented_keywords))[:20]
+        # ⚙️ 키워드 변환 로직 (기존 동일): 원 질문을 맨 앞에 추가, 중복 제거 및 20개 제한
+        augmented_keywords = list(dict.fromkeys([question] + llm_keywords))[:MAX_KEYWORDS]
 
         print(f"[inform]: LLM을 통해 생성된 키워드: {len(augmented_keywords)}개")
         
@@ -444,13 +650,8 @@ async def node_rc_keyword(state: SearchState) -> SearchState:
                 "B",
                 "completed",
                 {
-                    "message": "RAG 검색 완료",
-                    "documents_count": len(candidates_total),
-                    "documents": candidates_total,
-                    "document_titles": [
-                        candidate.get("res_payload", {}).get("document_name", "제목 없음3")
-                        for candidate in candidates_total
-                    ],
+                    "message": "키워드 생성 완료",
+                    "keywords": augmented_keywords,
                 },
             )
         
@@ -475,44 +676,51 @@ async def node_rc_rag(state: SearchState) -> SearchState:
         
         # 직접 검색 수행
         candidates_each = []
+        searches = []
+        pending = []
+        
+        # 검색 모드 선택 (어휘 검색 또는 하이브리드)
+        search_documents = get_search_function()
         
-        # question으로 검색
+        # question으로 검색 (node_rc_init 에서 미리 시작한 검색이 있으면 그 결과를 기다림)
         if state.get('question'):
-            try:
-                question_results = await direct_document_search('question', 5, [state['question']], ip, port, collection)
-                candidates_each.extend(question_results)
-            except Exception as e:
-                print(f"Question 검색 오류: {e}")
+            speculative = speculative_searches.take((collection, 'question', state['question']))
+            if speculative is not None:
+                print(f"[SPECULATIVE] 선행 질문 검색 결과 사용")
+                pending.append(speculative)
+            else:
+                searches.append(('question', QUESTION_SEARCH_LIMIT, [state['question']]))
         
         # keyword로 검색 (문자열 또는 리스트 처리)
         if state.get('keyword'):
-            try:
-                # keyword가 리스트인지 문자열인지 확인
-                if isinstance(state['keyword'], list):
-                    keywords = state['keyword']
+            # keyword가 리스트인지 문자열인지 확인
+            if isinstance(state['keyword'], list):
+                keywords = state['keyword']
+            else:
+                keywords = [state['keyword']]
+            
+            # 빈 문자열이나 None 값 필터링
+            keywords = [k for k in keywords if k and isinstance(k, str) and k.strip()]
+            
+            # 남은 시간이 답변 생성 몫뿐이면 상위 키워드만 검색
+            if len(keywords) > RAG_DEGRADED_KEYWORD_COUNT and not has_budget(state, RAG_KEYWORD_MIN_BUDGET):
+                print(f"[DEADLINE] 남은 시간 부족: 키워드 {len(keywords)}개 중 {RAG_DEGRADED_KEYWORD_COUNT}개만 검색")
+                keywords = keywords[:RAG_DEGRADED_KEYWORD_COUNT]
+            
+            if keywords:
+                if keyword_streaming_enabled():
+                    # node_rc_keyword 스트리밍 중에 시작한 키워드별 검색 결과를 모음
+                    pending.append(search_keywords(keywords, ip, port, collection))
                 else:
-                    keywords = [state['keyword']]
-                
-                # 빈 문자열이나 None 값 필터링
-                keywords = [k for k in keywords if k and isinstance(k, str) and k.strip()]
-                
-                if keywords:
-                    keyword_results = await direct_document_search('keyword', 3, keywords, ip, port, collection)
-                    candidates_each.extend(keyword_results)
-            except Exception as e:
-                print(f"Keyword 검색 오류: {e}")
+                    searches.append(('keyword', KEYWORD_SEARCH_LIMIT, keywords))
         
-        # 검색 결과가 없는 경우 빈 리스트 반환 (하드코딩 제거)
-        if not candidates_each:
-            print("[RAG] 검색 결과가 없습니다.")
-
         # 동적 점수 집계 (하드코딩 제거)
         aggregated_scores = defaultdict(float)
         payloads = {}
         
-        # candidates_each가 비어있지 않은 경우에만 처리
-        if candidates_each:
-            for item in candidates_each:
+        def aggregate(results: List[dict]):
+            candidates_each.extend(results)
+            for item in results:
                 try:
                     res_id = item.get('res_id')
                     score = item.get('res_score', 0.0)
@@ -526,18 +734,52 @@ async def node_rc_rag(state: SearchState) -> SearchState:
                     print(f"개별 결과 처리 오류: {e}")
                     continue
         
-        # 유사도 순으로 정렬하여 상위 결과 선택 (고정 개수 제거)
-        candidates_total = sorted(
-            [{'res_id': res_id, 'res_score': aggregated_scores[res_id], 'res_payload': payloads[res_id]}
-             for res_id in aggregated_scores],
-            key=lambda x: x['res_score'],
-            reverse=True
-        )
+        # 질문 검색과 키워드 검색을 동시에 실행
+        # 마감 시각이 지나면 남은 검색만 취소하고 이미 끝난 검색(선행 검색 포함) 결과로 진행
+        timed_out = 0
+        if searches or pending:
+            try:
+                finished, timed_out = await gather_within(
+                    pending + [search_documents(question_type, limit, queries, ip, port, collection)
+                               for question_type, limit, queries in searches],
+                    RAG_SEARCH_CONCURRENCY,
+                    upstream_timeout(state, reserve=RAG_ANSWER_MIN_BUDGET)
+                )
+                if timed_out:
+                    print(f"[DEADLINE] RAG 검색: 시간 초과로 {timed_out}건 중단, 완료된 {len(finished)}건으로 진행")
+                for results in finished:
+                    aggregate(results)
+            except Exception as e:
+                print(f"RAG 검색 오류: {e}")
+        
+        if timed_out and not aggregated_scores and state.get('question'):
+            # 마감으로 결과가 하나도 없으면 질문 어휘 검색 최상위 1건으로 답변 단계 진행
+            print(f"[DEADLINE] 검색 결과 없음 - 질문 어휘 검색 top-1 으로 대체")
+            aggregate(await run_within(
+                direct_document_search('question', 1, [state['question']], ip, port, collection),
+                RAG_FALLBACK_SEARCH_TIMEOUT, [], "질문 top-1 검색"
+            ))
+        
+        # 검색 결과가 없는 경우 빈 리스트 반환 (하드코딩 제거)
+        if not candidates_each:
+            print("[RAG] 검색 결과가 없습니다.")
+        
+        # 집계 점수 상위 후보만 힙으로 선택 (최대 RAG_CANDIDATE_LIMIT 개)
+        candidates_total = [
+            {'res_id': res_id, 'res_score': score, 'res_payload': payloads[res_id]}
+            for res_id, score in heapq.nlargest(RAG_CANDIDATE_LIMIT, aggregated_scores.items(), key=lambda x: x[1])
+        ]
         
-        # 동적으로 결과 개수 결정 (최소 1개, 최대 10개)
         if candidates_total:
-            max_results = min(len(candidates_total), max(1, min(10, len(candidates_total))))
-            candidates_total = candidates_total[:max_results]
+            # 재순위/답변 단계에 넘길 상위 후보만 전체 payload 조회 (질문-후보 유사도 구성 요소도 함께 계산)
+            # 답변 몫을 남긴 시간 안에 끝나지 않으면 축약 payload 로 진행
+            enrich_timeout = upstream_timeout(state, reserve=RAG_ANSWER_MIN_BUDGET)
+            candidates_total, _ = await asyncio.gather(
+                run_within(hydrate_candidates(candidates_total, ip, port, collection),
+                           enrich_timeout, candidates_total, "후보 payload 조회"),
+                run_within(attach_candidate_features(candidates_total, state.get('question', ''), collection),
+                           enrich_timeout, candidates_total, "후보 유사도 계산")
+            )
         
         print(f"[RAG] 최종 검색 결과 (상위 5건):")
         for i, candidate in enumerate(candidates_total):
@@ -602,21 +844,31 @@ async def node_rc_rerank(state: SearchState) -> SearchState:
         
         # 유사도 기반 동적 재순위 (하드코딩된 0.1 감소 제거)
         similarity_calc = DirectSimilarityCalculator()
-        question = state['question']
         
-        for candidate in candidates_top:
+        # 구성 요소가 없는 후보(스트리밍 검색 등)만 텍스트로 계산: 문서 특징을 먼저 모두 준비
+        doc_features = {}
+        for index, candidate in enumerate(candidates_top):
+            if candidate.get('res_features') is not None:
+                continue
             try:
-                # 문서 텍스트 추출
                 payload = candidate.get('res_payload', {})
-                doc_title = payload.get('document_name', '')
-                vector_data = payload.get("vector", {})
-                # vector가 dict인지 확인 후 특정 키값만 추출
-                doc_content = vector_data.get("text") if isinstance(vector_data, dict) else None
-
-                doc_text = f"{doc_title} {doc_content}"
-                
-                # 질문과 문서 간 직접 유사도 계산
-                relevance_score = similarity_calc.calculate_combined_similarity(question, doc_text)
+                # 내용이 바뀐 문서는 지문 비교로 다시 계산하고, 본문 없는 축약 payload 특징은 캐시하지 않음
+                doc_features[index] = feature_store.get(candidate.get('res_id'), payload, store="vector" in payload)
+            except Exception as e:
+                print(f"[RERANK] 문서 특징 계산 오류: {e}")
+        
+        # 질문 토큰은 사전에 등록하지 않고 조회만 (문서 특징을 만든 뒤 한 번 조회해야 공통 용어가 일치함)
+        question_features = DocumentFeatures.for_query(state['question'], feature_store.vocab) if doc_features else None
+        
+        for index, candidate in enumerate(candidates_top):
+            try:
+                features = candidate.get('res_features')
+                if features is not None:
+                    # 검색 단계에서 계산한 질문-문서 유사도 재사용 (토큰화 없음)
+                    relevance_score = features['similarity']
+                else:
+                    # 질문과 문서 간 직접 유사도 계산
+                    relevance_score = similarity_calc.calculate_feature_similarity(question_features, doc_features[index])
                 
                 # 기존 검색 점수와 관련성 점수를 결합
                 original_score = candidate.get('res_score', 0.0)
@@ -653,11 +905,11 @@ async def node_rc_rerank(state: SearchState) -> SearchState:
                 "completed",
                 {
                     "message": "RAG 검색 완료",
-                    "documents_count": len(candidates_total),
-                    "documents": candidates_total,
+                    "documents_count": len(sorted_candidates_top),
+                    "documents": sorted_candidates_top,
                     "document_titles": [
                         candidate.get("res_payload", {}).get("document_name", "제목 없음3")
-                        for candidate in candidates_total
+                        for candidate in sorted_candidates_top
                     ],
                 },
             )
@@ -673,6 +925,11 @@ async def node_rc_rerank(state: SearchState) -> SearchState:
         print("[error]: node_rc_rerank")
         raise RuntimeError(f"[error]: node_rc_rerank: {str(e)}")
 
+def encode_answer_chunk(content: Optional[str]) -> bytes:
+    """답변 청크 1개를 SSE data 프레임으로 변환 (비-ASCII 문자 허용, UTF-8 bytes)"""
+    payload = json.dumps({'content': content}, ensure_ascii=False)
+    return (f"data: {payload}\n\n").encode("utf-8")
+
 async def node_rc_answer(state: SearchState) -> SearchState:
     """답변 생성 노드 (랭그래프 전용)"""
     print("[inform]: node_rc_answer 실행")
@@ -686,14 +943,24 @@ async def node_rc_answer(state: SearchState) -> SearchState:
             
             # 상위 1건의 문서 정보 추출
             top_result = candidates_top[0]
+            if "vector" not in top_result.get('res_payload', {}):
+                # 전체 payload 조회(hydrate)에 실패해 축약 payload 만 남은 경우 상위 문서만 다시 조회
+                print(f"[Answer] ⚠️ 상위 문서 본문 없음 - payload 재조회: {top_result.get('res_id')}")
+                await run_within(
+                    hydrate_candidates([top_result], QDRANT_HOST, QDRANT_PORT, QDRANT_COLLECTION),
+                    upstream_timeout(state, reserve=RAG_ANSWER_MIN_BUDGET), [top_result], "상위 문서 payload 재조회"
+                )
             top_payload = top_result.get('res_payload', {})
             
             # 문서 제목과 내용 추출
             document_title = top_payload.get('document_name', '제목 없음')
             vector_data = top_payload.get("vector", {})
 
-            # vector가 dict인지 확인 후 특정 키값만 추출
+            # vector가 dict인지 확인 후 특정 키값만 추출 (재조회도 실패하면 제목만으로 답변)
             document_content = vector_data.get("text") if isinstance(vector_data, dict) else None
+            if document_content is None:
+                print(f"[Answer] ⚠️ 문서 본문을 찾을 수 없어 빈 내용으로 진행")
+                document_content = ""
             
             print(f"[Answer] 📄 RAG 문서 정보:")
             print(f"[Answer] 제목: {document_title}")
@@ -725,60 +992,99 @@ async def node_rc_answer(state: SearchState) -> SearchState:
             
             # OpenAI API 호출하여 답변 생성 - 새로운 LLM 방식
             llm_answer = ""
+            generator_id = state.get('generator_id')
+            answer_chunks = []
             try:
-                if OPENAI_API_KEY:
-                    print(f"[Answer] 🚀 LLM API 호출 시작...")
+                if not has_budget(state, RAG_ANSWER_MIN_BUDGET):
+                    # 남은 시간 안에 LLM 답변을 끝낼 수 없으면 상위 문서 요약으로 대체
+                    print(f"[DEADLINE] 남은 시간 부족({remaining_budget(state):.1f}초): LLM 답변 생략")
+                    llm_answer = f"""입력하신 '{state['question']}'에 대한 답변입니다.
+
+참고 문서: {document_title}
+
+문서 내용을 바탕으로 분석한 결과, {str(document_content)[:200]}...에 대한 정보를 찾았습니다.
+
+응답 시간 제한으로 요약 답변을 제공합니다."""
+                elif OPENAI_API_KEY:
+                    # 같은 질문·같은 참고 문서·같은 코퍼스 버전이면 저장된 답변 청크를 그대로 재생
+                    answer_doc_ids = (top_result.get('res_id'),)
+                    snapshot = corpus_store.snapshots.get(QDRANT_COLLECTION)
+                    corpus_version = snapshot.version if snapshot is not None else None
+                    cached_chunks = None
+                    if corpus_version is not None:
+                        cached_chunks = answer_cache.get(state['question'], answer_doc_ids, QDRANT_COLLECTION, corpus_version)
+
+                    if cached_chunks is not None:
+                        print(f"[Answer] ♻️ 답변 캐시 적중 - LLM 호출 생략 (청크 {len(cached_chunks)}개 재생)")
+                        for index, content in enumerate(cached_chunks):
+                            try:
+                                await publish_answer_delta(generator_id, content, index)
+                                yield encode_answer_chunk(content)
+                                await asyncio.sleep(0)
+                            except (ConnectionResetError, BrokenPipeError, OSError, ConnectionAbortedError, ConnectionError) as e:
+                                print(f"Client disconnected during streaming lv2: {type(e).__name__}")
+                                return
+                        llm_answer = "".join(content for content in cached_chunks if content)
+                    else:
+                        print(f"[Answer] 🚀 LLM API 호출 시작...")
                     
-                    messages = [{"role": "user", "content": prompt}]
+                        messages = [{"role": "user", "content": prompt}]
                     
-                    # httpx 클라이언트 설정
-                    httpx_client = httpx.AsyncClient(verify=False, timeout=None)
+                        # httpx 클라이언트 설정 (요청 마감 시각까지 남은 시간으로 제한, 중단 시에도 연결을 닫음)
+                        answer_timeout = upstream_timeout(state)
+                        async with httpx.AsyncClient(verify=False, timeout=answer_timeout) as httpx_client:
 
-                    # print(f"[messages 확인] {messages}")               
+                            # print(f"[messages 확인] {messages}")               
 
-                    # AsyncOpenAI 클라이언트 생성
-                    client = AsyncOpenAI(
-                        api_key=OPENAI_API_KEY,
-                        base_url=OPENAI_BASE_URL,
-                        http_client=httpx_client,
-                        default_headers={
-                            "x-dep-ticket": OPENAI_API_KEY,
-                            "Send-System-Name": "ds2llm",
-                            "User-Id": "c.seunghoon",
-                            "User-Type": "AD_ID",
-                            "Prompt-Msg-Id": str(uuid.uuid4()),
-                            "Completion-Msg-Id": str(uuid.uuid4()),
-                        }
-                    )
+                            # AsyncOpenAI 클라이언트 생성
+                            client = AsyncOpenAI(
+                                api_key=OPENAI_API_KEY,
+                                base_url=OPENAI_BASE_URL,
+                                http_client=httpx_client,
+                                default_headers={
+                                    "x-dep-ticket": OPENAI_API_KEY,
+                                    "Send-System-Name": "ds2llm",
+                                    "User-Id": "c.seunghoon",
+                                    "User-Type": "AD_ID",
+                                    "Prompt-Msg-Id": str(uuid.uuid4()),
+                                    "Completion-Msg-Id": str(uuid.uuid4()),
+                                }
+                            )
                     
-                    # 비동기 호출
-                    response = await client.chat.completions.create(
-                        model="openai/gpt-oss-120b",
-                        messages=messages,
-                        stream=True,
-                    )
-                    async for chunk in response:              # 이제 chunk는 OpenAIObject
-                        delta = chunk.choices[0].delta
-                        content = delta.content
-                        # print(content)
-                    # for chunk in response:
-                    #     if chunk.choices[0].delta.get("content"):
-                    #         content = chunk.choices[0].delta.content
-                        try:
-                            # 비-ASCII 문자 허용, UTF-8 bytes 로 즉시 전송
-                            payload = json.dumps({'content': content}, ensure_ascii=False)
-                            yield (f"data: {payload}\n\n").encode("utf-8")
-
-                            await asyncio.sleep(0.01)
-                            # 청크 사이에 지연 추가하여 다른 API 처리 가능하도록 함
-                            await asyncio.sleep(0.01)
-                        except (ConnectionResetError, BrokenPipeError, OSError, ConnectionAbortedError, ConnectionError) as e:
-                            # 클라이언트 연결이 끊어진 경우 조용히 종료
-                            print(f"Client disconnected during streaming lv2: {type(e).__name__}")
-                            return
-                        except Exception as e:
-                            print(f"Unexpected error during streaming lv1: {str(e)}")
-                            return
+                            # 비동기 호출 (호출 횟수·첫 토큰 시간 기록)
+                            response = track_llm_stream("answer", client.chat.completions.create(
+                                model=ANSWER_MODEL,
+                                messages=messages,
+                                stream=True,
+                            ))
+                            async for chunk in iter_within(response, answer_timeout, "답변 생성"):              # 이제 chunk는 OpenAIObject
+                                delta = chunk.choices[0].delta
+                                content = delta.content
+                                # print(content)
+                            # for chunk in response:
+                            #     if chunk.choices[0].delta.get("content"):
+                            #         content = chunk.choices[0].delta.content
+                                try:
+                                    # 토큰이 도착하는 즉시 SSE 큐로 전달 (ainvoke 로는 노드의 yield 가 클라이언트에 전달되지 않음)
+                                    await publish_answer_delta(generator_id, content, len(answer_chunks))
+                                    # 비-ASCII 문자 허용, UTF-8 bytes 로 즉시 전송
+                                    yield encode_answer_chunk(content)
+                                    answer_chunks.append(content)
+
+                                    await asyncio.sleep(0.01)
+                                    # 청크 사이에 지연 추가하여 다른 API 처리 가능하도록 함
+                                    await asyncio.sleep(0.01)
+                                except (ConnectionResetError, BrokenPipeError, OSError, ConnectionAbortedError, ConnectionError) as e:
+                                    # 클라이언트 연결이 끊어진 경우 조용히 종료
+                                    print(f"Client disconnected during streaming lv2: {type(e).__name__}")
+                                    return
+                                except Exception as e:
+                                    print(f"Unexpected error during streaming lv1: {str(e)}")
+                                    return
+                        llm_answer = "".join(content for content in answer_chunks if content)
+                        # 스트림을 끝까지 보낸 답변만 캐시 (중간에 끊긴 답변은 저장하지 않음)
+                        if corpus_version is not None:
+                            answer_cache.set(state['question'], answer_doc_ids, QDRANT_COLLECTION, corpus_version, answer_chunks)
                 else:
                     print(f"[Answer] ⚠️ OpenAI API 키가 설정되지 않음")
                     llm_answer = f"""입력하신 '{state['question']}'에 대한 답변입니다.
@@ -789,6 +1095,10 @@ async def node_rc_answer(state: SearchState) -> SearchState:
 
 더 자세한 분석을 위해서는 OpenAI API 키가 필요합니다."""
                     
+            except UPSTREAM_TIMEOUTS as e:
+                # 마감 시각 초과: 이미 보낸 청크까지만 답변으로 두고 캐시하지 않음
+                print(f"[Answer] ⏱️ 답변 생성 시간 초과로 중단: {type(e).__name__}")
+                llm_answer = "".join(content for content in answer_chunks if content)
             except Exception as e:
                 print(f"[Answer] ❌ LLM API 호출 실패: {e}")
                 import traceback
@@ -941,12 +1251,12 @@ async def node_rc_plain_answer(state: SearchState) -> SearchState:
                 "completed",
                 {
                     "message": "최종 답변 생성 완료",
-                    "answer": response.get("answer", ""),
-                    "analysis_image_url": response.get("analysis_image_url"),
-                    "keywords": response.get("keyword", state.get("keyword", [])),
-                    "document_titles": response.get("db_search_title", []),
-                    "search_results": candidates_top,
-                    "top_document": response.get("top_document"),
+                    "answer": complete_result["answer"],
+                    "analysis_image_url": None,
+                    "keywords": complete_result["keyword"],
+                    "document_titles": complete_result["db_search_title"],
+                    "search_results": state.get("candidates_total", []),
+                    "top_document": None,
                 },
             )
     
@@ -954,13 +1264,7 @@ async def node_rc_plain_answer(state: SearchState) -> SearchState:
         "question": state['question'],
         "keyword": state["keyword"],
         "candidates_total": state["candidates_total"],
-        "response": {
-            "res_id": [], 
-            "answer": detailed_answer,
-            "q_mode": "search",  # 최초 질문은 항상 search 모드
-            "keyword": state["keyword"],  # 키워드 증강 목록
-            "db_search_title": []
-        },
+        "response": complete_result,
         "generator_id": state.get('generator_id')
     }
 
@@ -55,13 +55,16 @@ def create_langgraph():
     """LangGraph 생성"""
     workflow = StateGraph(SearchState)
     
-    # 노드 추가
-    workflow.add_node("node_rc_init", node_rc_init)
-    workflow.add_node("node_rc_keyword", node_rc_keyword)
-    workflow.add_node("node_rc_rag", node_rc_rag)
-    workflow.add_node("node_rc_rerank", node_rc_rerank)
-    workflow.add_node("node_rc_answer", node_rc_answer)
-    workflow.add_node("node_rc_plain_answer", node_rc_plain_answer)
+    # 노드 추가 (노드별 실행 시간은 /api/metrics 로 수집)
+    for name, node in [
+        ("node_rc_init", node_rc_init),
+        ("node_rc_keyword", node_rc_keyword),
+        ("node_rc_rag", node_rc_rag),
+        ("node_rc_rerank", node_rc_rerank),
+        ("node_rc_answer", node_rc_answer),
+        ("node_rc_plain_answer", node_rc_plain_answer),
+    ]:
+        workflow.add_node(name, instrument_node(name, node))
     
     # 엣지 정의
     workflow.set_entry_point("node_rc_init")
@@ -69,7 +72,7 @@ def create_langgraph():
     workflow.add_edge("node_rc_keyword", "node_rc_rag")
     workflow.add_conditional_edges(
         "node_rc_rag",
-        judge_rc_ragscore,
+        instrument_router("judge_rc_ragscore", judge_rc_ragscore),
         {
             "Y": "node_rc_rerank",
             "N": "node_rc_plain_answer"
@@ -101,8 +104,8 @@ async def get_llm_response(question: str) -> str:
             {"role": "user", "content": question}
         ]
         
-        # httpx 클라이언트 설정
-        httpx_client = httpx.AsyncClient(verify=False, timeout=None)
+        # httpx 클라이언트 설정 (요청 시간 예산으로 제한)
+        httpx_client = httpx.AsyncClient(verify=False, timeout=RAG_REQUEST_BUDGET)
 
         # print(f"[messages 확인] {messages}")              
         
@@ -121,14 +124,14 @@ async def get_llm_response(question: str) -> str:
                 }
             )
             
-        # 비동기 호출
-        response = await client.chat.completions.create(
+        # 비동기 호출 (호출 횟수·첫 토큰 시간 기록)
+        response = track_llm_stream("chat", client.chat.completions.create(
                 model="openai/gpt-oss-120b",
                 messages=messages,
                 stream=True,
-            )
+            ))
         
-        async for chunk in response:              # 이제 chunk는 OpenAIObject
+        async for chunk in iter_within(response, RAG_REQUEST_BUDGET, "LLM 응답"):              # 이제 chunk는 OpenAIObject
                     delta = chunk.choices[0].delta
                     content = delta.content
                     # print(content)
@@ -468,6 +471,13 @@ async def execute_langgraph(request: StreamRequest, db: Session = Depends(get_db
         raise HTTPException(status_code=500, detail=f"LangGraph 실행 오류: {str(e)}")
 
 
+# 캐시 지표 조회 엔드포인트
+@router.get("/cache/stats")
+async def get_cache_stats():
+    """검색 결과·키워드 증강·답변 캐시의 적중률/절약 시간 조회 (같은 값을 /api/metrics 에도 내보냄)"""
+    return cache_stats()
+
+
 # 추가 질문 스트리밍 처리 엔드포인트
 @router.post("/langgraph/followup/stream")
 async def execute_followup_question_stream(request: StreamRequest, http_request: Request, db: Session = Depends(get_db)):
@@ -621,8 +631,8 @@ async def get_streaming_response_async(messages: List[Dict], request: Request, g
             # 실제 이미지 생성 로직은 별도 구현 필요
             image_url = await generate_image(messages[-1]["content"] if messages else "")
         
-        # httpx 클라이언트 설정
-        httpx_client = httpx.AsyncClient(verify=False, timeout=None)
+        # httpx 클라이언트 설정 (요청 시간 예산으로 제한)
+        httpx_client = httpx.AsyncClient(verify=False, timeout=RAG_REQUEST_BUDGET)
 
         # print(f"[messages 확인] {messages}")              
         
@@ -642,17 +652,17 @@ async def get_streaming_response_async(messages: List[Dict], request: Request, g
                 }
             )
             
-        # 비동기 호출
-        response = await client.chat.completions.create(
+        # 비동기 호출 (호출 횟수·첫 토큰 시간 기록)
+        response = track_llm_stream("chat_stream", client.chat.completions.create(
                 model="openai/gpt-oss-120b",
                 messages=messages,
                 stream=True,
-            )
+            ))
         
         print(f"[LLM_STREAM] 📥 스트리밍 응답 시작")
         
         text_response = ""
-        async for chunk in response:
+        async for chunk in iter_within(response, RAG_REQUEST_BUDGET, "LLM 스트리밍"):
             if chunk.choices[0].delta.content:
                 content = chunk.choices[0].delta.content
                 text_response += content
@@ -0,0 +1,322 @@
+import os
+import time
+import json
+import sqlite3
+import asyncio
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+from app.utils.config import (
+    RAG_RESULT_CACHE_SIZE, RAG_RESULT_CACHE_TTL,
+    ANSWER_CACHE_SIZE, ANSWER_CACHE_TTL, ANSWER_MODEL, ANSWER_PROMPT_VERSION,
+    KEYWORD_CACHE_SIZE, KEYWORD_CACHE_TTL, KEYWORD_CACHE_DB, KEYWORD_MODEL, KEYWORD_PROMPT_VERSION
+)
+from app.utils.features import tokenize
+from app.utils.metrics import registry
+
+
+class LRUCache:
+    """크기 제한 LRU + TTL 캐시 (적중/미스/제거 횟수 집계)"""
+
+    def __init__(self, max_size: int, ttl: Optional[float] = None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """값 조회 (없거나 만료되면 None)"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        stored_at, value = entry
+        if self.ttl is not None and time.monotonic() - stored_at >= self.ttl:
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any):
+        """값 저장 (크기 초과 시 가장 오래 쓰이지 않은 항목 제거)"""
+        if self.max_size <= 0:
+            return
+        self._entries[key] = (time.monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def remove_where(self, predicate) -> int:
+        """조건에 맞는 키의 항목 제거"""
+        keys = [key for key in self._entries if predicate(key)]
+        for key in keys:
+            del self._entries[key]
+        return len(keys)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """캐시 통계"""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+def normalize_query(query: str) -> Tuple[str, ...]:
+    """점수에 영향을 주는 토큰 빈도만 남긴 쿼리 키 (대소문자·특수문자·어순 무시)"""
+    return tuple(sorted(tokenize(query)))
+
+
+class VersionedCache:
+    """컬렉션 스냅샷 버전에 묶인 LRU 캐시 (키는 (컬렉션, 버전, ...) 형태)
+
+    컬렉션의 스냅샷 버전이 바뀌면 해당 컬렉션의 이전 버전 항목을 모두 제거하므로
+    적중한 결과는 항상 현재 코퍼스 기준이다.
+    """
+
+    tag = "CACHE"
+
+    def __init__(self, max_size: int, ttl: Optional[float]):
+        self.cache = LRUCache(max_size, ttl)
+        self._versions: Dict[str, int] = {}
+
+    def _is_current(self, collection: str, version: int) -> bool:
+        """현재 버전인지 확인 (새 버전이면 이전 버전 항목 제거, 이전 버전이면 False)"""
+        known = self._versions.get(collection)
+        if known is None or version > known:
+            removed = self.cache.remove_where(lambda key: key[0] == collection)
+            if removed:
+                print(f"[{self.tag}] 색인 버전 변경({collection} v{version}): {removed}건 무효화")
+            self._versions[collection] = version
+            return True
+        return version == known
+
+    def _get(self, collection: str, version: int, *key: Hashable) -> Optional[Any]:
+        """캐시된 값 조회 (교체 전 스냅샷으로 진행 중인 요청은 항상 미스)"""
+        if not self._is_current(collection, version):
+            self.cache.misses += 1
+            return None
+        return self.cache.get((collection, version, *key))
+
+    def _set(self, collection: str, version: int, *key: Hashable, value: Any):
+        """값 저장 (현재 버전 결과만)"""
+        if self._is_current(collection, version):
+            self.cache.set((collection, version, *key), value)
+
+    def stats(self) -> Dict[str, Any]:
+        return self.cache.stats()
+
+
+class QueryResultCache(VersionedCache):
+    """(컬렉션, 색인 버전, 정규화 쿼리, 결과 수) → 검색 결과 캐시"""
+
+    tag = "RESULT_CACHE"
+
+    def __init__(self, max_size: int = RAG_RESULT_CACHE_SIZE, ttl: Optional[float] = RAG_RESULT_CACHE_TTL):
+        super().__init__(max_size, ttl)
+
+    def get(self, query: str, collection: str, limit: int, version: int) -> Optional[List[Any]]:
+        return self._get(collection, version, normalize_query(query), limit)
+
+    def set(self, query: str, collection: str, limit: int, version: int, hits: List[Any]):
+        self._set(collection, version, normalize_query(query), limit, value=hits)
+
+
+# 프로세스 전역 검색 결과 캐시
+query_result_cache = QueryResultCache()
+
+
+def normalize_question(question: str) -> str:
+    """키워드 캐시용 질문 정규화 (LLM 입력이므로 어순·조사는 유지하고 공백·대소문자만 통일)"""
+    return " ".join(question.split()).lower()
+
+
+class KeywordCache:
+    """LLM 키워드 증강 결과 캐시 (메모리 LRU + 선택적 SQLite 영구 저장)
+
+    키는 (모델, 프롬프트 버전, 정규화 질문)이므로 모델이나 프롬프트를 바꾸면 이전 결과는 쓰이지 않는다.
+    항목마다 생성 당시 LLM 호출 시간을 함께 저장해 적중 시 절약된 시간을 집계한다.
+    """
+
+    def __init__(self, max_size: int = KEYWORD_CACHE_SIZE, ttl: Optional[float] = KEYWORD_CACHE_TTL,
+                 db_path: Optional[str] = KEYWORD_CACHE_DB, model: str = KEYWORD_MODEL,
+                 prompt_version: str = KEYWORD_PROMPT_VERSION):
+        self.memory = LRUCache(max_size, ttl)
+        self.ttl = ttl
+        self.db_path = db_path
+        self.model = model
+        self.prompt_version = prompt_version
+        self._conn: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self.disk_hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+        self.llm_seconds = 0.0
+
+    def _key(self, question: str) -> str:
+        return f"{self.model}|{self.prompt_version}|{normalize_question(question)}"
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS keyword_cache ("
+                "key TEXT PRIMARY KEY, keywords TEXT NOT NULL, latency REAL NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def _read_disk(self, key: str) -> Optional[Tuple[List[str], float]]:
+        with self._db_lock:
+            conn = self._connect()
+            row = conn.execute("SELECT keywords, latency, created_at FROM keyword_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if self.ttl is not None and time.time() - row[2] >= self.ttl:
+                conn.execute("DELETE FROM keyword_cache WHERE key = ?", (key,))
+                conn.commit()
+                return None
+            return json.loads(row[0]), row[1]
+
+    def _write_disk(self, key: str, keywords: List[str], latency: float):
+        with self._db_lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO keyword_cache (key, keywords, latency, created_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(keywords, ensure_ascii=False), latency, time.time())
+            )
+            conn.commit()
+
+    async def get(self, question: str) -> Optional[List[str]]:
+        """캐시된 키워드 조회 (메모리 → 디스크 순, 디스크 적중은 메모리로 승격)"""
+        key = self._key(question)
+        entry = self.memory.get(key)
+        if entry is None and self.db_path:
+            try:
+                entry = await asyncio.to_thread(self._read_disk, key)
+            except Exception as e:
+                print(f"[KEYWORD_CACHE] 디스크 캐시 조회 실패: {e}")
+                entry = None
+            if entry is not None:
+                self.disk_hits += 1
+                self.memory.set(key, entry)
+        if entry is None:
+            self.misses += 1
+            return None
+        keywords, latency = entry
+        self.saved_seconds += latency
+        return list(keywords)
+
+    async def set(self, question: str, keywords: List[str], latency: float):
+        """LLM 키워드 결과와 호출 시간 저장"""
+        key = self._key(question)
+        self.llm_seconds += latency
+        self.memory.set(key, (list(keywords), latency))
+        if self.db_path:
+            try:
+                await asyncio.to_thread(self._write_disk, key, keywords, latency)
+            except Exception as e:
+                print(f"[KEYWORD_CACHE] 디스크 캐시 저장 실패: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """캐시 통계 (적중률, 절약된 LLM 호출 시간)"""
+        hits = self.memory.hits + self.disk_hits
+        lookups = hits + self.misses
+        return {
+            "size": len(self.memory),
+            "max_size": self.memory.max_size,
+            "hits": hits,
+            "memory_hits": self.memory.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.memory.evictions,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "saved_seconds": self.saved_seconds,
+            "llm_seconds": self.llm_seconds,
+        }
+
+    def close(self):
+        with self._db_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+# 프로세스 전역 키워드 증강 캐시
+keyword_cache = KeywordCache()
+
+
+class AnswerCache(VersionedCache):
+    """(컬렉션, 색인 버전, 정규화 질문, 참고 문서 ID, 모델, 프롬프트 버전) → 답변 스트림 청크 캐시
+
+    같은 질문에 같은 문서가 검색되면 LLM 을 다시 호출하지 않고 저장된 청크를 같은 SSE 형식으로 재생한다.
+    """
+
+    tag = "ANSWER_CACHE"
+
+    def __init__(self, max_size: int = ANSWER_CACHE_SIZE, ttl: Optional[float] = ANSWER_CACHE_TTL,
+                 model: str = ANSWER_MODEL, prompt_version: str = ANSWER_PROMPT_VERSION):
+        super().__init__(max_size, ttl)
+        self.model = model
+        self.prompt_version = prompt_version
+
+    def get(self, question: str, doc_ids: Tuple[Any, ...], collection: str, version: int) -> Optional[List[Any]]:
+        return self._get(collection, version, normalize_question(question), doc_ids, self.model, self.prompt_version)
+
+    def set(self, question: str, doc_ids: Tuple[Any, ...], collection: str, version: int, chunks: List[Any]):
+        self._set(collection, version, normalize_question(question), doc_ids, self.model, self.prompt_version,
+                  value=list(chunks))
+
+
+# 프로세스 전역 답변 캐시
+answer_cache = AnswerCache()
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    """캐시별 통계 (/cache/stats 응답과 /api/metrics 지표 공용)"""
+    return {
+        "query_result_cache": query_result_cache.stats(),
+        "keyword_cache": keyword_cache.stats(),
+        "answer_cache": answer_cache.stats(),
+    }
+
+
+def _collect_stat(field: str):
+    """캐시별 통계 항목 1개를 cache 라벨로 내보내는 수집 함수"""
+    return lambda: [({"cache": name}, stats[field]) for name, stats in cache_stats().items()]
+
+
+registry.callback("cache_hits_total", "캐시 적중 횟수 (키워드 캐시는 메모리+디스크)", "counter", ["cache"], _collect_stat("hits"))
+registry.callback("cache_misses_total", "캐시 미스 횟수", "counter", ["cache"], _collect_stat("misses"))
+registry.callback("cache_evictions_total", "크기 초과로 제거된 캐시 항목 수", "counter", ["cache"], _collect_stat("evictions"))
+registry.callback("cache_entries", "현재 캐시 항목 수", "gauge", ["cache"], _collect_stat("size"))
+registry.callback(
+    "keyword_cache_saved_seconds_total", "키워드 캐시 적중으로 생략한 LLM 호출 시간 합계", "counter", (),
+    lambda: [({}, keyword_cache.saved_seconds)]
+)
+
+
+async def close_keyword_cache():
+    """애플리케이션 종료 시 SQLite 연결 정리"""
+    await asyncio.to_thread(keyword_cache.close)
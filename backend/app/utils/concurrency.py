@@ -0,0 +1,130 @@
+import time
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+
+def _bounded(aws: Iterable[Awaitable[Any]], limit: int) -> List[asyncio.Task]:
+    """동시 실행 수를 limit 으로 제한한 태스크 목록 생성"""
+    semaphore = asyncio.Semaphore(max(1, limit))
+
+    async def run(aw: Awaitable[Any]) -> Any:
+        async with semaphore:
+            return await aw
+
+    tasks = []
+    for aw in aws:
+        task = asyncio.ensure_future(run(aw))
+        if asyncio.iscoroutine(aw):
+            # 시작 전에 취소된 코루틴은 실행되지 않았으므로 완료 시 닫아서 정리 (이미 끝났으면 영향 없음)
+            task.add_done_callback(lambda _, aw=aw: aw.close())
+        tasks.append(task)
+    return tasks
+
+
+async def bounded_gather(aws: Iterable[Awaitable[Any]], limit: int) -> List[Any]:
+    """최대 limit 개씩 동시에 실행하고 입력 순서대로 결과 반환"""
+    return await asyncio.gather(*_bounded(aws, limit))
+
+
+async def gather_within(aws: Iterable[Awaitable[Any]], limit: int, timeout: Optional[float]) -> Tuple[List[Any], int]:
+    """최대 limit 개씩 동시에 실행하고 timeout 안에 끝난 작업의 결과만 입력 순서대로 반환
+
+    시간이 다 되어도 이미 끝난 작업(미리 시작해 완료된 작업 포함)의 결과는 버리지 않고,
+    남은 작업만 취소한다. 실패한 작업은 결과에서 제외한다.
+    반환: (결과 목록, 시간 초과로 취소한 작업 수)
+    """
+    tasks = _bounded(aws, limit)
+    if not tasks:
+        return [], 0
+    try:
+        await asyncio.wait(tasks, timeout=timeout)
+    finally:
+        unfinished = [task for task in tasks if not task.done()]
+        for task in unfinished:
+            task.cancel()
+
+    results = []
+    for task in tasks:
+        if not task.done() or task.cancelled():
+            continue
+        if task.exception() is not None:
+            print(f"[CONCURRENCY] 작업 실패: {type(task.exception()).__name__}: {task.exception()}")
+            continue
+        results.append(task.result())
+    return results, len(unfinished)
+
+
+class _SpeculativeEntry:
+    """미리 시작한 작업 1개와 대기 요청 수"""
+
+    __slots__ = ('task', 'started_at', 'reserved', 'waiting')
+
+    def __init__(self, task: asyncio.Task, started_at: float, reserved: int):
+        self.task = task
+        self.started_at = started_at
+        self.reserved = reserved    # 시작을 요청했지만 아직 가져가지 않은 요청 수
+        self.waiting = 0            # 가져가서 결과를 기다리는 중인 요청 수
+
+
+class SpeculativeTasks:
+    """앞 단계에서 미리 시작한 작업을 키별로 보관했다가 뒤 단계에서 가져가는 저장소
+
+    같은 키의 작업이 실행 중이면 새로 시작하지 않고 공유한다.
+    가져가지 않은 작업(중간 단계 실패 등)은 ttl 이 지나면 정리한다
+    (다음 요청을 기다리지 않도록 항목 생성 시 ttl 뒤 정리를 예약한다).
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._tasks: Dict[Hashable, _SpeculativeEntry] = {}
+
+    def __len__(self) -> int:
+        self._expire()
+        return len(self._tasks)
+
+    def start(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        """작업 시작 (같은 키가 실행 중이면 공유)"""
+        self._expire()
+        entry = self._tasks.get(key)
+        if entry is None or entry.task.done():
+            # 완료된 작업은 재사용하지 않고 최신 결과로 다시 시작
+            # (이전 작업을 기다리는 요청은 이전 항목에서 정리됨)
+            reserved = entry.reserved if entry is not None else 0
+            entry = _SpeculativeEntry(asyncio.ensure_future(factory()), time.monotonic(), reserved)
+            self._tasks[key] = entry
+            asyncio.get_running_loop().call_later(self.ttl, self._expire)
+        entry.reserved += 1
+        return entry.task
+
+    def take(self, key: Hashable) -> Optional[Awaitable[Any]]:
+        """미리 시작한 작업 가져오기 (없으면 None)
+
+        여러 요청이 공유하므로 취소가 전파되지 않도록 shield 로 감싸서 기다린다.
+        """
+        self._expire()
+        entry = self._tasks.get(key)
+        if entry is None:
+            return None
+        entry.reserved = max(entry.reserved - 1, 0)
+        return self._wait(key, entry)
+
+    async def _wait(self, key: Hashable, entry: _SpeculativeEntry) -> Any:
+        entry.waiting += 1
+        try:
+            return await asyncio.shield(entry.task)
+        finally:
+            # 결과를 받았거나 시간 초과·취소로 떠난 경우 모두 대기 수 감소
+            entry.waiting -= 1
+            if not entry.reserved and not entry.waiting and self._tasks.get(key) is entry:
+                del self._tasks[key]
+                if not entry.task.done():
+                    # 기다리는 요청이 더 없으면 작업도 중단
+                    entry.task.cancel()
+
+    def _expire(self):
+        now = time.monotonic()
+        for key, entry in list(self._tasks.items()):
+            if not entry.waiting and now - entry.started_at >= self.ttl:
+                del self._tasks[key]
+                if not entry.task.done():
+                    entry.task.cancel()
@@ -36,6 +36,62 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 300
 QDRANT_HOST = "10.172.107.182"
 QDRANT_PORT = 8001
 QDRANT_COLLECTION = "RC"
+QDRANT_COLLECTIONS_REFRESH_INTERVAL = 60    # 컬렉션 목록 캐시 갱신 주기 (초)
+
+# Corpus Snapshot Configuration
+CORPUS_SCROLL_PAGE_SIZE = 1000      # 스크롤 1페이지당 문서 수
+CORPUS_SNAPSHOT_TTL = 600           # 스냅샷 전체 재구축(압축) 주기 (초)
+CORPUS_COUNT_CHECK_INTERVAL = 30    # 포인트 수 변경 확인 주기 (초)
+CORPUS_SYNC_INTERVAL = 60           # 백그라운드 증분 동기화 주기 (초)
+CORPUS_PAYLOAD_FIELDS = ["document_name", "vector.text"]   # 색인용 스크롤 시 가져올 payload 필드
+CORPUS_COMPACT_FIELDS = ["document_name"]                  # 색인 후 메모리에 유지할 payload 필드
+CORPUS_INDEX_DIR = "./index_snapshots"      # mmap 색인 스냅샷 디렉터리 (None 이면 사용 안 함)
+CORPUS_INDEX_KEEP = 2                       # 컬렉션별로 보관할 스냅샷 버전 수
+CORPUS_SHARED_MEMORY = False                # True 면 로더 프로세스가 게시한 공유 메모리 색인을 워커가 연결하여 사용
+CORPUS_SHARED_PREFIX = "llm_corpus"         # 공유 메모리 세그먼트 이름 접두사
+
+# RAG Search Configuration
+RAG_SEARCH_CONCURRENCY = 4          # 동시에 실행할 검색/점수 계산 작업 수
+RAG_QUERY_CHUNK_SIZE = 8            # 점수 계산 작업 1개가 처리할 쿼리 수
+RETRIEVAL_MODE = "lexical"          # "lexical": 어휘 검색만, "hybrid": 어휘 + Qdrant 벡터 검색 융합
+RAG_TOPK_STRATEGY = "matrix"        # "matrix": 희소 행렬곱 일괄 계산, "maxscore": 용어별 상한 기반 조기 종료
+RAG_CANDIDATE_LIMIT = 10            # 재순위 단계로 넘길 최대 후보 수
+RAG_FEATURE_CACHE_SIZE = 1024       # 재순위 단계 문서 특징 캐시 최대 항목 수 (코퍼스 전체가 아닌 후보 문서만 보관)
+RAG_SCORING_EXECUTOR = "thread"     # 점수 계산 실행 위치: "thread" 또는 "process" (공유 메모리 색인에 연결한 프로세스 풀)
+RAG_SCORING_PROCESSES = None        # 프로세스 풀 크기 (None 이면 CPU 코어 수)
+RAG_SEARCH_SHARDS = 1               # 어휘 색인 샤드 수 (2 이상이면 샤드별 병렬 검색 후 k-way 힙 병합)
+RAG_STREAMING_SEARCH = "fallback"   # 스크롤 페이지 단위 스트리밍 검색: "off", "fallback"(색인 준비 전에만), "always"(색인 없이 항상)
+RAG_RESULT_CACHE_SIZE = 1024        # 쿼리별 검색 결과 캐시 최대 항목 수 (0 이면 사용 안 함)
+RAG_RESULT_CACHE_TTL = 300          # 검색 결과 캐시 유효 시간 (초)
+RAG_SPECULATIVE_SEARCH = True      # 키워드 LLM 호출과 동시에 질문 검색을 미리 시작
+RAG_SPECULATIVE_TTL = 120           # 미리 시작한 질문 검색을 가져가지 않으면 정리하는 시간 (초)
+RAG_REQUEST_BUDGET = 90.0           # 요청 1건 (LangGraph 전체)의 시간 예산 (초)
+RAG_KEYWORD_MIN_BUDGET = 30.0       # 남은 시간이 이보다 적으면 키워드 증강 LLM 호출 생략, 검색 키워드 수 축소
+RAG_DEGRADED_KEYWORD_COUNT = 5      # 시간이 부족할 때 검색할 최대 키워드 수
+RAG_ANSWER_MIN_BUDGET = 10.0        # 답변 LLM 호출에 남겨 둘 최소 시간 (부족하면 최상위 검색 문서로 답변)
+RAG_RETRIEVAL_MIN_BUDGET = 5.0      # 키워드 증강이 검색 단계 몫으로 남겨 둘 최소 시간
+RAG_FALLBACK_SEARCH_TIMEOUT = 2.0   # 마감으로 검색 결과가 없을 때 질문 어휘 검색 top-1 에 허용할 시간
+
+# Keyword Augmentation Configuration
+KEYWORD_MODEL = "openai/gpt-oss-120b"       # 키워드 증강 LLM 모델
+KEYWORD_PROMPT_VERSION = "v1"               # 키워드 프롬프트를 바꾸면 올려서 이전 캐시 무효화
+KEYWORD_CACHE_SIZE = 2048                   # 키워드 캐시 메모리 최대 항목 수 (0 이면 메모리 캐시 사용 안 함)
+KEYWORD_CACHE_TTL = 7 * 24 * 3600           # 키워드 캐시 유효 시간 (초, None 이면 만료 없음)
+KEYWORD_CACHE_DB = "./cache/keyword_cache.sqlite3"   # 재시작 후에도 유지되는 SQLite 캐시 경로 (None 이면 사용 안 함)
+
+# Answer Generation Configuration
+ANSWER_MODEL = "openai/gpt-oss-120b"        # 답변 생성 LLM 모델
+ANSWER_PROMPT_VERSION = "v1"                # 답변 프롬프트를 바꾸면 올려서 이전 캐시 무효화
+ANSWER_CACHE_SIZE = 256                     # 답변 캐시 최대 항목 수 (0 이면 사용 안 함)
+ANSWER_CACHE_TTL = 3600                     # 답변 캐시 유효 시간 (초)
+
+# Hybrid Retrieval Configuration
+HYBRID_EMBEDDING_FUNCTION = None    # 로컬 임베딩 함수 경로 ("모듈:속성"), 예: "app.utils.hybrid:HashingEmbedding"
+HYBRID_VECTOR_NAME = None           # 이름 있는 벡터를 쓰는 컬렉션이면 벡터 이름
+HYBRID_FUSION = "rrf"               # 융합 전략: "rrf" 또는 "weighted"
+HYBRID_DENSE_WEIGHT = 0.5           # 융합 시 벡터 검색 가중치 (어휘 검색은 1 - 가중치)
+HYBRID_RRF_K = 60                   # RRF 순위 평활 상수
+HYBRID_CANDIDATE_LIMIT = 20         # 융합 전 각 검색에서 가져올 후보 수
 
 
 # Server Configuration
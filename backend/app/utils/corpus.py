@@ -0,0 +1,408 @@
+import time
+import asyncio
+from typing import Any, AsyncIterator, List, Dict, Optional, Sequence, Tuple
+import numpy as np
+from qdrant_client import AsyncQdrantClient, models
+from app.utils.config import (
+    QDRANT_COLLECTION, CORPUS_SCROLL_PAGE_SIZE, CORPUS_SNAPSHOT_TTL, CORPUS_COUNT_CHECK_INTERVAL,
+    CORPUS_SYNC_INTERVAL, CORPUS_PAYLOAD_FIELDS, CORPUS_COMPACT_FIELDS, CORPUS_INDEX_DIR, CORPUS_SHARED_MEMORY
+)
+from app.utils.features import DocumentFeatures, Vocabulary, build_document_text, compact_payload, document_fingerprint
+from app.utils.qdrant import QdrantConnection, get_qdrant_connection
+from app.utils.matrix_scoring import SparseScoringEngine
+from app.utils.metrics import track_qdrant
+
+
+async def iter_scroll_pages(client: AsyncQdrantClient, collection: str,
+                            page_size: int = CORPUS_SCROLL_PAGE_SIZE,
+                            payload_fields: Optional[List[str]] = CORPUS_PAYLOAD_FIELDS) -> AsyncIterator[List[dict]]:
+    """next_page_offset 을 따라 컬렉션 문서를 페이지 단위로 반환 (payload_fields 지정 시 해당 필드만)"""
+    with_payload = models.PayloadSelectorInclude(include=payload_fields) if payload_fields else True
+    offset = None
+    while True:
+        with track_qdrant("scroll"):
+            points, offset = await client.scroll(
+                collection_name=collection,
+                limit=page_size,
+                offset=offset,
+                with_payload=with_payload,
+                with_vectors=False
+            )
+        yield [{'id': point.id, 'payload': point.payload} for point in points if point.payload]
+        # 마지막 페이지이면 offset 이 None
+        if offset is None:
+            break
+
+
+async def scroll_all_documents(client: AsyncQdrantClient, collection: str,
+                               page_size: int = CORPUS_SCROLL_PAGE_SIZE,
+                               payload_fields: Optional[List[str]] = CORPUS_PAYLOAD_FIELDS) -> List[dict]:
+    """컬렉션 전체 문서 로드"""
+    documents = []
+    async for page in iter_scroll_pages(client, collection, page_size, payload_fields):
+        documents.extend(page)
+    return documents
+
+
+async def fetch_payloads(client: AsyncQdrantClient, collection: str, ids: List[Any]) -> Dict[Any, dict]:
+    """ID 목록의 전체 payload 조회"""
+    if not ids:
+        return {}
+    with track_qdrant("retrieve"):
+        records = await client.retrieve(
+            collection_name=collection,
+            ids=ids,
+            with_payload=True,
+            with_vectors=False
+        )
+    return {record.id: record.payload or {} for record in records}
+
+
+async def count_points(client: AsyncQdrantClient, collection: str) -> int:
+    """컬렉션 포인트 수 조회"""
+    with track_qdrant("count"):
+        return (await client.count(collection_name=collection, exact=True)).count
+
+
+class CorpusSnapshot:
+    """컬렉션 전체 문서의 CSR 행렬 메모리 스냅샷
+
+    문서 본문은 토큰 통계로만 보관하고 payload 는 축약 필드만 유지한다.
+    전체 payload 는 최종 상위 문서에 대해서만 fetch_payloads 로 조회한다.
+    """
+
+    def __init__(self, collection: str, doc_ids: Sequence[Any], payloads: Sequence[dict],
+                 fingerprints: Sequence[str], engine: SparseScoringEngine, point_count: int, version: int,
+                 created_at: Optional[float] = None, loaded_at: Optional[float] = None):
+        self.collection = collection
+        self.doc_ids = doc_ids
+        self.payloads = payloads
+        self.fingerprints = fingerprints    # 문서 텍스트 해시 (증분 동기화 시 변경 감지용)
+        self.engine = engine
+        self.segment: Optional[str] = None  # 공유 메모리에서 연결한 경우 세그먼트 이름
+        self.manifest: Optional[dict] = None  # 공유 메모리에서 연결한 경우 배열 배치 정보
+        self._positions: Optional[Dict[Any, int]] = None
+        self.point_count = point_count
+        self.version = version
+        self.created_at = created_at if created_at is not None else time.time()
+        self.checked_at = time.monotonic()
+        # TTL 은 이 프로세스가 스냅샷을 구축·로드한 시점부터 계산
+        # (디스크 스냅샷을 생성 시각 기준으로 계산하면 재시작 직후 전체 재구축이 일어남, 내용 변경은 증분 동기화가 반영)
+        self.loaded_at = loaded_at if loaded_at is not None else self.checked_at
+
+    @classmethod
+    def build(cls, collection: str, documents: List[dict], point_count: int, version: int) -> "CorpusSnapshot":
+        """스크롤한 문서 목록으로 CSR 행렬 구축
+
+        문서 특징은 행렬을 만드는 동안만 쓰고 스냅샷에는 CSR 배열과 축약 payload 만 남긴다.
+        """
+        texts = [build_document_text(doc['payload']) for doc in documents]
+        # 구축 전용 사전 (행렬 사전만 스냅샷에 남고 이 사전은 구축 후 해제됨)
+        vocab = Vocabulary()
+        engine = SparseScoringEngine.from_features([DocumentFeatures.from_text(text, vocab) for text in texts], vocab)
+        return cls(
+            collection,
+            [doc['id'] for doc in documents],
+            [compact_payload(doc['payload'], CORPUS_COMPACT_FIELDS) for doc in documents],
+            [document_fingerprint(text) for text in texts],
+            engine, point_count, version
+        )
+
+    def diff(self, documents: List[dict]) -> Tuple[List[dict], List[Any]]:
+        """스크롤한 문서 목록과 비교하여 (추가·변경 문서, 삭제 문서 ID) 반환"""
+        remaining = dict(zip(self.doc_ids, self.fingerprints))
+        changed = []
+        for doc in documents:
+            fingerprint = document_fingerprint(build_document_text(doc['payload']))
+            if remaining.pop(doc['id'], None) != fingerprint:
+                changed.append(doc)
+        return changed, list(remaining)
+
+    def apply_delta(self, changed: List[dict], deleted: List[Any], point_count: int, version: int) -> "CorpusSnapshot":
+        """변경분만 반영한 새 스냅샷 생성 (기존 스냅샷은 그대로 두어 진행 중인 검색이 계속 사용)"""
+        removed = set(deleted) | {doc['id'] for doc in changed}
+        keep = [doc_no for doc_no, doc_id in enumerate(self.doc_ids) if doc_id not in removed]
+
+        delta = CorpusSnapshot.build(self.collection, changed, point_count, version)
+        engine = self.engine.merge(np.asarray(keep, dtype=np.int64), delta.engine)
+        return CorpusSnapshot(
+            self.collection,
+            [self.doc_ids[doc_no] for doc_no in keep] + list(delta.doc_ids),
+            [self.payloads[doc_no] for doc_no in keep] + list(delta.payloads),
+            [self.fingerprints[doc_no] for doc_no in keep] + list(delta.fingerprints),
+            engine, point_count, version,
+            created_at=self.created_at, loaded_at=self.loaded_at
+        )
+
+    def __len__(self) -> int:
+        return len(self.doc_ids)
+
+    @property
+    def num_terms(self) -> int:
+        return len(self.engine.vocabulary)
+
+    def get_document(self, doc_no: int) -> Tuple[Any, dict]:
+        """문서 번호로 (원본 ID, 축약 payload) 조회"""
+        return self.doc_ids[doc_no], self.payloads[doc_no]
+
+    def candidate_features(self, query: str, doc_ids: List[Any]) -> Dict[Any, dict]:
+        """후보 문서 ID 별 쿼리-문서 유사도 구성 요소 (스냅샷에 없는 ID 는 제외)"""
+        if self._positions is None:
+            # 스냅샷당 1회 구축 (ID → 문서 번호)
+            self._positions = {doc_id: doc_no for doc_no, doc_id in enumerate(self.doc_ids)}
+        found = [(doc_id, self._positions[doc_id]) for doc_id in doc_ids if doc_id in self._positions]
+        if not found:
+            return {}
+        components = self.engine.score_documents(query, np.asarray([doc_no for _, doc_no in found], dtype=np.int64))
+        return {
+            doc_id: {key: float(values[i]) for key, values in components.items()}
+            for i, (doc_id, _) in enumerate(found)
+        }
+
+
+class CorpusStore:
+    """모든 요청이 공유하는 컬렉션별 스냅샷 저장소
+
+    백그라운드 동기화가 추가·변경·삭제된 문서만 반영한 새 스냅샷을 만들어
+    참조를 한 번에 교체한다. 진행 중인 검색은 이전 스냅샷을 끝까지 사용하고,
+    스냅샷이 아직 없는 최초 로드만 요청이 기다린다.
+    shared 모드에서는 직접 구축하지 않고 로더 프로세스가 게시한 공유 메모리 색인에 연결한다.
+    """
+
+    def __init__(self, ttl: float = CORPUS_SNAPSHOT_TTL,
+                 count_check_interval: float = CORPUS_COUNT_CHECK_INTERVAL,
+                 index_dir: Optional[str] = CORPUS_INDEX_DIR,
+                 sync_interval: float = CORPUS_SYNC_INTERVAL,
+                 shared: bool = CORPUS_SHARED_MEMORY):
+        self.ttl = ttl
+        self.count_check_interval = count_check_interval
+        self.index_dir = index_dir
+        self.sync_interval = sync_interval
+        self.shared = shared
+        self.snapshots: Dict[str, CorpusSnapshot] = {}
+        self._version = 0
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._load_locks: Dict[str, asyncio.Lock] = {}
+        self._disk_missing: Dict[str, float] = {}     # 컬렉션 → 디스크 스냅샷이 없었던 시각
+        self._sync_tasks: Dict[str, asyncio.Task] = {}
+        self._sync_loop_task: Optional[asyncio.Task] = None
+
+    async def get(self, client: AsyncQdrantClient, collection: str) -> CorpusSnapshot:
+        """현재 스냅샷 반환 (없으면 구축될 때까지 대기)"""
+        snapshot = await self.get_ready(client, collection)
+        if snapshot is None:
+            # 최초 로드는 요청이 직접 기다림
+            async with self._lock(collection):
+                snapshot = self.snapshots.get(collection)
+                if snapshot is None:
+                    snapshot = await self.refresh(client, collection)
+        return snapshot
+
+    async def get_ready(self, client: AsyncQdrantClient, collection: str) -> Optional[CorpusSnapshot]:
+        """메모리·공유 메모리·디스크에 준비된 스냅샷 반환 (없으면 None)
+
+        만료 또는 변경 감지 시 백그라운드 동기화를 예약하고 현재 스냅샷을 그대로 반환한다.
+        """
+        snapshot = self.snapshots.get(collection)
+        if snapshot is None and self.shared:
+            # 구축 중인 동기화(_lock)를 기다리지 않도록 로드 전용 잠금 사용
+            async with self._load_lock(collection):
+                snapshot = self.snapshots.get(collection) or await self._attach_shared(collection)
+        if snapshot is None:
+            snapshot = await self._load_from_disk(collection)
+        if snapshot is not None and await self._is_stale(client, snapshot):
+            self.schedule_sync(client, collection)
+        return snapshot
+
+    def _lock(self, collection: str) -> asyncio.Lock:
+        """동기화(구축) 잠금"""
+        return self._locks.setdefault(collection, asyncio.Lock())
+
+    def _load_lock(self, collection: str) -> asyncio.Lock:
+        """디스크·공유 메모리 로드 잠금 (구축이 진행 중이어도 바로 확인할 수 있도록 동기화 잠금과 분리)"""
+        return self._load_locks.setdefault(collection, asyncio.Lock())
+
+    def _recently_missing(self, collection: str) -> bool:
+        missing_at = self._disk_missing.get(collection)
+        return missing_at is not None and time.monotonic() - missing_at < self.count_check_interval
+
+    async def _load_from_disk(self, collection: str) -> Optional[CorpusSnapshot]:
+        """디스크 mmap 스냅샷이 있으면 로드 (워커 시작 시 전체 스크롤 생략)
+
+        스냅샷이 없었던 컬렉션은 count_check_interval 동안 다시 확인하지 않는다.
+        """
+        if not self.index_dir or self._recently_missing(collection):
+            return None
+        from app.utils import index_store
+
+        async with self._load_lock(collection):
+            if collection in self.snapshots:
+                return self.snapshots[collection]
+            if self._recently_missing(collection):
+                # 잠금을 기다리는 동안 다른 요청이 확인함
+                return None
+            try:
+                snapshot = await asyncio.to_thread(index_store.load_snapshot, collection, self._version + 1, self.index_dir)
+            except Exception as e:
+                print(f"[CORPUS] 디스크 스냅샷 로드 실패: {e}")
+                snapshot = None
+            if snapshot is None:
+                self._disk_missing[collection] = time.monotonic()
+                return None
+            self._disk_missing.pop(collection, None)
+            if collection in self.snapshots:
+                # 로드하는 동안 동기화가 더 새로운 스냅샷을 게시함
+                return self.snapshots[collection]
+
+            self._version += 1
+            self.snapshots[collection] = snapshot
+            print(f"[CORPUS] 디스크 스냅샷 v{snapshot.version} mmap 로드: 문서 {len(snapshot)}건, 용어 {snapshot.num_terms}개")
+            return snapshot
+
+    async def _attach_shared(self, collection: str) -> Optional[CorpusSnapshot]:
+        """로더가 공유 메모리에 게시한 최신 스냅샷 연결 (게시본이 없으면 None)"""
+        from app.utils import shared_index
+
+        manifest = shared_index.read_manifest(collection, self.index_dir)
+        if manifest is None:
+            return None
+        current = self.snapshots.get(collection)
+        if current is not None and current.segment == manifest["segment"]:
+            return current
+        try:
+            snapshot = await asyncio.to_thread(shared_index.shared_attacher.attach, manifest, self._version + 1)
+        except FileNotFoundError:
+            # 매니페스트를 읽은 직후 로더가 세그먼트를 교체한 경우 다음 주기에 재시도
+            return current
+
+        self._version += 1
+        self._publish(snapshot)
+        print(f"[CORPUS] 공유 메모리 스냅샷 v{snapshot.version} 연결: {snapshot.segment}, 문서 {len(snapshot)}건")
+        return snapshot
+
+    async def _is_stale(self, client: AsyncQdrantClient, snapshot: CorpusSnapshot) -> bool:
+        """TTL 만료 또는 포인트 수 변경 여부 확인"""
+        now = time.monotonic()
+        if now - snapshot.loaded_at >= self.ttl:
+            print(f"[CORPUS] 스냅샷 TTL 만료: {snapshot.collection}")
+            return True
+        if now - snapshot.checked_at < self.count_check_interval:
+            return False
+
+        snapshot.checked_at = now
+        point_count = await count_points(client, snapshot.collection)
+        if point_count != snapshot.point_count:
+            print(f"[CORPUS] 포인트 수 변경 감지: {snapshot.point_count} → {point_count}")
+            return True
+        return False
+
+    def _publish(self, snapshot: CorpusSnapshot):
+        """새 스냅샷으로 참조 교체 (이전 스냅샷은 참조가 남은 동안 유지)"""
+        self.snapshots[snapshot.collection] = snapshot
+
+    async def refresh(self, client: AsyncQdrantClient, collection: str) -> CorpusSnapshot:
+        """컬렉션 전체를 페이지 단위로 다시 읽어 스냅샷 교체"""
+        point_count = await count_points(client, collection)
+        documents = await scroll_all_documents(client, collection)
+
+        self._version += 1
+        # 색인 구축은 CPU 작업이므로 스레드에서 실행
+        snapshot = await asyncio.to_thread(CorpusSnapshot.build, collection, documents, point_count, self._version)
+        self._publish(snapshot)
+        print(f"[CORPUS] 스냅샷 v{snapshot.version} 로드: 문서 {len(snapshot)}건, 용어 {snapshot.num_terms}개")
+        return snapshot
+
+    async def sync(self, client: AsyncQdrantClient, collection: str) -> CorpusSnapshot:
+        """추가·변경·삭제된 문서만 반영 (스냅샷이 없거나 TTL 이 지나면 전체 재구축)"""
+        async with self._lock(collection):
+            if self.shared:
+                attached = await self._attach_shared(collection)
+                if attached is not None:
+                    return attached
+                print(f"[CORPUS] 공유 메모리 게시본 없음, 워커에서 직접 구축: {collection}")
+
+            snapshot = self.snapshots.get(collection)
+            if snapshot is None or time.monotonic() - snapshot.loaded_at >= self.ttl:
+                return await self.refresh(client, collection)
+
+            point_count = await count_points(client, collection)
+            documents = await scroll_all_documents(client, collection)
+            changed, deleted = await asyncio.to_thread(snapshot.diff, documents)
+            snapshot.checked_at = time.monotonic()
+            if not changed and not deleted:
+                snapshot.point_count = point_count
+                return snapshot
+
+            self._version += 1
+            updated = await asyncio.to_thread(snapshot.apply_delta, changed, deleted, point_count, self._version)
+            self._publish(updated)
+            print(f"[CORPUS] 증분 동기화 v{updated.version}: 추가·변경 {len(changed)}건, 삭제 {len(deleted)}건 (문서 {len(updated)}건)")
+            return updated
+
+    def schedule_sync(self, client: AsyncQdrantClient, collection: str) -> asyncio.Task:
+        """백그라운드 동기화 예약 (이미 진행 중이면 기존 작업 반환)"""
+        task = self._sync_tasks.get(collection)
+        if task is None or task.done():
+            task = asyncio.create_task(self._run_sync(client, collection))
+            self._sync_tasks[collection] = task
+        return task
+
+    async def _run_sync(self, client: AsyncQdrantClient, collection: str):
+        try:
+            await self.sync(client, collection)
+        except Exception as e:
+            print(f"[CORPUS] 동기화 실패 ({collection}): {e}")
+
+    async def _sync_loop(self, connection: QdrantConnection, collections: List[str]):
+        """기본 컬렉션과 로드된 컬렉션을 주기적으로 증분 동기화"""
+        while True:
+            for collection in sorted(set(collections) | set(self.snapshots)):
+                try:
+                    if not await connection.has_collection(collection):
+                        continue
+                    if collection not in self.snapshots:
+                        await self._load_from_disk(collection)
+                    client = await connection.get_client()
+                    await self.schedule_sync(client, collection)
+                except Exception as e:
+                    print(f"[CORPUS] 동기화 실패 ({collection}): {e}")
+            await asyncio.sleep(self.sync_interval)
+
+    def start_sync(self, connection: QdrantConnection, collections: List[str]):
+        """백그라운드 동기화 태스크 시작"""
+        if self._sync_loop_task is None:
+            self._sync_loop_task = asyncio.create_task(self._sync_loop(connection, collections))
+
+    async def stop_sync(self):
+        """백그라운드 동기화 태스크 중단"""
+        tasks = list(self._sync_tasks.values())
+        if self._sync_loop_task is not None:
+            tasks.append(self._sync_loop_task)
+            self._sync_loop_task = None
+        self._sync_tasks.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def invalidate(self, collection: Optional[str] = None):
+        """스냅샷 폐기 (다음 조회 시 재로드)"""
+        if collection is None:
+            self.snapshots.clear()
+            self._disk_missing.clear()
+        else:
+            self.snapshots.pop(collection, None)
+            self._disk_missing.pop(collection, None)
+
+
+# 프로세스 전역 스냅샷 저장소
+corpus_store = CorpusStore()
+
+
+async def start_corpus_sync():
+    """애플리케이션 시작 시 기본 컬렉션 증분 동기화 시작"""
+    corpus_store.start_sync(get_qdrant_connection(), [QDRANT_COLLECTION])
+
+
+async def close_corpus_sync():
+    """애플리케이션 종료 시 동기화 중단"""
+    await corpus_store.stop_sync()
@@ -0,0 +1,64 @@
+import time
+import asyncio
+from typing import Any, AsyncIterator, Awaitable, Mapping, Optional
+from app.utils.config import RAG_REQUEST_BUDGET
+
+
+def new_deadline(budget: float = RAG_REQUEST_BUDGET) -> float:
+    """요청 마감 시각 (time.monotonic 기준)"""
+    return time.monotonic() + budget
+
+
+def remaining_budget(state: Mapping[str, Any]) -> Optional[float]:
+    """상태의 마감 시각까지 남은 시간 (마감 시각이 없으면 None)"""
+    deadline = state.get('deadline')
+    if deadline is None:
+        return None
+    return max(0.0, deadline - time.monotonic())
+
+
+def has_budget(state: Mapping[str, Any], needed: float) -> bool:
+    """남은 시간이 needed 초 이상인지 (마감 시각이 없으면 항상 True)"""
+    remaining = remaining_budget(state)
+    return remaining is None or remaining >= needed
+
+
+def upstream_timeout(state: Mapping[str, Any], reserve: float = 0.0, default: Optional[float] = None) -> Optional[float]:
+    """외부 호출 타임아웃: 남은 시간에서 이후 단계 몫(reserve)을 뺀 값 (마감 시각이 없으면 default)"""
+    remaining = remaining_budget(state)
+    if remaining is None:
+        return default
+    return max(0.0, remaining - reserve)
+
+
+async def run_within(aw: Awaitable[Any], timeout: Optional[float], default: Any, label: str) -> Any:
+    """timeout 안에 끝나지 않으면 취소하고 default 반환"""
+    try:
+        return await asyncio.wait_for(aw, timeout)
+    except asyncio.TimeoutError:
+        print(f"[DEADLINE] {label}: {timeout:.1f}초 초과로 중단")
+        return default
+
+
+async def iter_within(stream: AsyncIterator[Any], timeout: Optional[float], label: str) -> AsyncIterator[Any]:
+    """스트림을 timeout 초 안에 받은 항목까지만 전달 (초과 시 스트림을 닫고 asyncio.TimeoutError)"""
+    if timeout is None:
+        async for item in stream:
+            yield item
+        return
+
+    stop_at = time.monotonic() + timeout
+    try:
+        while True:
+            try:
+                item = await asyncio.wait_for(stream.__anext__(), max(0.0, stop_at - time.monotonic()))
+            except StopAsyncIteration:
+                return
+            except asyncio.TimeoutError:
+                print(f"[DEADLINE] {label}: {timeout:.1f}초 초과로 스트림 중단")
+                raise
+            yield item
+    finally:
+        aclose = getattr(stream, "aclose", None)
+        if aclose is not None:
+            await aclose()
@@ -0,0 +1,256 @@
+import re
+import sys
+import hashlib
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
+from app.utils.config import RAG_FEATURE_CACHE_SIZE
+
+# 검색 공통 불용어
+STOPWORDS = {'은', '는', '이', '가', '을', '를', '에', '에서', '와', '과', '의', '로', '으로', '한', '하는', '하다', '있다', '없다', '그', '그것', '이것', '저것'}
+
+# 결합 유사도 가중치 (자카드 0.4, 코사인 0.6)
+JACCARD_WEIGHT = 0.4
+COSINE_WEIGHT = 0.6
+
+# array('H') 로 저장 가능한 최대 용어 빈도
+MAX_TERM_COUNT = 0xFFFF
+
+# array('I') 로 저장 가능한 최대 용어 ID (사전에 없는 쿼리 토큰의 임시 ID 는 여기서부터 역순)
+MAX_TERM_ID = 0xFFFFFFFF
+
+_NON_WORD = re.compile(r'[^가-힣a-zA-Z0-9\s]')
+
+
+def tokenize(text: str) -> List[str]:
+    """텍스트 전처리 및 토큰화"""
+    # 특수문자 제거 및 소문자 변환
+    text = _NON_WORD.sub(' ', text.lower())
+    # 불용어 제거 및 길이 2 이상 토큰만 유지
+    return [token for token in text.split() if token not in STOPWORDS and len(token) >= 2]
+
+
+def term_frequencies(tokens: List[str]) -> Dict[str, int]:
+    """토큰 목록의 TF 계산"""
+    tf = {}
+    for token in tokens:
+        tf[token] = tf.get(token, 0) + 1
+    return tf
+
+
+def build_document_text(payload: dict) -> str:
+    """문서 텍스트 추출 (제목 + 내용)"""
+    doc_title = payload.get('document_name', '')
+    vector_data = payload.get("vector", {})
+    # vector가 dict인지 확인 후 특정 키값만 추출
+    doc_content = vector_data.get("text") if isinstance(vector_data, dict) else None
+    return f"{doc_title} {doc_content}"
+
+
+def compact_payload(payload: dict, fields: Iterable[str]) -> dict:
+    """점수 계산 후 메모리에 유지할 최소 payload 필드만 추출"""
+    return {field: payload[field] for field in fields if field in payload}
+
+
+def combine_scores(jaccard: float, cosine: float) -> float:
+    """자카드와 코사인 유사도를 결합한 최종 유사도"""
+    return (jaccard * JACCARD_WEIGHT) + (cosine * COSINE_WEIGHT)
+
+
+class Vocabulary:
+    """토큰 문자열 ↔ 정수 ID 사전 (토큰마다 문자열 1개만 유지)"""
+
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.terms: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def intern(self, term: str) -> int:
+        """토큰 ID 반환 (처음 보는 토큰이면 새로 등록)"""
+        term_id = self.ids.get(term)
+        if term_id is None:
+            term_id = len(self.terms)
+            term = sys.intern(term)
+            self.ids[term] = term_id
+            self.terms.append(term)
+        return term_id
+
+    def lookup(self, term: str) -> Optional[int]:
+        """등록된 토큰 ID 조회 (없으면 None, 사전에 추가하지 않음)"""
+        return self.ids.get(term)
+
+
+# 프로세스 전역 토큰 사전 (전역 문서 특징 저장소용)
+# 쿼리 토큰은 등록하지 않고, 스냅샷/스트리밍 색인은 구축 동안만 쓰는 별도 사전을 사용한다.
+vocabulary = Vocabulary()
+
+
+class DocumentFeatures:
+    """토큰화 결과의 압축 표현
+
+    정렬된 용어 ID array('I') 와 같은 순서의 빈도 array('H'), 토큰 수, L2 노름만 보관한다.
+    자카드 교집합과 TF 내적은 정렬된 정수 배열 위에서 계산한다.
+    """
+
+    __slots__ = ('term_ids', 'counts', 'length', 'norm')
+
+    def __init__(self, term_ids: array, counts: array, length: int, norm: float):
+        self.term_ids = term_ids
+        self.counts = counts
+        self.length = length
+        self.norm = norm
+
+    @classmethod
+    def from_tf(cls, tf: Dict[str, int], vocab: Optional[Vocabulary] = None) -> "DocumentFeatures":
+        """토큰 빈도 사전을 용어 ID 순으로 정렬한 배열로 변환"""
+        vocab = vocab if vocab is not None else vocabulary
+        return cls._from_pairs([(vocab.intern(term), count) for term, count in tf.items()], sum(tf.values()))
+
+    @classmethod
+    def from_text(cls, text: str, vocab: Optional[Vocabulary] = None) -> "DocumentFeatures":
+        return cls.from_tf(term_frequencies(tokenize(text)), vocab)
+
+    @classmethod
+    def for_query(cls, text: str, vocab: Optional[Vocabulary] = None) -> "DocumentFeatures":
+        """쿼리 특징 계산 (사전에 토큰을 추가하지 않음)
+
+        사전에 없는 토큰은 어떤 문서와도 일치하지 않으므로 실제 ID 와 겹치지 않는 임시 ID 를 부여한다.
+        """
+        vocab = vocab if vocab is not None else vocabulary
+        tf = term_frequencies(tokenize(text))
+        pairs = []
+        unknown = 0
+        for term, count in tf.items():
+            term_id = vocab.lookup(term)
+            if term_id is None:
+                term_id = MAX_TERM_ID - unknown
+                unknown += 1
+            pairs.append((term_id, count))
+        return cls._from_pairs(pairs, sum(tf.values()))
+
+    @classmethod
+    def _from_pairs(cls, pairs: List[Tuple[int, int]], length: int) -> "DocumentFeatures":
+        """(용어 ID, 빈도) 목록을 용어 ID 순으로 정렬한 배열로 변환"""
+        pairs = sorted((term_id, min(count, MAX_TERM_COUNT)) for term_id, count in pairs)
+        counts = array('H', (count for _, count in pairs))
+        return cls(
+            array('I', (term_id for term_id, _ in pairs)),
+            counts,
+            length,
+            sum(c * c for c in counts) ** 0.5
+        )
+
+    @property
+    def unique(self) -> int:
+        """고유 토큰 수"""
+        return len(self.term_ids)
+
+    def items(self, vocab: Optional[Vocabulary] = None) -> Iterator[Tuple[str, int]]:
+        """(토큰 문자열, 빈도) 순회"""
+        terms = (vocab if vocab is not None else vocabulary).terms
+        for term_id, count in zip(self.term_ids, self.counts):
+            yield terms[term_id], count
+
+    def _intersect(self, other: "DocumentFeatures") -> Tuple[int, int]:
+        """(공통 용어 수, TF 내적) - 짧은 배열을 순회하며 긴 배열을 이분 탐색"""
+        small, large = (self, other) if len(self.term_ids) <= len(other.term_ids) else (other, self)
+        large_ids, large_counts = large.term_ids, large.counts
+        common = dot = 0
+        position = 0
+        end = len(large_ids)
+        for term_id, count in zip(small.term_ids, small.counts):
+            position = bisect_left(large_ids, term_id, position)
+            if position == end:
+                break
+            if large_ids[position] == term_id:
+                common += 1
+                dot += count * large_counts[position]
+        return common, dot
+
+    def jaccard(self, other: "DocumentFeatures") -> float:
+        """자카드 유사도 계산"""
+        if not self.term_ids and not other.term_ids:
+            return 1.0
+        if not self.term_ids or not other.term_ids:
+            return 0.0
+        common, _ = self._intersect(other)
+        return common / (len(self.term_ids) + len(other.term_ids) - common)
+
+    def cosine(self, other: "DocumentFeatures") -> float:
+        """코사인 유사도 계산 (TF 기반)"""
+        if not self.term_ids and not other.term_ids:
+            return 1.0
+        if self.norm == 0 or other.norm == 0:
+            return 0.0
+        _, dot = self._intersect(other)
+        return dot / (self.norm * other.norm)
+
+    def similarity(self, other: "DocumentFeatures") -> float:
+        """자카드와 코사인 유사도를 결합한 최종 유사도 (교집합은 한 번만 계산)"""
+        if not self.term_ids or not other.term_ids:
+            return combine_scores(self.jaccard(other), self.cosine(other))
+        common, dot = self._intersect(other)
+        jaccard = common / (len(self.term_ids) + len(other.term_ids) - common)
+        return combine_scores(jaccard, dot / (self.norm * other.norm))
+
+
+def document_fingerprint(text: str) -> str:
+    """문서 버전 식별용 텍스트 해시"""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class FeatureStore:
+    """문서 ID별 토큰 통계 캐시
+
+    문서 텍스트 해시가 같으면 기존 특징을 재사용하므로
+    문서 한 버전당 토큰화는 한 번만 수행된다.
+    max_size 를 지정하면 가장 오래 쓰이지 않은 항목부터 제거한다.
+    vocab 을 지정하지 않으면 저장소 전용 사전을 만들어 저장소와 함께 해제되도록 한다.
+    """
+
+    def __init__(self, max_size: Optional[int] = None, vocab: Optional[Vocabulary] = None):
+        self.max_size = max_size
+        self.vocab = vocab if vocab is not None else Vocabulary()
+        self._entries: "OrderedDict[Any, Tuple[str, DocumentFeatures]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, doc_id: Any, payload: dict, store: bool = True) -> DocumentFeatures:
+        """문서 특징 조회 (없거나 내용이 바뀐 경우 새로 계산)
+
+        store 가 False 면 새로 계산한 특징을 저장하지 않는다 (본문이 없는 축약 payload 등).
+        """
+        text = build_document_text(payload)
+        fingerprint = document_fingerprint(text)
+        entry = self._entries.get(doc_id)
+        if entry is not None and entry[0] == fingerprint:
+            self.hits += 1
+            self._entries.move_to_end(doc_id)
+            return entry[1]
+
+        self.misses += 1
+        features = DocumentFeatures.from_text(text, self.vocab)
+        if not store:
+            return features
+        self._entries[doc_id] = (fingerprint, features)
+        self._entries.move_to_end(doc_id)
+        if self.max_size is not None:
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return features
+
+    def retain(self, doc_ids: Iterable[Any]):
+        """주어진 문서 외의 항목 제거 (삭제된 문서 정리)"""
+        keep = set(doc_ids)
+        for doc_id in [doc_id for doc_id in self._entries if doc_id not in keep]:
+            del self._entries[doc_id]
+
+
+# 프로세스 전역 문서 특징 저장소 (재순위 단계의 후보 문서용, 크기 제한)
+feature_store = FeatureStore(max_size=RAG_FEATURE_CACHE_SIZE, vocab=vocabulary)
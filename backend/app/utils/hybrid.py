@@ -0,0 +1,132 @@
+import heapq
+import asyncio
+import hashlib
+import importlib
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from qdrant_client import AsyncQdrantClient, models
+from app.utils.config import (
+    HYBRID_EMBEDDING_FUNCTION, HYBRID_VECTOR_NAME, HYBRID_FUSION,
+    HYBRID_DENSE_WEIGHT, HYBRID_RRF_K, CORPUS_COMPACT_FIELDS
+)
+from app.utils.features import tokenize
+from app.utils.metrics import track_qdrant
+
+# 텍스트 목록 → 벡터 목록
+EmbeddingFunction = Callable[[List[str]], List[List[float]]]
+
+# (문서 ID, 점수) 순위 목록
+RankedList = List[Tuple[Any, float]]
+
+
+class HashingEmbedding:
+    """토큰 해싱 기반 로컬 임베딩 (외부 모델 없이 쓸 수 있는 기본 구현)"""
+
+    def __init__(self, dim: int = 256):
+        self.dim = dim
+
+    def __call__(self, texts: List[str]) -> List[List[float]]:
+        vectors = []
+        for text in texts:
+            vector = [0.0] * self.dim
+            for token in tokenize(text):
+                digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+                bucket = int.from_bytes(digest[:4], "little") % self.dim
+                sign = 1.0 if digest[4] & 1 else -1.0
+                vector[bucket] += sign
+            norm = sum(v * v for v in vector) ** 0.5
+            vectors.append([v / norm for v in vector] if norm else vector)
+        return vectors
+
+
+def load_embedding_function(path: Optional[str]) -> Optional[EmbeddingFunction]:
+    """'모듈:속성' 경로로 임베딩 함수 로드"""
+    if not path:
+        return None
+    module_name, _, attr = path.partition(":")
+    target = getattr(importlib.import_module(module_name), attr)
+    # 클래스가 지정되면 기본 인자로 인스턴스 생성
+    return target() if isinstance(target, type) else target
+
+
+_embedding_function: Optional[EmbeddingFunction] = None
+_embedding_loaded = False
+
+
+def set_embedding_function(function: Optional[EmbeddingFunction]):
+    """하이브리드 검색에 사용할 임베딩 함수 지정"""
+    global _embedding_function, _embedding_loaded
+    _embedding_function = function
+    _embedding_loaded = True
+
+
+def get_embedding_function() -> Optional[EmbeddingFunction]:
+    """설정된 임베딩 함수 반환 (최초 호출 시 설정 경로에서 로드)"""
+    global _embedding_function, _embedding_loaded
+    if not _embedding_loaded:
+        _embedding_function = load_embedding_function(HYBRID_EMBEDDING_FUNCTION)
+        _embedding_loaded = True
+    return _embedding_function
+
+
+def _top(scores: Dict[Any, float], top_k: Optional[int]) -> RankedList:
+    """점수 내림차순 목록 (top_k 지정 시 힙으로 상위만 선택)"""
+    if top_k is None:
+        return sorted(scores.items(), key=lambda x: x[1], reverse=True)
+    return heapq.nlargest(top_k, scores.items(), key=lambda x: x[1])
+
+
+def reciprocal_rank_fusion(ranked_lists: List[RankedList], weights: Optional[List[float]] = None,
+                           k: int = HYBRID_RRF_K, top_k: Optional[int] = None) -> RankedList:
+    """순위 역수 합 융합 (모든 목록 1위 문서가 1.0 이 되도록 정규화)"""
+    weights = weights or [1.0] * len(ranked_lists)
+    scores: Dict[Any, float] = {}
+    for ranked, weight in zip(ranked_lists, weights):
+        for rank, (doc_id, _) in enumerate(ranked, start=1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + weight / (k + rank)
+
+    best = sum(weight / (k + 1) for weight in weights) or 1.0
+    return [(doc_id, score / best) for doc_id, score in _top(scores, top_k)]
+
+
+def weighted_score_fusion(ranked_lists: List[RankedList], weights: Optional[List[float]] = None,
+                          top_k: Optional[int] = None) -> RankedList:
+    """원점수 가중 합 융합 (목록에 없는 문서는 0점)"""
+    weights = weights or [1.0 / len(ranked_lists)] * len(ranked_lists)
+    scores: Dict[Any, float] = {}
+    for ranked, weight in zip(ranked_lists, weights):
+        for doc_id, score in ranked:
+            scores[doc_id] = scores.get(doc_id, 0.0) + weight * max(score, 0.0)
+    return _top(scores, top_k)
+
+
+FUSION_STRATEGIES: Dict[str, Callable[..., RankedList]] = {
+    "rrf": reciprocal_rank_fusion,
+    "weighted": weighted_score_fusion,
+}
+
+
+def fuse_rankings(lexical: RankedList, dense: RankedList, strategy: str = HYBRID_FUSION,
+                  dense_weight: float = HYBRID_DENSE_WEIGHT, top_k: Optional[int] = None) -> RankedList:
+    """어휘 검색과 벡터 검색 순위를 지정한 전략으로 융합"""
+    fusion = FUSION_STRATEGIES.get(strategy)
+    if fusion is None:
+        raise ValueError(f"지원하지 않는 융합 전략: {strategy}")
+    return fusion([lexical, dense], [1.0 - dense_weight, dense_weight], top_k=top_k)
+
+
+async def dense_search(client: AsyncQdrantClient, collection: str, queries: List[str], limit: int,
+                       embed: EmbeddingFunction, vector_name: Optional[str] = HYBRID_VECTOR_NAME,
+                       payload_fields: Optional[List[str]] = CORPUS_COMPACT_FIELDS) -> List[List[models.ScoredPoint]]:
+    """쿼리별 Qdrant 벡터(ANN) 검색 결과 반환 (payload 는 축약 필드만)"""
+    # 로컬 임베딩은 CPU 작업이므로 스레드에서 실행
+    vectors = await asyncio.to_thread(embed, queries)
+    requests = [
+        models.SearchRequest(
+            vector=models.NamedVector(name=vector_name, vector=vector) if vector_name else vector,
+            limit=limit,
+            with_payload=models.PayloadSelectorInclude(include=payload_fields) if payload_fields else True
+        )
+        for vector in vectors
+    ]
+    with track_qdrant("search_batch"):
+        return await client.search_batch(collection_name=collection, requests=requests)
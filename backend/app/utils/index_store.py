@@ -0,0 +1,269 @@
+"""mmap 색인 스냅샷 저장/로드
+
+용어 사전, 포스팅 리스트, 문서 노름, ID 매핑, 문서 해시를 평면 배열(.npy)로 저장하고
+워커는 np.load(mmap_mode='r') 로 읽어 같은 물리 페이지를 공유한다.
+용어 사전도 해시 정렬 배열로 저장해 워커마다 파이썬 dict 를 다시 만들지 않는다.
+
+오프라인 생성:
+    python -m app.utils.index_store --collection RC
+"""
+import os
+import json
+import time
+import shutil
+import asyncio
+import hashlib
+import argparse
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+import numpy as np
+from scipy import sparse
+from qdrant_client import AsyncQdrantClient
+from app.utils.config import (
+    QDRANT_HOST, QDRANT_PORT, QDRANT_COLLECTION, CORPUS_INDEX_DIR, CORPUS_INDEX_KEEP
+)
+from app.utils.corpus import CorpusSnapshot, scroll_all_documents, count_points
+from app.utils.matrix_scoring import SparseScoringEngine
+
+INDEX_FORMAT_VERSION = 3
+CURRENT_FILE = "CURRENT"
+META_FILE = "meta.json"
+
+
+class StringTable(Sequence):
+    """바이트 블롭 + 오프셋 배열 기반 읽기 전용 문자열 목록"""
+
+    def __init__(self, blob: np.ndarray, offsets: np.ndarray, decode: Optional[Callable[[str], Any]] = None):
+        self.blob = blob
+        self.offsets = offsets
+        self.decode = decode
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> Any:
+        value = bytes(self.blob[self.offsets[i]:self.offsets[i + 1]]).decode("utf-8")
+        return self.decode(value) if self.decode else value
+
+    def __iter__(self) -> Iterator[Any]:
+        for i in range(len(self)):
+            yield self[i]
+
+
+class IntIdTable(Sequence):
+    """정수 ID 배열을 파이썬 int 로 돌려주는 읽기 전용 목록"""
+
+    def __init__(self, ids: np.ndarray):
+        self.ids = ids
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, i: int) -> int:
+        return int(self.ids[i])
+
+    def __iter__(self) -> Iterator[int]:
+        for value in self.ids:
+            yield int(value)
+
+
+def term_hash(term: str) -> int:
+    """프로세스와 무관하게 고정된 64비트 용어 해시 (파이썬 hash() 는 프로세스마다 다름)"""
+    return int.from_bytes(hashlib.blake2b(term.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class TermTable(Mapping):
+    """용어 → 행 번호 읽기 전용 사전
+
+    정렬된 용어 해시 배열을 이진 탐색하고 문자열을 비교해 확인하므로
+    mmap/공유 메모리 배열을 그대로 쓰고 프로세스마다 dict 를 만들지 않는다.
+    """
+
+    def __init__(self, terms: StringTable, hashes: np.ndarray, rows: np.ndarray):
+        self.terms = terms      # 행 번호 순 용어
+        self.hashes = hashes    # 오름차순 용어 해시
+        self.rows = rows        # 해시 순서별 행 번호
+
+    def __getitem__(self, term: str) -> int:
+        key = np.uint64(term_hash(term))
+        i = int(np.searchsorted(self.hashes, key))
+        # 해시 충돌이면 같은 해시 구간을 차례로 비교
+        while i < len(self.hashes) and self.hashes[i] == key:
+            row = int(self.rows[i])
+            if self.terms[row] == term:
+                return row
+            i += 1
+        raise KeyError(term)
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.terms)
+
+
+def encode_strings(strings: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """문자열 목록을 (UTF-8 블롭, 오프셋) 배열로 변환"""
+    encoded = [value.encode("utf-8") for value in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(value) for value in encoded], out=offsets[1:])
+    blob = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+    return blob, offsets
+
+
+def snapshot_arrays(snapshot: CorpusSnapshot) -> Tuple[dict, Dict[str, np.ndarray]]:
+    """스냅샷을 (메타데이터, 평면 배열) 로 분해"""
+    engine = snapshot.engine
+    term_doc = engine.term_doc
+    doc_ids = list(snapshot.doc_ids)
+    int_ids = all(isinstance(doc_id, int) for doc_id in doc_ids)
+
+    terms = list(engine.vocabulary)
+    vocab_blob, vocab_offsets = encode_strings(terms)
+    hashes = np.fromiter((term_hash(term) for term in terms), dtype=np.uint64, count=len(terms))
+    hash_order = np.argsort(hashes, kind="stable")
+    payload_blob, payload_offsets = encode_strings(
+        [json.dumps(payload, ensure_ascii=False) for payload in snapshot.payloads]
+    )
+    fingerprint_blob, fingerprint_offsets = encode_strings(list(snapshot.fingerprints))
+    # scipy 가 로드 시 인덱스 배열을 복사(형 변환)하지 않도록 int32 범위면 int32 로 저장
+    index_dtype = np.int32 if max(term_doc.nnz, term_doc.shape[1]) < np.iinfo(np.int32).max else np.int64
+    arrays = {
+        "term_indptr": np.asarray(term_doc.indptr, dtype=index_dtype),
+        "term_docs": np.asarray(term_doc.indices, dtype=index_dtype),
+        "term_tf": np.asarray(term_doc.data, dtype=np.float64),
+        "term_presence": np.asarray(engine.term_doc_binary.data, dtype=np.float64),
+        "doc_unique": np.asarray(engine.doc_unique, dtype=np.float64),
+        "doc_norms": np.asarray(engine.doc_norms, dtype=np.float64),
+        "vocab_blob": vocab_blob,
+        "vocab_offsets": vocab_offsets,
+        "vocab_hashes": hashes[hash_order],
+        "vocab_rows": hash_order.astype(np.int64),
+        "payload_blob": payload_blob,
+        "payload_offsets": payload_offsets,
+        "fingerprint_blob": fingerprint_blob,
+        "fingerprint_offsets": fingerprint_offsets,
+    }
+    if int_ids:
+        arrays["doc_ids"] = np.asarray(doc_ids, dtype=np.int64)
+    else:
+        arrays["doc_id_blob"], arrays["doc_id_offsets"] = encode_strings([str(doc_id) for doc_id in doc_ids])
+
+    meta = {
+        "format": INDEX_FORMAT_VERSION,
+        "collection": snapshot.collection,
+        "point_count": snapshot.point_count,
+        "num_documents": len(doc_ids),
+        "num_terms": len(engine.vocabulary),
+        "id_kind": "int" if int_ids else "str",
+        "created_at": snapshot.created_at,
+    }
+    return meta, arrays
+
+
+def snapshot_from_arrays(meta: dict, arrays: Dict[str, np.ndarray], version: int) -> CorpusSnapshot:
+    """평면 배열로 스냅샷 구성 (배열은 복사하지 않고 그대로 참조)"""
+    num_terms, num_documents = meta["num_terms"], meta["num_documents"]
+    vocab = StringTable(arrays["vocab_blob"], arrays["vocab_offsets"])
+    vocabulary = TermTable(vocab, arrays["vocab_hashes"], arrays["vocab_rows"])
+
+    indices, indptr = arrays["term_docs"], arrays["term_indptr"]
+    term_doc = sparse.csr_matrix((arrays["term_tf"], indices, indptr), shape=(num_terms, num_documents), copy=False)
+    term_doc_binary = sparse.csr_matrix((arrays["term_presence"], indices, indptr), shape=(num_terms, num_documents), copy=False)
+    engine = SparseScoringEngine(vocabulary, term_doc, arrays["doc_unique"], arrays["doc_norms"], term_doc_binary)
+
+    if meta["id_kind"] == "int":
+        doc_ids = IntIdTable(arrays["doc_ids"])
+    else:
+        doc_ids = StringTable(arrays["doc_id_blob"], arrays["doc_id_offsets"])
+    payloads = StringTable(arrays["payload_blob"], arrays["payload_offsets"], decode=json.loads)
+    fingerprints = StringTable(arrays["fingerprint_blob"], arrays["fingerprint_offsets"])
+
+    return CorpusSnapshot(
+        meta["collection"], doc_ids, payloads, fingerprints, engine, meta["point_count"], version,
+        created_at=meta["created_at"]
+    )
+
+
+def write_snapshot(snapshot: CorpusSnapshot, base_dir: str = CORPUS_INDEX_DIR, keep: int = CORPUS_INDEX_KEEP) -> str:
+    """스냅샷을 새 버전 디렉터리에 저장하고 CURRENT 포인터를 원자적으로 교체"""
+    meta, arrays = snapshot_arrays(snapshot)
+    collection_dir = os.path.join(base_dir, snapshot.collection)
+    os.makedirs(collection_dir, exist_ok=True)
+
+    name = f"v{int(snapshot.created_at * 1000)}"
+    tmp_dir = os.path.join(collection_dir, f".tmp-{name}-{os.getpid()}")
+    os.makedirs(tmp_dir)
+    for key, array in arrays.items():
+        np.save(os.path.join(tmp_dir, f"{key}.npy"), array)
+    with open(os.path.join(tmp_dir, META_FILE), "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False)
+
+    target_dir = os.path.join(collection_dir, name)
+    if os.path.exists(target_dir):
+        shutil.rmtree(target_dir)
+    os.rename(tmp_dir, target_dir)
+
+    pointer_tmp = os.path.join(collection_dir, f".{CURRENT_FILE}-{os.getpid()}")
+    with open(pointer_tmp, "w", encoding="utf-8") as f:
+        f.write(name)
+    os.replace(pointer_tmp, os.path.join(collection_dir, CURRENT_FILE))
+
+    # 오래된 버전 정리 (이미 mmap 한 워커는 파일 삭제 후에도 계속 읽을 수 있음)
+    versions = sorted(entry for entry in os.listdir(collection_dir) if entry.startswith("v"))
+    for old in versions[:-keep] if keep > 0 else []:
+        if old != name:
+            shutil.rmtree(os.path.join(collection_dir, old), ignore_errors=True)
+    return target_dir
+
+
+def load_snapshot(collection: str, version: int, base_dir: str = CORPUS_INDEX_DIR) -> Optional[CorpusSnapshot]:
+    """CURRENT 가 가리키는 스냅샷을 mmap 으로 로드 (없으면 None)"""
+    collection_dir = os.path.join(base_dir, collection)
+    try:
+        with open(os.path.join(collection_dir, CURRENT_FILE), encoding="utf-8") as f:
+            snapshot_dir = os.path.join(collection_dir, f.read().strip())
+        with open(os.path.join(snapshot_dir, META_FILE), encoding="utf-8") as f:
+            meta = json.load(f)
+    except FileNotFoundError:
+        return None
+
+    if meta.get("format") != INDEX_FORMAT_VERSION:
+        print(f"[INDEX_STORE] 지원하지 않는 스냅샷 형식: {meta.get('format')}")
+        return None
+
+    arrays = {
+        entry[:-len(".npy")]: np.load(os.path.join(snapshot_dir, entry), mmap_mode="r")
+        for entry in os.listdir(snapshot_dir) if entry.endswith(".npy")
+    }
+    return snapshot_from_arrays(meta, arrays, version)
+
+
+async def build_snapshot_file(collection: str = QDRANT_COLLECTION, host: str = QDRANT_HOST,
+                              port: int = QDRANT_PORT, base_dir: str = CORPUS_INDEX_DIR) -> str:
+    """Qdrant 컬렉션 전체를 스크롤하여 스냅샷 파일 생성"""
+    client = AsyncQdrantClient(host=host, port=port)
+    try:
+        point_count = await count_points(client, collection)
+        documents = await scroll_all_documents(client, collection)
+    finally:
+        await client.close()
+
+    snapshot = CorpusSnapshot.build(collection, documents, point_count, version=0)
+    return write_snapshot(snapshot, base_dir)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Qdrant 컬렉션으로 mmap 색인 스냅샷 생성")
+    parser.add_argument("--collection", default=QDRANT_COLLECTION, help="대상 컬렉션 (기본: QDRANT_COLLECTION)")
+    parser.add_argument("--host", default=QDRANT_HOST, help="Qdrant 호스트")
+    parser.add_argument("--port", type=int, default=QDRANT_PORT, help="Qdrant 포트")
+    parser.add_argument("--output", default=CORPUS_INDEX_DIR, help="스냅샷 디렉터리")
+    args = parser.parse_args(argv)
+
+    started = time.monotonic()
+    path = asyncio.run(build_snapshot_file(args.collection, args.host, args.port, args.output))
+    print(f"[INDEX_STORE] 스냅샷 생성 완료: {path} ({time.monotonic() - started:.1f}초)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+from typing import Iterable, List, Optional
+
+
+class KeywordStreamParser:
+    """쉼표로 구분된 LLM 키워드 스트림 파서
+
+    구분자가 도착하는 즉시 완성된 키워드를 방출하고 중복은 바로 제거한다.
+    전체 응답을 모은 뒤 split 한 결과와 같은 순서·같은 목록을 만든다.
+    """
+
+    def __init__(self, exclude: Iterable[str] = (), limit: Optional[int] = None, separator: str = ","):
+        self.keywords: List[str] = []
+        self.limit = limit
+        self.separator = separator
+        self._seen = set(exclude)
+        self._buffer = ""
+
+    def _accept(self, segment: str) -> Optional[str]:
+        keyword = segment.strip()
+        if not keyword or keyword in self._seen:
+            return None
+        if self.limit is not None and len(self.keywords) >= self.limit:
+            return None
+        self._seen.add(keyword)
+        self.keywords.append(keyword)
+        return keyword
+
+    def feed(self, text: str) -> List[str]:
+        """스트림 청크 추가 후 새로 완성된 키워드 반환"""
+        if self.separator not in text:
+            self._buffer += text
+            return []
+        *segments, self._buffer = (self._buffer + text).split(self.separator)
+        return [keyword for keyword in map(self._accept, segments) if keyword is not None]
+
+    def finish(self) -> List[str]:
+        """스트림 종료 시 마지막 구분자 뒤에 남은 키워드 반환"""
+        segment, self._buffer = self._buffer, ""
+        keyword = self._accept(segment)
+        return [keyword] if keyword is not None else []
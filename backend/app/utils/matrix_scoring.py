@@ -0,0 +1,325 @@
+from array import array
+from typing import List, Dict, Mapping, Optional, Sequence, Tuple
+import numpy as np
+from scipy import sparse
+from app.utils.features import (
+    DocumentFeatures, Vocabulary, vocabulary as global_vocabulary, tokenize, term_frequencies, JACCARD_WEIGHT, COSINE_WEIGHT
+)
+from app.utils.search_index import InvertedIndex, max_score_search
+
+# 문서 번호 구간 [start, end)
+DocRange = Tuple[int, int]
+
+
+class SparseScoringEngine:
+    """CSR 용어-문서 행렬 기반 일괄 유사도 계산기
+
+    한 요청의 모든 쿼리를 하나의 희소 쿼리 행렬로 만들어
+    쿼리×문서 쌍의 자카드/코사인 유사도를 행렬곱 한 번으로 계산한다.
+    """
+
+    def __init__(self, vocabulary: Mapping[str, int], term_doc: sparse.csr_matrix,
+                 doc_unique: np.ndarray, doc_norms: np.ndarray,
+                 term_doc_binary: Optional[sparse.csr_matrix] = None):
+        self.vocabulary = vocabulary
+        self.term_doc = term_doc                      # (용어 수 × 문서 수) TF
+        if term_doc_binary is None:
+            # 희소 구조(indices/indptr)는 공유하고 data 만 1 로 채운 출현 행렬
+            term_doc_binary = sparse.csr_matrix(
+                (np.ones(term_doc.nnz, dtype=term_doc.dtype), term_doc.indices, term_doc.indptr),
+                shape=term_doc.shape, copy=False
+            )
+        self.term_doc_binary = term_doc_binary        # (용어 수 × 문서 수) 출현 여부
+        self.doc_unique = doc_unique
+        self.doc_norms = doc_norms
+        self._term_max_weights: Optional[np.ndarray] = None
+
+    @classmethod
+    def from_index(cls, index: InvertedIndex) -> "SparseScoringEngine":
+        """역색인 포스팅 리스트로 CSR 행렬 구성"""
+        vocabulary = {}
+        indptr = [0]
+        indices = []
+        data = []
+        for term, postings in index.postings.items():
+            vocabulary[term] = len(vocabulary)
+            for doc_no, count in postings:
+                indices.append(doc_no)
+                data.append(count)
+            indptr.append(len(indices))
+
+        term_doc = sparse.csr_matrix(
+            (np.asarray(data, dtype=np.float64), np.asarray(indices, dtype=np.int32), np.asarray(indptr, dtype=np.int64)),
+            shape=(len(vocabulary), len(index))
+        )
+        return cls(
+            vocabulary,
+            term_doc,
+            np.asarray(index.doc_unique, dtype=np.float64),
+            np.asarray(index.doc_norms, dtype=np.float64)
+        )
+
+    @classmethod
+    def from_features(cls, features: Sequence[DocumentFeatures], vocab: Optional[Vocabulary] = None) -> "SparseScoringEngine":
+        """문서 특징 배열로 CSR 행렬을 직접 구성 (역색인을 거치지 않음)
+
+        사전에는 문서에 등장한 용어만 행 번호 순서대로 담는다.
+        """
+        vocab = vocab if vocab is not None else global_vocabulary
+        term_ids = array('I')
+        counts = array('H')
+        for doc_features in features:
+            term_ids.extend(doc_features.term_ids)
+            counts.extend(doc_features.counts)
+        term_ids = np.frombuffer(term_ids, dtype=np.uint32) if len(term_ids) else np.zeros(0, dtype=np.uint32)
+        counts = np.frombuffer(counts, dtype=np.uint16) if len(counts) else np.zeros(0, dtype=np.uint16)
+        doc_unique = np.fromiter((doc_features.unique for doc_features in features), dtype=np.float64, count=len(features))
+        doc_nos = np.repeat(np.arange(len(features), dtype=np.int64), doc_unique.astype(np.int64))
+
+        # 등장한 용어 ID 를 0부터 연속된 행 번호로 변환
+        used, rows = np.unique(term_ids, return_inverse=True)
+        vocabulary = {vocab.terms[term_id]: row for row, term_id in enumerate(used.tolist())}
+        term_doc = sparse.csr_matrix(
+            (counts.astype(np.float64), (rows, doc_nos)), shape=(len(vocabulary), len(features))
+        )
+        return cls(
+            vocabulary,
+            term_doc,
+            doc_unique,
+            np.fromiter((doc_features.norm for doc_features in features), dtype=np.float64, count=len(features))
+        )
+
+    def merge(self, keep: np.ndarray, delta: "SparseScoringEngine") -> "SparseScoringEngine":
+        """keep 문서 열만 남기고 delta 문서를 뒤에 붙인 새 엔진 반환 (기존 엔진은 변경하지 않음)"""
+        vocabulary = dict(self.vocabulary)
+        # delta 용어 행 번호 → 병합 사전의 행 번호
+        delta_rows = np.empty(len(delta.vocabulary), dtype=np.int64)
+        for term, row in delta.vocabulary.items():
+            delta_rows[row] = vocabulary.setdefault(term, len(vocabulary))
+
+        base = self.term_doc[:, keep].tocoo()
+        added = delta.term_doc.tocoo()
+        num_documents = len(keep) + delta.num_documents
+        term_doc = sparse.csr_matrix(
+            (
+                np.concatenate([base.data, added.data]),
+                (np.concatenate([base.row, delta_rows[added.row]]), np.concatenate([base.col, added.col + len(keep)]))
+            ),
+            shape=(len(vocabulary), num_documents)
+        )
+        return SparseScoringEngine(
+            vocabulary,
+            term_doc,
+            np.concatenate([np.asarray(self.doc_unique)[keep], delta.doc_unique]),
+            np.concatenate([np.asarray(self.doc_norms)[keep], delta.doc_norms])
+        )
+
+    @property
+    def num_documents(self) -> int:
+        return self.term_doc.shape[1]
+
+    def _query_matrix(self, queries: List[str]) -> Tuple[sparse.csr_matrix, np.ndarray, np.ndarray]:
+        """쿼리 목록을 (쿼리 수 × 용어 수) TF 행렬로 변환
+
+        사전에 없는 용어는 행렬에서 빠지지만 자카드 합집합과 노름에는 반영된다.
+        """
+        indptr = [0]
+        indices = []
+        data = []
+        query_unique = np.zeros(len(queries), dtype=np.float64)
+        query_norms = np.zeros(len(queries), dtype=np.float64)
+
+        for row, query in enumerate(queries):
+            tf = term_frequencies(tokenize(query))
+            query_unique[row] = len(tf)
+            query_norms[row] = sum(c * c for c in tf.values()) ** 0.5
+            for term, count in tf.items():
+                col = self.vocabulary.get(term)
+                if col is not None:
+                    indices.append(col)
+                    data.append(count)
+            indptr.append(len(indices))
+
+        query_matrix = sparse.csr_matrix(
+            (np.asarray(data, dtype=np.float64), np.asarray(indices, dtype=np.int32), np.asarray(indptr, dtype=np.int64)),
+            shape=(len(queries), len(self.vocabulary))
+        )
+        return query_matrix, query_unique, query_norms
+
+    def _term_rows(self, rows: np.ndarray, doc_range: DocRange) -> sparse.csr_matrix:
+        """용어 행 rows 의 포스팅 중 문서 번호 [start, end) 구간만 담은 (len(rows) × 문서 수) 행렬
+
+        행마다 문서 번호가 정렬되어 있으므로 구간 경계는 이분 탐색으로 찾고 해당 포스팅만 복사한다.
+        문서 번호(열)는 전체 기준 그대로 유지한다.
+        """
+        term_doc = self.term_doc
+        start, end = doc_range
+        lows = np.empty(len(rows), dtype=np.int64)
+        highs = np.empty(len(rows), dtype=np.int64)
+        for i, row in enumerate(rows):
+            lo, hi = term_doc.indptr[row], term_doc.indptr[row + 1]
+            doc_nos = term_doc.indices[lo:hi]
+            lows[i] = lo + np.searchsorted(doc_nos, start)
+            highs[i] = lo + np.searchsorted(doc_nos, end)
+
+        indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum(highs - lows, out=indptr[1:])
+        positions = np.concatenate([np.arange(lo, hi) for lo, hi in zip(lows, highs)]) if len(rows) else np.zeros(0, dtype=np.int64)
+        return sparse.csr_matrix(
+            (term_doc.data[positions], term_doc.indices[positions], indptr), shape=(len(rows), self.num_documents)
+        )
+
+    def score_batch(self, queries: List[str], doc_range: Optional[DocRange] = None) -> sparse.csr_matrix:
+        """(쿼리 수 × 문서 수) 결합 유사도 희소 행렬 계산
+
+        doc_range 를 주면 문서 번호 [start, end) 구간만 계산한다 (샤드 검색용, 행렬 사본을 만들지 않음).
+        """
+        query_matrix, query_unique, query_norms = self._query_matrix(queries)
+
+        if doc_range is None:
+            term_doc, term_doc_binary = self.term_doc, self.term_doc_binary
+        else:
+            # 쿼리에 등장한 용어 행의 구간 포스팅만 사용
+            rows = np.unique(query_matrix.indices)
+            query_matrix = query_matrix[:, rows]
+            term_doc = self._term_rows(rows, doc_range)
+            term_doc_binary = term_doc.copy()
+            term_doc_binary.data = np.ones_like(term_doc_binary.data)
+
+        dots = (query_matrix @ term_doc).tocsr()
+        query_binary = query_matrix.copy()
+        query_binary.data = np.ones_like(query_binary.data)
+        overlaps = (query_binary @ term_doc_binary).tocsr()
+
+        # 두 곱의 희소 구조가 같으므로 정렬 후 data 배열을 원소별로 결합
+        dots.sort_indices()
+        overlaps.sort_indices()
+
+        rows = np.repeat(np.arange(len(queries)), np.diff(dots.indptr))
+        cols = dots.indices
+        jaccard = overlaps.data / (query_unique[rows] + self.doc_unique[cols] - overlaps.data)
+        cosine = dots.data / (query_norms[rows] * self.doc_norms[cols])
+
+        scores = dots.copy()
+        scores.data = (jaccard * JACCARD_WEIGHT) + (cosine * COSINE_WEIGHT)
+
+        # 빈 쿼리는 빈 문서와만 일치 (자카드/코사인 모두 1.0)
+        empty_queries = np.flatnonzero(query_unique == 0)
+        start, end = doc_range if doc_range is not None else (0, self.num_documents)
+        empty_docs = start + np.flatnonzero(np.asarray(self.doc_unique[start:end]) == 0)
+        if len(empty_queries) and len(empty_docs):
+            scores = scores.tolil()
+            for row in empty_queries:
+                scores[row, empty_docs] = 1.0
+            scores = scores.tocsr()
+        return scores
+
+    def score_documents(self, query: str, doc_nos: np.ndarray) -> Dict[str, np.ndarray]:
+        """쿼리 1건과 지정한 문서들 사이의 유사도 구성 요소 (재순위 단계 재사용용)
+
+        반환: 문서별 jaccard, cosine, similarity(결합), overlap(공통 용어 수), dot(TF 내적),
+        doc_terms(고유 용어 수), doc_norm 배열
+        """
+        tf = term_frequencies(tokenize(query))
+        query_unique = float(len(tf))
+        query_norm = sum(c * c for c in tf.values()) ** 0.5
+        doc_nos = np.asarray(doc_nos, dtype=np.int64)
+
+        rows = []
+        counts = []
+        for term, count in tf.items():
+            row = self.vocabulary.get(term)
+            if row is not None:
+                rows.append(row)
+                counts.append(count)
+
+        overlap = np.zeros(len(doc_nos), dtype=np.float64)
+        dot = np.zeros(len(doc_nos), dtype=np.float64)
+        if rows and len(doc_nos):
+            # (쿼리 용어 수 × 후보 문서 수) 부분 행렬만 사용
+            sub = self.term_doc[rows][:, doc_nos].tocsc()
+            dot = np.asarray(sub.T @ np.asarray(counts, dtype=np.float64)).ravel()
+            overlap = np.diff(sub.indptr).astype(np.float64)
+
+        doc_terms = np.asarray(self.doc_unique, dtype=np.float64)[doc_nos]
+        doc_norm = np.asarray(self.doc_norms, dtype=np.float64)[doc_nos]
+        union = query_unique + doc_terms - overlap
+        denominator = query_norm * doc_norm
+        jaccard = np.divide(overlap, union, out=np.zeros_like(overlap), where=union > 0)
+        cosine = np.divide(dot, denominator, out=np.zeros_like(dot), where=denominator > 0)
+        if query_unique == 0:
+            # 빈 쿼리는 빈 문서와만 일치
+            jaccard[doc_terms == 0] = 1.0
+            cosine[doc_terms == 0] = 1.0
+
+        return {
+            "jaccard": jaccard,
+            "cosine": cosine,
+            "similarity": (jaccard * JACCARD_WEIGHT) + (cosine * COSINE_WEIGHT),
+            "overlap": overlap,
+            "dot": dot,
+            "doc_terms": doc_terms,
+            "doc_norm": doc_norm,
+        }
+
+    @property
+    def term_max_weights(self) -> np.ndarray:
+        """용어별 문서 노름으로 나눈 TF 최댓값 (MaxScore 점수 상한 계산용)"""
+        if self._term_max_weights is None:
+            term_doc = self.term_doc
+            max_weights = np.zeros(term_doc.shape[0], dtype=np.float64)
+            non_empty = np.flatnonzero(np.diff(term_doc.indptr))
+            if len(non_empty):
+                weights = term_doc.data / np.asarray(self.doc_norms)[term_doc.indices]
+                max_weights[non_empty] = np.maximum.reduceat(weights, term_doc.indptr[non_empty])
+            self._term_max_weights = max_weights
+        return self._term_max_weights
+
+    def search_top_k(self, query: str, top_k: int = 5, doc_range: Optional[DocRange] = None) -> List[Tuple[int, float]]:
+        """쿼리 1건의 상위 k개를 MaxScore 조기 종료로 검색 (search_batch 와 동일한 결과)
+
+        doc_range 를 주면 각 포스팅에서 문서 번호 [start, end) 구간만 사용한다.
+        (전체 기준 용어별 상한은 구간에서도 유효한 상한이므로 그대로 쓴다)
+        """
+        range_start, range_end = doc_range if doc_range is not None else (0, self.num_documents)
+        tf = term_frequencies(tokenize(query))
+        if not tf:
+            # 빈 쿼리는 빈 문서와만 일치
+            empty_docs = range_start + np.flatnonzero(np.asarray(self.doc_unique[range_start:range_end]) == 0)
+            return [(int(doc_no), 1.0) for doc_no in empty_docs[:max(top_k, 0)]]
+
+        term_doc = self.term_doc
+        max_weights = self.term_max_weights
+        postings = {}
+        for term in tf:
+            row = self.vocabulary.get(term)
+            if row is not None:
+                start, end = term_doc.indptr[row], term_doc.indptr[row + 1]
+                if doc_range is not None:
+                    doc_nos = term_doc.indices[start:end]
+                    start, end = start + np.searchsorted(doc_nos, range_start), start + np.searchsorted(doc_nos, range_end)
+                postings[term] = (term_doc.indices[start:end].tolist(), term_doc.data[start:end].tolist(), float(max_weights[row]))
+        return max_score_search(tf, postings, self.doc_unique, self.doc_norms, top_k)
+
+    def search_many_top_k(self, queries: List[str], top_k: int = 5,
+                          doc_range: Optional[DocRange] = None) -> List[List[Tuple[int, float]]]:
+        """쿼리별 MaxScore 상위 k 검색 (search_batch 와 같은 반환 형식)"""
+        return [self.search_top_k(query, top_k, doc_range) for query in queries]
+
+    def search_batch(self, queries: List[str], top_k: int = 5,
+                     doc_range: Optional[DocRange] = None) -> List[List[Tuple[int, float]]]:
+        """쿼리별 상위 k개 (문서 번호, 유사도) 목록 반환 (doc_range 는 score_batch 참고)"""
+        scores = self.score_batch(queries, doc_range)
+        results = []
+        for row in range(len(queries)):
+            start, end = scores.indptr[row], scores.indptr[row + 1]
+            doc_nos = scores.indices[start:end]
+            values = scores.data[start:end]
+            if 0 < top_k < len(values):
+                # k번째 점수 이상만 남긴 뒤 정렬 (경계 동점은 문서 번호 순)
+                threshold = np.partition(values, len(values) - top_k)[len(values) - top_k]
+                keep = values >= threshold
+                doc_nos, values = doc_nos[keep], values[keep]
+            order = np.lexsort((doc_nos, -values))[:top_k]
+            results.append([(int(doc_nos[i]), float(values[i])) for i in order])
+        return results
@@ -0,0 +1,306 @@
+"""프로세스 내 지표 수집 및 Prometheus 텍스트 형식 출력
+
+외부 의존성 없이 카운터와 지연 시간 요약(count, sum, p50/p95/p99)을 제공한다.
+다른 모듈이 이미 집계하는 값(캐시 통계 등)은 수집 시점에 콜백으로 읽어 내보낸다.
+지표는 워커 프로세스별로 집계되므로 여러 워커로 실행하면 워커마다 따로 수집된다.
+"""
+import time
+import inspect
+import functools
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+LabelValues = Tuple[str, ...]
+
+QUANTILES = (0.5, 0.95, 0.99)
+SUMMARY_WINDOW = 1024   # 분위수 계산에 쓰는 최근 관측값 수 (라벨 조합별)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra is not None:
+        pairs.append(f'{extra[0]}="{_escape(extra[1])}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if value == value else "NaN"
+
+
+class Metric:
+    """라벨 조합별 값을 가진 지표 공통 부분"""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.label_names)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"] + self._samples()
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    """단조 증가 카운터"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str] = ()):
+        super().__init__(name, help_text, label_names)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}" for key, value in items]
+
+
+class _SummaryState:
+    __slots__ = ("count", "total", "recent")
+
+    def __init__(self, window: int):
+        self.count = 0
+        self.total = 0.0
+        self.recent: Deque[float] = deque(maxlen=window)
+
+
+class Summary(Metric):
+    """관측값 요약 (전체 count/sum, 최근 window 개 기준 분위수)"""
+
+    kind = "summary"
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str] = (),
+                 quantiles: Sequence[float] = QUANTILES, window: int = SUMMARY_WINDOW):
+        super().__init__(name, help_text, label_names)
+        self.quantiles = tuple(quantiles)
+        self.window = window
+        self._states: Dict[LabelValues, _SummaryState] = {}
+
+    def observe(self, value: float, **labels: Any):
+        key = self._key(labels)
+        with self._lock:
+            state = self._states.get(key)
+            if state is None:
+                state = self._states[key] = _SummaryState(self.window)
+            state.count += 1
+            state.total += value
+            state.recent.append(value)
+
+    @contextmanager
+    def time(self, **labels: Any) -> Iterator[None]:
+        """블록 실행 시간 관측"""
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started_at, **labels)
+
+    def snapshot(self, **labels: Any) -> Dict[str, float]:
+        """라벨 조합 1개의 count, sum, 분위수"""
+        with self._lock:
+            state = self._states.get(self._key(labels))
+            if state is None:
+                return {"count": 0, "sum": 0.0}
+            values = sorted(state.recent)
+            result = {"count": state.count, "sum": state.total}
+        for q in self.quantiles:
+            result[f"p{int(q * 100)}"] = values[min(len(values) - 1, int(q * len(values)))]
+        return result
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = [(key, state.count, state.total, sorted(state.recent)) for key, state in sorted(self._states.items())]
+        lines = []
+        for key, count, total, values in items:
+            for q in self.quantiles:
+                value = values[min(len(values) - 1, int(q * len(values)))] if values else float("nan")
+                lines.append(f"{self.name}{_format_labels(self.label_names, key, ('quantile', str(q)))} {_format_value(value)}")
+            labels = _format_labels(self.label_names, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class CallbackMetric(Metric):
+    """수집 시점에 콜백이 돌려준 (라벨, 값) 목록을 그대로 내보내는 지표"""
+
+    def __init__(self, name: str, help_text: str, kind: str, label_names: Sequence[str],
+                 collect: Callable[[], Iterable[Tuple[Dict[str, Any], float]]]):
+        super().__init__(name, help_text, label_names)
+        self.kind = kind
+        self.collect = collect
+
+    def _samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.label_names, self._key(labels))} {_format_value(value)}"
+            for labels, value in self.collect()
+        ]
+
+
+class MetricsRegistry:
+    """프로세스 전역 지표 목록"""
+
+    def __init__(self):
+        self.metrics: Dict[str, Metric] = {}
+
+    def counter(self, name: str, help_text: str, label_names: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help_text, label_names))
+
+    def summary(self, name: str, help_text: str, label_names: Sequence[str] = ()) -> Summary:
+        return self._register(Summary(name, help_text, label_names))
+
+    def callback(self, name: str, help_text: str, kind: str, label_names: Sequence[str],
+                 collect: Callable[[], Iterable[Tuple[Dict[str, Any], float]]]) -> CallbackMetric:
+        """collect() 결과를 수집 시점에 읽는 지표 등록 (kind: counter/gauge)"""
+        return self._register(CallbackMetric(name, help_text, kind, label_names, collect))
+
+    def _register(self, metric: Metric) -> Any:
+        if metric.name in self.metrics:
+            raise ValueError(f"이미 등록된 지표: {metric.name}")
+        self.metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """Prometheus 텍스트 형식 (0.0.4)"""
+        lines = []
+        for metric in self.metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# 프로세스 전역 지표 저장소
+registry = MetricsRegistry()
+
+node_latency = registry.summary(
+    "langgraph_node_latency_seconds", "LangGraph 노드 실행 시간 (outcome: ok/error)", ["node", "outcome"]
+)
+branch_decisions = registry.counter(
+    "langgraph_branch_total", "LangGraph 조건 분기 판단 결과 횟수", ["router", "branch"]
+)
+branch_latency = registry.summary(
+    "langgraph_branch_latency_seconds", "요청 시작부터 조건 분기 판단까지 시간 (분기별)", ["router", "branch"]
+)
+qdrant_calls = registry.counter("qdrant_calls_total", "Qdrant 호출 횟수", ["operation", "outcome"])
+qdrant_latency = registry.summary("qdrant_call_latency_seconds", "Qdrant 호출 시간", ["operation"])
+llm_calls = registry.counter("llm_calls_total", "LLM 채팅 완성 호출 횟수 (outcome: ok/error/aborted)", ["purpose", "outcome"])
+llm_latency = registry.summary("llm_call_latency_seconds", "LLM 호출 시작부터 스트림 종료까지 시간", ["purpose"])
+llm_first_token = registry.summary("llm_first_token_seconds", "LLM 호출 시작부터 첫 토큰 수신까지 시간", ["purpose"])
+
+
+@contextmanager
+def track_qdrant(operation: str) -> Iterator[None]:
+    """Qdrant 호출 1회의 횟수·시간 기록"""
+    outcome = "error"
+    try:
+        with qdrant_latency.time(operation=operation):
+            yield
+        outcome = "ok"
+    finally:
+        qdrant_calls.inc(operation=operation, outcome=outcome)
+
+
+async def track_llm_stream(purpose: str, create_call: Awaitable[Any]) -> AsyncIterator[Any]:
+    """스트리밍 채팅 완성 호출을 감싸 호출 횟수, 첫 토큰 시간, 전체 시간 기록 (청크는 그대로 전달)"""
+    started_at = time.perf_counter()
+    outcome = "error"
+    first_token = True
+    response = None
+    try:
+        response = await create_call
+        async for chunk in response:
+            if first_token and chunk.choices and getattr(chunk.choices[0].delta, "content", None):
+                llm_first_token.observe(time.perf_counter() - started_at, purpose=purpose)
+                first_token = False
+            yield chunk
+        outcome = "ok"
+    except GeneratorExit:
+        # 소비 측이 스트림을 중단 (클라이언트 연결 종료 등)
+        outcome = "aborted"
+        raise
+    finally:
+        # 끝까지 받지 않고 중단한 경우에도 업스트림 응답(연결)을 닫음
+        close = getattr(response, "close", None)
+        if close is not None:
+            await close()
+        llm_calls.inc(purpose=purpose, outcome=outcome)
+        llm_latency.observe(time.perf_counter() - started_at, purpose=purpose)
+
+
+def instrument_node(name: str, node: Callable) -> Callable:
+    """LangGraph 노드 실행 시간 기록 래퍼 (코루틴·비동기 제너레이터·일반 함수 모두 지원)"""
+    if inspect.isasyncgenfunction(node):
+        @functools.wraps(node)
+        async def wrapper(*args, **kwargs):
+            started_at = time.perf_counter()
+            outcome = "error"
+            try:
+                async for item in node(*args, **kwargs):
+                    yield item
+                outcome = "ok"
+            finally:
+                node_latency.observe(time.perf_counter() - started_at, node=name, outcome=outcome)
+    elif inspect.iscoroutinefunction(node):
+        @functools.wraps(node)
+        async def wrapper(*args, **kwargs):
+            started_at = time.perf_counter()
+            outcome = "error"
+            try:
+                result = await node(*args, **kwargs)
+                outcome = "ok"
+                return result
+            finally:
+                node_latency.observe(time.perf_counter() - started_at, node=name, outcome=outcome)
+    else:
+        @functools.wraps(node)
+        def wrapper(*args, **kwargs):
+            started_at = time.perf_counter()
+            outcome = "error"
+            try:
+                result = node(*args, **kwargs)
+                outcome = "ok"
+                return result
+            finally:
+                node_latency.observe(time.perf_counter() - started_at, node=name, outcome=outcome)
+    return wrapper
+
+
+def instrument_router(name: str, router: Callable[..., str]) -> Callable[..., str]:
+    """조건 분기 함수 래퍼: 분기 값별 횟수와 요청 시작부터 판단까지 시간 기록
+
+    판단 자체는 상태만 읽으므로 실행 시간 대신 상태의 started_at 부터 잰 시간을 분기별로 기록한다.
+    """
+    @functools.wraps(router)
+    def wrapper(*args, **kwargs) -> str:
+        branch = "error"
+        try:
+            branch = router(*args, **kwargs)
+            return branch
+        finally:
+            branch_decisions.inc(router=name, branch=branch)
+            state = args[0] if args else kwargs.get("state")
+            started_at = state.get("started_at") if isinstance(state, dict) else None
+            if started_at is not None:
+                branch_latency.observe(time.monotonic() - started_at, router=name, branch=branch)
+    return wrapper
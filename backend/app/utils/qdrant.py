@@ -0,0 +1,109 @@
+import asyncio
+from typing import Dict, Optional, Set, Tuple
+from qdrant_client import AsyncQdrantClient
+from app.utils.config import QDRANT_HOST, QDRANT_PORT, QDRANT_COLLECTIONS_REFRESH_INTERVAL
+from app.utils.metrics import track_qdrant
+
+
+class QdrantConnection:
+    """주소별로 공유되는 AsyncQdrantClient 와 컬렉션 목록 캐시
+
+    컬렉션 목록은 백그라운드 태스크가 주기적으로 갱신한다.
+    """
+
+    def __init__(self, host: str, port: int,
+                 refresh_interval: float = QDRANT_COLLECTIONS_REFRESH_INTERVAL):
+        self.host = host
+        self.port = port
+        self.refresh_interval = refresh_interval
+        self.client: Optional[AsyncQdrantClient] = None
+        self.collections: Set[str] = set()
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    async def start(self):
+        """클라이언트 생성 및 컬렉션 목록 갱신 태스크 시작"""
+        async with self._lock:
+            if self.client is not None:
+                return
+            self.client = AsyncQdrantClient(host=self.host, port=self.port)
+            print(f"[QDRANT] 공유 클라이언트 생성: {self.host}:{self.port}")
+
+        try:
+            await self.refresh_collections()
+        except Exception as e:
+            print(f"[QDRANT] 컬렉션 목록 초기 로드 실패: {e}")
+
+        if self._refresh_task is None:
+            self._refresh_task = asyncio.create_task(self._refresh_loop())
+
+    async def close(self):
+        """갱신 태스크 중단 및 클라이언트 종료"""
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._refresh_task = None
+
+        if self.client is not None:
+            await self.client.close()
+            self.client = None
+            print(f"[QDRANT] 공유 클라이언트 종료: {self.host}:{self.port}")
+
+    async def get_client(self) -> AsyncQdrantClient:
+        """공유 클라이언트 반환 (시작 전이면 지연 생성)"""
+        if self.client is None:
+            await self.start()
+        return self.client
+
+    async def refresh_collections(self) -> Set[str]:
+        """컬렉션 목록을 다시 조회하여 캐시 갱신"""
+        client = await self.get_client()
+        with track_qdrant("get_collections"):
+            response = await client.get_collections()
+        self.collections = {col.name for col in response.collections}
+        return self.collections
+
+    async def has_collection(self, collection: str) -> bool:
+        """캐시된 목록으로 컬렉션 존재 확인 (캐시에 없으면 1회 재조회)"""
+        if not collection:
+            return False
+        if collection in self.collections:
+            return True
+        return collection in await self.refresh_collections()
+
+    async def _refresh_loop(self):
+        """컬렉션 목록 주기적 갱신"""
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.refresh_collections()
+            except Exception as e:
+                print(f"[QDRANT] 컬렉션 목록 갱신 실패: {e}")
+
+
+# 주소별 공유 연결
+qdrant_connections: Dict[Tuple[str, int], QdrantConnection] = {}
+
+
+def get_qdrant_connection(host: str = QDRANT_HOST, port: int = QDRANT_PORT) -> QdrantConnection:
+    """주소별 공유 연결 반환"""
+    key = (host, port)
+    connection = qdrant_connections.get(key)
+    if connection is None:
+        connection = QdrantConnection(host, port)
+        qdrant_connections[key] = connection
+    return connection
+
+
+async def start_qdrant():
+    """애플리케이션 시작 시 기본 연결 생성"""
+    await get_qdrant_connection().start()
+
+
+async def close_qdrant():
+    """애플리케이션 종료 시 모든 연결 종료"""
+    for connection in list(qdrant_connections.values()):
+        await connection.close()
@@ -0,0 +1,187 @@
+import os
+import heapq
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing.shared_memory import SharedMemory
+from itertools import islice
+from typing import Dict, List, Optional, Tuple
+from app.utils.config import RAG_SCORING_EXECUTOR, RAG_SCORING_PROCESSES, RAG_TOPK_STRATEGY, RAG_SEARCH_SHARDS
+from app.utils.corpus import CorpusSnapshot
+
+# 쿼리별 (문서 번호, 유사도) 상위 목록
+Rankings = List[List[Tuple[int, float]]]
+
+
+# (샤드 번호, 전체 샤드 수)
+Shard = Tuple[int, int]
+
+
+def shard_range(num_documents: int, shard: Shard) -> Tuple[int, int]:
+    """샤드가 맡는 연속 문서 번호 구간 [start, end)"""
+    index, num_shards = shard
+    return num_documents * index // num_shards, num_documents * (index + 1) // num_shards
+
+
+def _score(snapshot: CorpusSnapshot, queries: List[str], top_k: int, strategy: str,
+           shard: Optional[Shard] = None) -> Rankings:
+    """스냅샷 엔진으로 쿼리 묶음(또는 샤드 구간) 점수 계산 (문서 번호는 전체 기준)
+
+    샤드는 같은 행렬의 문서 구간만 읽으므로 샤드별 사본을 만들지 않는다.
+    """
+    doc_range = None if shard is None else shard_range(len(snapshot), shard)
+    if strategy == "maxscore":
+        return snapshot.engine.search_many_top_k(queries, top_k, doc_range)
+    return snapshot.engine.search_batch(queries, top_k, doc_range)
+
+
+def merge_rankings(shard_rankings: List[Rankings], top_k: int) -> Rankings:
+    """샤드별 상위 k 목록을 쿼리마다 k-way 힙 병합 (점수 내림차순, 동점은 문서 번호 순)"""
+    return [
+        list(islice(heapq.merge(*rankings, key=lambda x: (-x[1], x[0])), top_k))
+        for rankings in zip(*shard_rankings)
+    ]
+
+
+def _warm_up() -> int:
+    """점수 계산 프로세스 사전 기동 (모듈 import 비용을 첫 요청 전에 지불)"""
+    return os.getpid()
+
+
+# 점수 계산 프로세스 내 컬렉션별 연결 스냅샷
+_worker_snapshots: Dict[str, CorpusSnapshot] = {}
+
+
+def _score_in_worker(manifest: dict, untrack: bool, queries: List[str], top_k: int, strategy: str,
+                     shard: Optional[Shard] = None) -> Rankings:
+    """점수 계산 프로세스에서 실행: 공유 메모리 색인에 연결(최초 1회)하여 점수 계산"""
+    from app.utils.shared_index import shared_attacher
+
+    collection = manifest["meta"]["collection"]
+    snapshot = _worker_snapshots.get(collection)
+    if snapshot is None or snapshot.segment != manifest["segment"]:
+        _worker_snapshots.pop(collection, None)
+        snapshot = shared_attacher.attach(manifest, version=0, untrack=untrack)
+        _worker_snapshots[collection] = snapshot
+    return _score(snapshot, queries, top_k, strategy, shard)
+
+
+class ScoringExecutor:
+    """CPU 작업인 유사도 계산을 이벤트 루프 밖에서 실행
+
+    "process" 모드에서는 프로세스 풀의 각 프로세스가 공유 메모리 색인에 읽기 전용으로 연결한다.
+    로더가 게시한 세그먼트가 있으면 그대로 쓰고, 없으면 현재 스냅샷을 한 번 세그먼트로 게시한다.
+    "thread" 모드 또는 프로세스 풀 오류 시에는 스레드에서 계산한다.
+    shards 가 2 이상이면 문서를 겹치지 않는 구간으로 나눠 모든 샤드에 동시에 보내고 결과를 힙 병합한다.
+    """
+
+    def __init__(self, mode: str = RAG_SCORING_EXECUTOR, processes: Optional[int] = RAG_SCORING_PROCESSES,
+                 shards: int = RAG_SEARCH_SHARDS):
+        self.mode = mode
+        self.processes = processes or os.cpu_count() or 1
+        self.shards = shards
+        self._pool: Optional[ProcessPoolExecutor] = None
+        # 컬렉션 → (스냅샷 버전, 세그먼트, 매니페스트), 교체된 세그먼트는 한 세대 보관
+        self._published: Dict[str, Tuple[int, SharedMemory, dict]] = {}
+        self._retired: List[SharedMemory] = []
+        self._lock = asyncio.Lock()
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # 이벤트 루프 스레드가 있는 프로세스에서 fork 하지 않도록 spawn 사용
+            self._pool = ProcessPoolExecutor(max_workers=self.processes, mp_context=multiprocessing.get_context("spawn"))
+            print(f"[SCORING] 점수 계산 프로세스 풀 시작: {self.processes}개")
+        return self._pool
+
+    async def start(self):
+        """프로세스 풀 사전 기동 (process 모드일 때만)"""
+        if self.mode != "process":
+            return
+        loop = asyncio.get_running_loop()
+        pool = self._get_pool()
+        await asyncio.gather(*[loop.run_in_executor(pool, _warm_up) for _ in range(self.processes)])
+
+    async def _manifest_for(self, snapshot: CorpusSnapshot) -> Tuple[dict, bool]:
+        """풀 프로세스가 연결할 매니페스트와 추적 해제 여부 반환"""
+        if snapshot.manifest is not None:
+            # 로더 프로세스가 게시한 세그먼트
+            return snapshot.manifest, True
+
+        from app.utils.shared_index import create_segment
+
+        async with self._lock:
+            published = self._published.get(snapshot.collection)
+            if published is not None and published[0] == snapshot.version:
+                return published[2], False
+
+            segment, manifest = await asyncio.to_thread(create_segment, snapshot)
+            self._published[snapshot.collection] = (snapshot.version, segment, manifest)
+            if published is not None:
+                # 이전 매니페스트로 제출된 작업이 연결할 수 있도록 한 세대 보관 후 삭제
+                for old in self._retired:
+                    old.close()
+                    old.unlink()
+                self._retired = [published[1]]
+            print(f"[SCORING] 스냅샷 v{snapshot.version} 공유 메모리 게시: {segment.name}")
+            return manifest, False
+
+    async def score(self, snapshot: CorpusSnapshot, queries: List[str], top_k: int,
+                    strategy: str = RAG_TOPK_STRATEGY) -> Rankings:
+        """쿼리 묶음의 상위 k 결과 계산 (이벤트 루프를 막지 않음)"""
+        num_shards = min(self.shards, len(snapshot))
+        if num_shards <= 1:
+            return await self._score_shard(snapshot, queries, top_k, strategy)
+
+        # 모든 샤드에 동시에 보내고 샤드별 상위 k 를 병합
+        shard_rankings = await asyncio.gather(*[
+            self._score_shard(snapshot, queries, top_k, strategy, (index, num_shards))
+            for index in range(num_shards)
+        ])
+        return merge_rankings(shard_rankings, top_k)
+
+    async def _score_shard(self, snapshot: CorpusSnapshot, queries: List[str], top_k: int, strategy: str,
+                           shard: Optional[Shard] = None) -> Rankings:
+        """샤드 1개(또는 전체) 점수 계산을 프로세스 풀 또는 스레드에서 실행"""
+        if self.mode == "process":
+            try:
+                manifest, untrack = await self._manifest_for(snapshot)
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(
+                    self._get_pool(), _score_in_worker, manifest, untrack, queries, top_k, strategy, shard
+                )
+            except BrokenProcessPool as e:
+                print(f"[SCORING] 프로세스 풀 오류, 스레드로 계산: {e}")
+                self._pool = None
+            except Exception as e:
+                print(f"[SCORING] 프로세스 계산 실패, 스레드로 계산: {e}")
+        return await asyncio.to_thread(_score, snapshot, queries, top_k, strategy, shard)
+
+    def close(self):
+        """프로세스 풀 종료 및 게시한 세그먼트 삭제"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+        segments = self._retired + [published[1] for published in self._published.values()]
+        for segment in segments:
+            segment.close()
+            segment.unlink()
+        self._published.clear()
+        self._retired = []
+
+
+# 프로세스 전역 점수 계산 실행기
+scoring_executor = ScoringExecutor()
+
+
+async def start_scoring_executor():
+    """애플리케이션 시작 시 프로세스 풀 사전 기동"""
+    try:
+        await scoring_executor.start()
+    except Exception as e:
+        print(f"[SCORING] 프로세스 풀 기동 실패: {e}")
+
+
+async def close_scoring_executor():
+    """애플리케이션 종료 시 프로세스 풀 정리"""
+    await asyncio.to_thread(scoring_executor.close)
@@ -0,0 +1,184 @@
+import heapq
+from bisect import bisect_left
+from typing import List, Dict, Any, Iterable, Optional, Sequence, Tuple
+from app.utils.features import (
+    DocumentFeatures, FeatureStore, Vocabulary, feature_store, tokenize, term_frequencies, combine_scores, compact_payload,
+    JACCARD_WEIGHT, COSINE_WEIGHT
+)
+
+# 용어 → (문서 번호 오름차순 목록, TF 목록, 문서 노름으로 나눈 TF 최댓값)
+PostingLists = Dict[str, Tuple[Sequence[int], Sequence[float], float]]
+
+# 상한 합산 시 부동소수 오차로 정답 문서가 잘리지 않도록 두는 여유
+_BOUND_SLACK = 1.0 + 1e-9
+
+
+def max_score_search(query_tf: Dict[str, int], postings: PostingLists, doc_unique: Sequence[float],
+                     doc_norms: Sequence[float], top_k: int) -> List[Tuple[int, float]]:
+    """MaxScore 조기 종료 방식의 상위 k 검색 (전체 점수 계산과 동일한 결과)
+
+    용어별 점수 상한을 오름차순으로 누적해 현재 k번째 점수 이하인 용어들은 '비필수'로 돌리고,
+    필수 용어의 포스팅에 등장한 문서만 후보로 삼는다. 비필수 용어는 이분 탐색으로 확인하며
+    남은 상한으로 k위 안에 들 수 없는 문서는 정확한 점수 계산 없이 건너뛴다.
+    """
+    if top_k <= 0:
+        return []
+    query_unique = len(query_tf)
+    query_norm = sum(c * c for c in query_tf.values()) ** 0.5
+
+    # 문서 d 의 점수 ≤ Σ(일치 용어) [자카드 가중치 / |q| + 코사인 가중치 × q_t × max(tf/|d|) / |q|₂]
+    terms = []
+    for term, q_count in query_tf.items():
+        entry = postings.get(term)
+        if entry is None or not len(entry[0]):
+            continue
+        doc_nos, tfs, max_weight = entry
+        bound = (JACCARD_WEIGHT / query_unique + COSINE_WEIGHT * q_count * max_weight / query_norm) * _BOUND_SLACK
+        terms.append((bound, q_count, doc_nos, tfs))
+    terms.sort(key=lambda t: t[0])
+
+    bounds = [t[0] for t in terms]
+    prefix = []
+    total = 0.0
+    for bound in bounds:
+        total += bound
+        prefix.append(total)
+
+    cursors = [0] * len(terms)
+    heap: List[Tuple[float, int]] = []      # (점수, -문서 번호) 최소 힙
+    threshold = float('-inf')
+    first_essential = 0
+
+    while first_essential < len(terms):
+        # 필수 용어 포스팅 중 가장 작은 문서 번호가 다음 후보
+        doc_no = None
+        for i in range(first_essential, len(terms)):
+            doc_nos = terms[i][2]
+            if cursors[i] < len(doc_nos) and (doc_no is None or doc_nos[cursors[i]] < doc_no):
+                doc_no = doc_nos[cursors[i]]
+        if doc_no is None:
+            break
+
+        dot = 0.0
+        overlap = 0
+        score_bound = prefix[first_essential - 1] if first_essential else 0.0
+        for i in range(first_essential, len(terms)):
+            _, q_count, doc_nos, tfs = terms[i]
+            position = cursors[i]
+            if position < len(doc_nos) and doc_nos[position] == doc_no:
+                dot += q_count * tfs[position]
+                overlap += 1
+                score_bound += bounds[i]
+                cursors[i] = position + 1
+
+        # 비필수 용어는 상한이 큰 것부터 확인하고, 남은 상한으로 진입 불가하면 중단
+        for i in range(first_essential - 1, -1, -1):
+            if score_bound <= threshold:
+                break
+            _, q_count, doc_nos, tfs = terms[i]
+            position = bisect_left(doc_nos, doc_no, cursors[i])
+            cursors[i] = position
+            if position < len(doc_nos) and doc_nos[position] == doc_no:
+                dot += q_count * tfs[position]
+                overlap += 1
+            else:
+                score_bound -= bounds[i]
+        if score_bound <= threshold:
+            continue
+
+        jaccard = overlap / (query_unique + doc_unique[doc_no] - overlap)
+        cosine = dot / (query_norm * doc_norms[doc_no])
+        score = combine_scores(jaccard, cosine)
+        # 문서 번호 오름차순으로 방문하므로 동점이면 먼저 들어온 문서가 우선
+        if len(heap) < top_k:
+            heapq.heappush(heap, (score, -doc_no))
+        elif score > threshold:
+            heapq.heapreplace(heap, (score, -doc_no))
+        else:
+            continue
+
+        if len(heap) == top_k:
+            threshold = heap[0][0]
+            while first_essential < len(terms) and prefix[first_essential] <= threshold:
+                first_essential += 1
+
+    return [(-neg_doc_no, score) for score, neg_doc_no in sorted(heap, key=lambda x: (-x[0], -x[1]))]
+
+
+class InvertedIndex:
+    """용어 → 포스팅 리스트(문서 번호, 용어 빈도) 역색인
+
+    쿼리와 용어를 하나 이상 공유하는 문서만 점수를 계산하며,
+    DirectSimilarityCalculator.calculate_combined_similarity 와 동일한 점수를 낸다.
+    """
+
+    def __init__(self):
+        self.postings: Dict[str, List[Tuple[int, int]]] = {}
+        self.doc_ids: List[Any] = []
+        self.payloads: List[dict] = []
+        self.doc_lengths: List[int] = []    # 문서 토큰 수
+        self.doc_unique: List[int] = []     # 문서 고유 토큰 수 (자카드 합집합 계산용)
+        self.doc_norms: List[float] = []    # 문서 TF 벡터 L2 노름
+        self._posting_lists: Optional[PostingLists] = None
+
+    @classmethod
+    def build(cls, documents: List[dict], store: Optional[FeatureStore] = None,
+              payload_fields: Optional[Iterable[str]] = None) -> "InvertedIndex":
+        """{'id', 'payload'} 문서 목록으로 역색인 구축 (문서 특징은 저장소에서 재사용)
+
+        payload_fields 를 지정하면 해당 필드만 남긴 축약 payload 를 보관한다.
+        """
+        store = store if store is not None else feature_store
+        fields = list(payload_fields) if payload_fields is not None else None
+        index = cls()
+        for doc in documents:
+            payload = doc['payload']
+            features = store.get(doc['id'], payload)
+            index.add_document(doc['id'], compact_payload(payload, fields) if fields is not None else payload, features,
+                               store.vocab)
+        return index
+
+    def __len__(self) -> int:
+        return len(self.doc_ids)
+
+    def add_document(self, doc_id: Any, payload: dict, features: DocumentFeatures,
+                     vocab: Optional[Vocabulary] = None) -> int:
+        """문서 1건을 색인하고 내부 문서 번호 반환 (vocab: 특징을 만든 사전)"""
+        doc_no = len(self.doc_ids)
+        self._posting_lists = None
+
+        for term, count in features.items(vocab):
+            self.postings.setdefault(term, []).append((doc_no, count))
+
+        self.doc_ids.append(doc_id)
+        self.payloads.append(payload)
+        self.doc_lengths.append(features.length)
+        self.doc_unique.append(features.unique)
+        self.doc_norms.append(features.norm)
+        return doc_no
+
+    def search(self, query: str, top_k: int = 5) -> List[Tuple[int, float]]:
+        """쿼리와 유사한 문서를 (문서 번호, 유사도) 목록으로 반환"""
+        query_tf = term_frequencies(tokenize(query))
+
+        if not query_tf:
+            # 빈 쿼리는 빈 문서와만 일치 (자카드/코사인 모두 1.0)
+            return [(doc_no, 1.0) for doc_no, unique in enumerate(self.doc_unique) if unique == 0][:max(top_k, 0)]
+        return max_score_search(query_tf, self.posting_lists(), self.doc_unique, self.doc_norms, top_k)
+
+    def posting_lists(self) -> PostingLists:
+        """MaxScore 검색용 용어별 (문서 번호, TF, 최대 정규화 TF) 목록 (색인 변경 전까지 재사용)"""
+        if self._posting_lists is None:
+            self._posting_lists = {
+                term: (
+                    [doc_no for doc_no, _ in postings],
+                    [count for _, count in postings],
+                    max(count / self.doc_norms[doc_no] for doc_no, count in postings)
+                )
+                for term, postings in self.postings.items()
+            }
+        return self._posting_lists
+
+    def get_document(self, doc_no: int) -> Tuple[Any, dict]:
+        """문서 번호로 (원본 ID, payload) 조회"""
+        return self.doc_ids[doc_no], self.payloads[doc_no]
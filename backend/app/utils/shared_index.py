@@ -0,0 +1,199 @@
+"""공유 메모리 색인 (워커 간 단일 사본)
+
+로더 프로세스 하나가 스냅샷 평면 배열을 multiprocessing.shared_memory 세그먼트에 게시하고,
+각 uvicorn 워커는 같은 세그먼트를 읽기 전용으로 연결한다.
+워커 수가 늘어도 코퍼스 사본은 하나만 유지된다.
+
+로더 실행:
+    python -m app.utils.shared_index --collection RC
+"""
+import os
+import json
+import weakref
+import asyncio
+import argparse
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from app.utils.config import (
+    QDRANT_HOST, QDRANT_PORT, QDRANT_COLLECTION, CORPUS_INDEX_DIR, CORPUS_INDEX_KEEP,
+    CORPUS_SHARED_PREFIX, CORPUS_SYNC_INTERVAL
+)
+from app.utils.corpus import CorpusSnapshot, CorpusStore
+from app.utils.index_store import INDEX_FORMAT_VERSION, snapshot_arrays, snapshot_from_arrays
+
+MANIFEST_FILE = "SHARED.json"
+ALIGNMENT = 64
+
+
+def _layout(arrays: Dict[str, np.ndarray]) -> Tuple[Dict[str, dict], int]:
+    """배열별 (dtype, shape, offset) 배치와 전체 크기 계산"""
+    layout = {}
+    offset = 0
+    for key, array in arrays.items():
+        offset = (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+        layout[key] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset += array.nbytes
+    return layout, offset
+
+
+def _manifest_path(collection: str, base_dir: str) -> str:
+    return os.path.join(base_dir, collection, MANIFEST_FILE)
+
+
+def create_segment(snapshot: CorpusSnapshot, prefix: str = CORPUS_SHARED_PREFIX) -> Tuple[SharedMemory, dict]:
+    """스냅샷 평면 배열을 새 공유 메모리 세그먼트에 복사하고 (세그먼트, 매니페스트) 반환"""
+    meta, arrays = snapshot_arrays(snapshot)
+    layout, size = _layout(arrays)
+
+    segment = SharedMemory(
+        name=f"{prefix}_{snapshot.collection}_{snapshot.version}_{os.getpid()}", create=True, size=max(size, 1)
+    )
+    for key, array in arrays.items():
+        entry = layout[key]
+        target = np.ndarray(array.shape, dtype=array.dtype, buffer=segment.buf, offset=entry["offset"])
+        target[...] = array
+        del target
+    return segment, {"segment": segment.name, "meta": meta, "arrays": layout}
+
+
+def publish_snapshot(snapshot: CorpusSnapshot, base_dir: str = CORPUS_INDEX_DIR,
+                     prefix: str = CORPUS_SHARED_PREFIX) -> SharedMemory:
+    """스냅샷을 새 공유 메모리 세그먼트에 복사하고 매니페스트를 원자적으로 교체"""
+    segment, manifest = create_segment(snapshot, prefix)
+    path = _manifest_path(snapshot.collection, base_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+    return segment
+
+
+def read_manifest(collection: str, base_dir: str = CORPUS_INDEX_DIR) -> Optional[dict]:
+    """로더가 게시한 매니페스트 조회 (없으면 None)"""
+    try:
+        with open(_manifest_path(collection, base_dir), encoding="utf-8") as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return None
+    if manifest["meta"].get("format") != INDEX_FORMAT_VERSION:
+        print(f"[SHARED_INDEX] 지원하지 않는 스냅샷 형식: {manifest['meta'].get('format')}")
+        return None
+    return manifest
+
+
+class SharedIndexAttacher:
+    """워커 측 공유 메모리 세그먼트 연결 관리
+
+    교체된 세그먼트는 진행 중인 검색이 배열을 놓을 때까지 보관했다가 닫는다.
+    (배열이 살아 있는 상태에서 close 하면 매핑이 해제되어 프로세스가 비정상 종료된다)
+    """
+
+    def __init__(self):
+        # 세그먼트와 그 위에 만든 배열의 약한 참조
+        self.segments: Dict[str, Tuple[SharedMemory, List[weakref.ref]]] = {}   # 컬렉션 → 현재 연결
+        self.retired: List[Tuple[SharedMemory, List[weakref.ref]]] = []
+
+    def attach(self, manifest: dict, version: int, untrack: bool = True) -> CorpusSnapshot:
+        """매니페스트의 세그먼트를 읽기 전용 배열로 연결하여 스냅샷 구성
+
+        untrack: 다른 프로세스 트리가 만든 세그먼트이면 True
+        (같은 resource_tracker 를 쓰는 자식 프로세스는 생성자의 등록을 지우지 않도록 False)
+        """
+        segment = SharedMemory(name=manifest["segment"])
+        if untrack:
+            # 연결만 한 워커가 종료될 때 세그먼트가 삭제되지 않도록 추적 해제
+            resource_tracker.unregister(segment._name, "shared_memory")
+
+        arrays = {}
+        for key, entry in manifest["arrays"].items():
+            array = np.ndarray(tuple(entry["shape"]), dtype=np.dtype(entry["dtype"]), buffer=segment.buf, offset=entry["offset"])
+            array.flags.writeable = False
+            arrays[key] = array
+        snapshot = snapshot_from_arrays(manifest["meta"], arrays, version)
+        snapshot.segment = segment.name
+        snapshot.manifest = manifest
+
+        collection = manifest["meta"]["collection"]
+        previous = self.segments.get(collection)
+        self.segments[collection] = (segment, [weakref.ref(array) for array in arrays.values()])
+        if previous is not None:
+            self.retired.append(previous)
+        self.release_retired()
+        return snapshot
+
+    def release_retired(self):
+        """더 이상 참조되지 않는 이전 세그먼트 닫기"""
+        remaining = []
+        for segment, refs in self.retired:
+            if any(ref() is not None for ref in refs):
+                # 이전 스냅샷을 쓰는 검색이 아직 진행 중
+                remaining.append((segment, refs))
+            else:
+                segment.close()
+        self.retired = remaining
+
+
+# 워커 프로세스 전역 연결 관리자
+shared_attacher = SharedIndexAttacher()
+
+
+async def run_loader(collection: str = QDRANT_COLLECTION, host: str = QDRANT_HOST, port: int = QDRANT_PORT,
+                     base_dir: str = CORPUS_INDEX_DIR, interval: float = CORPUS_SYNC_INTERVAL,
+                     keep: int = CORPUS_INDEX_KEEP):
+    """컬렉션을 주기적으로 동기화하고 새 버전이 생길 때마다 공유 메모리에 게시"""
+    from qdrant_client import AsyncQdrantClient
+
+    client = AsyncQdrantClient(host=host, port=port)
+    # 로더는 게시하는 쪽이므로 CORPUS_SHARED_MEMORY 설정과 무관하게 항상 Qdrant 에서 직접 구축
+    # (shared 모드이면 자신이 게시한 매니페스트에 연결해 재스크롤 없이 같은 세그먼트를 다시 게시함)
+    store = CorpusStore(index_dir=base_dir, shared=False)
+    published: List[SharedMemory] = []
+    published_version = None
+    try:
+        while True:
+            try:
+                snapshot = await store.sync(client, collection)
+                if snapshot.version != published_version:
+                    segment = await asyncio.to_thread(publish_snapshot, snapshot, base_dir)
+                    published.append(segment)
+                    published_version = snapshot.version
+                    print(f"[SHARED_INDEX] 게시 완료: {segment.name} ({segment.size / 1024 / 1024:.1f}MB, 문서 {len(snapshot)}건)")
+                    # 방금 매니페스트를 읽은 워커가 연결할 수 있도록 keep 개까지 유지
+                    while len(published) > max(keep, 1):
+                        old = published.pop(0)
+                        old.close()
+                        old.unlink()
+            except Exception as e:
+                print(f"[SHARED_INDEX] 동기화/게시 실패: {e}")
+            await asyncio.sleep(interval)
+    finally:
+        try:
+            os.remove(_manifest_path(collection, base_dir))
+        except FileNotFoundError:
+            pass
+        for segment in published:
+            segment.close()
+            segment.unlink()
+        await client.close()
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Qdrant 컬렉션 색인을 공유 메모리에 게시하는 로더")
+    parser.add_argument("--collection", default=QDRANT_COLLECTION, help="대상 컬렉션 (기본: QDRANT_COLLECTION)")
+    parser.add_argument("--host", default=QDRANT_HOST, help="Qdrant 호스트")
+    parser.add_argument("--port", type=int, default=QDRANT_PORT, help="Qdrant 포트")
+    parser.add_argument("--output", default=CORPUS_INDEX_DIR, help="매니페스트 디렉터리")
+    parser.add_argument("--interval", type=float, default=CORPUS_SYNC_INTERVAL, help="동기화 주기 (초)")
+    args = parser.parse_args(argv)
+
+    try:
+        asyncio.run(run_loader(args.collection, args.host, args.port, args.output, args.interval))
+    except KeyboardInterrupt:
+        print("[SHARED_INDEX] 로더 종료")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import heapq
+import asyncio
+from typing import Any, List, Optional, Tuple
+from qdrant_client import AsyncQdrantClient
+from app.utils.config import CORPUS_SCROLL_PAGE_SIZE, CORPUS_PAYLOAD_FIELDS, CORPUS_COMPACT_FIELDS
+from app.utils.corpus import iter_scroll_pages
+from app.utils.features import FeatureStore
+from app.utils.search_index import InvertedIndex
+from app.utils.matrix_scoring import SparseScoringEngine
+
+# (문서 ID, 축약 payload, 유사도)
+StreamHit = Tuple[Any, dict, float]
+
+
+def score_page(page: List[dict], queries: List[str], top_k: int) -> Tuple[InvertedIndex, List[List[Tuple[int, float]]]]:
+    """스크롤 페이지 1개만으로 색인을 만들어 쿼리별 상위 k 계산"""
+    # 전역 특징 저장소에 쌓이지 않도록 페이지 전용 저장소 사용
+    index = InvertedIndex.build(page, store=FeatureStore(), payload_fields=CORPUS_COMPACT_FIELDS)
+    return index, SparseScoringEngine.from_index(index).search_batch(queries, top_k)
+
+
+async def stream_search(client: AsyncQdrantClient, collection: str, queries: List[str], top_k: int,
+                        page_size: int = CORPUS_SCROLL_PAGE_SIZE,
+                        payload_fields: Optional[List[str]] = CORPUS_PAYLOAD_FIELDS) -> List[List[StreamHit]]:
+    """색인 없이 스크롤 페이지를 받는 대로 점수 계산하여 쿼리별 상위 k 반환
+
+    다음 페이지 요청을 먼저 보낸 뒤 현재 페이지를 계산하므로 네트워크 대기와 CPU 작업이 겹치고,
+    메모리에는 페이지 1~2개와 쿼리별 크기 k 힙만 유지된다.
+    """
+    # 쿼리별 (유사도, -스크롤 순번, 문서 ID, payload) 최소 힙 (동점이면 먼저 스크롤된 문서 우선)
+    heaps: List[List[Tuple[float, int, Any, dict]]] = [[] for _ in queries]
+    pages = iter_scroll_pages(client, collection, page_size, payload_fields)
+    next_page = asyncio.ensure_future(pages.__anext__())
+    position = 0
+    num_pages = 0
+    try:
+        while True:
+            try:
+                page = await next_page
+            except StopAsyncIteration:
+                break
+            next_page = asyncio.ensure_future(pages.__anext__())
+
+            index, rankings = await asyncio.to_thread(score_page, page, queries, top_k)
+            for heap, ranking in zip(heaps, rankings):
+                for doc_no, score in ranking:
+                    entry = (score, -(position + doc_no), index.doc_ids[doc_no], index.payloads[doc_no])
+                    if len(heap) < top_k:
+                        heapq.heappush(heap, entry)
+                    elif entry[:2] > heap[0][:2]:
+                        heapq.heapreplace(heap, entry)
+            position += len(index)
+            num_pages += 1
+    finally:
+        if not next_page.done():
+            next_page.cancel()
+            await asyncio.gather(next_page, return_exceptions=True)
+        await pages.aclose()
+
+    print(f"[STREAM_SEARCH] 스트리밍 검색 완료: {num_pages}페이지, 문서 {position}건, 쿼리 {len(queries)}개")
+    return [
+        [(doc_id, payload, score) for score, _, doc_id, payload in sorted(heap, key=lambda x: (-x[0], -x[1]))]
+        for heap in heaps
+    ]
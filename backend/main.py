@@ -4,6 +4,11 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import Response
 from app.routes import conversations, llm, auth
 from app.database import Base, engine
+from app.utils.qdrant import start_qdrant, close_qdrant
+from app.utils.corpus import start_corpus_sync, close_corpus_sync
+from app.utils.scoring_pool import start_scoring_executor, close_scoring_executor
+from app.utils.cache import close_keyword_cache
+from app.utils.metrics import registry as metrics_registry
 from fastapi.staticfiles import StaticFiles
 from fastapi.openapi.docs import get_swagger_ui_html
 
@@ -30,6 +35,20 @@ app.add_middleware(
     expose_headers=["*"],  # Expose all headers
     max_age=3600,  # CORS preflight 캐시 시간 설정
 )
+# 공유 Qdrant 클라이언트 및 코퍼스 증분 동기화 수명 관리
+@app.on_event("startup")
+async def startup_qdrant():
+    await start_qdrant()
+    await start_corpus_sync()
+    await start_scoring_executor()
+
+@app.on_event("shutdown")
+async def shutdown_qdrant():
+    await close_corpus_sync()
+    await close_scoring_executor()
+    await close_keyword_cache()
+    await close_qdrant()
+
 # 임시 이미지 URL을 위한 static 파일 서빙 추가
 app.mount("/api/static", StaticFiles(directory="./static"), name="static")
 @app.get("/api/docs", include_in_schema=False)
@@ -61,6 +80,12 @@ app.include_router(conversations.router, prefix="/api", tags=["conversations"])
 app.include_router(llm.router, prefix="/api/llm", tags=["llm"])
 
 
+# Prometheus 지표 (LangGraph 노드 시간, Qdrant/LLM 호출 수, 첫 토큰 시간)
+@app.get("/api/metrics", include_in_schema=False)
+async def metrics():
+    return Response(content=metrics_registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
 @app.get("/")
 def read_root():
     return {"message": "Welcome to LLM-mini API"}
@@ -0,0 +1,125 @@
+"""테스트 공통 fixture
+
+Qdrant 는 로컬 모드(:memory:) 클라이언트를 사용하고, 모듈 전역 캐시/스토어는 테스트마다 초기화한다.
+"""
+import types
+import random
+import asyncio
+from typing import List
+import pytest
+from qdrant_client import AsyncQdrantClient, models
+
+WORDS = "dram bcat 불량 분석 공정 결함 wafer test yield 메모리 fail bit line 개선 원인".split()
+
+
+def make_point(point_id: int, rng: random.Random, size: int = 4, embed=None) -> models.PointStruct:
+    """임의 단어로 구성한 RC 문서 포인트 (embed 를 주면 문서 텍스트 임베딩을 벡터로 사용)"""
+    title = ' '.join(rng.choices(WORDS, k=3))
+    text = ' '.join(rng.choices(WORDS, k=20))
+    return models.PointStruct(
+        id=point_id,
+        vector=embed([f"{title} {text}"])[0] if embed is not None else [rng.random() for _ in range(size)],
+        payload={
+            'document_name': title,
+            'vector': {'text': text, 'summary_result': f"요약 {point_id}"},
+        },
+    )
+
+
+async def create_collection(count: int, collection: str = "RC", seed: int = 0,
+                            size: int = 4, embed=None) -> AsyncQdrantClient:
+    """count 건의 문서를 가진 :memory: 컬렉션 생성"""
+    rng = random.Random(seed)
+    client = AsyncQdrantClient(location=":memory:")
+    await client.create_collection(
+        collection, vectors_config=models.VectorParams(size=size, distance=models.Distance.COSINE)
+    )
+    await client.upsert(collection, points=[make_point(i, rng, size, embed) for i in range(count)])
+    return client
+
+
+def ranked_ids(snapshot, queries: List[str], top_k: int) -> List[List[int]]:
+    """스냅샷 엔진으로 질의별 상위 문서 ID 조회"""
+    return [[snapshot.doc_ids[doc_no] for doc_no, _ in ranking]
+            for ranking in snapshot.engine.search_batch(queries, top_k)]
+
+
+@pytest.fixture(autouse=True)
+def reset_globals(monkeypatch):
+    """모듈 전역 스토어/캐시 초기화 (테스트 간 상태 공유 방지, 디스크 색인·SQLite 캐시 사용 안 함)"""
+    from app.utils.corpus import corpus_store
+    from app.utils.cache import query_result_cache, keyword_cache, answer_cache
+
+    monkeypatch.setattr(corpus_store, "index_dir", None)
+    monkeypatch.setattr(keyword_cache, "db_path", None)
+
+    def reset():
+        corpus_store.invalidate()
+        corpus_store._locks.clear()
+        corpus_store._load_locks.clear()
+        corpus_store._sync_tasks.clear()
+        query_result_cache.cache.clear()
+        answer_cache.cache.clear()
+        keyword_cache.memory.clear()
+        query_result_cache._versions.clear()
+        answer_cache._versions.clear()
+
+    reset()
+    yield
+    reset()
+
+
+class FakeStream:
+    """OpenAI 스트리밍 응답 대역 (청크마다 delay 초 대기)"""
+
+    def __init__(self, text: str, chunk_size: int = 3, delay: float = 0.0):
+        self.items = [text[i:i + chunk_size] for i in range(0, len(text), chunk_size)]
+        self.delay = delay
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self.items:
+            raise StopAsyncIteration
+        await asyncio.sleep(self.delay)
+        content = self.items.pop(0)
+        return types.SimpleNamespace(choices=[types.SimpleNamespace(delta=types.SimpleNamespace(content=content))])
+
+
+class FakeLLM:
+    """AsyncOpenAI 대역: 호출마다 respond(messages) 가 돌려준 FakeStream 반환, 호출 기록 보관"""
+
+    def __init__(self, respond):
+        self.respond = respond
+        self.calls: List[list] = []
+
+    def __call__(self, **kwargs):
+        async def create(messages, **options):
+            self.calls.append(messages)
+            return self.respond(messages)
+        return types.SimpleNamespace(chat=types.SimpleNamespace(completions=types.SimpleNamespace(create=create)))
+
+
+@pytest.fixture
+def qdrant_env(monkeypatch):
+    """기본 주소의 공유 Qdrant 연결을 :memory: 클라이언트로 교체하는 함수 반환 (이벤트 루프 안에서 호출)"""
+    from app.utils.config import QDRANT_HOST, QDRANT_PORT
+    from app.utils.qdrant import get_qdrant_connection
+
+    connection = get_qdrant_connection(QDRANT_HOST, QDRANT_PORT)
+
+    async def install(count: int = 300, seed: int = 0, size: int = 4, embed=None) -> AsyncQdrantClient:
+        client = await create_collection(count, seed=seed, size=size, embed=embed)
+        connection.client = client
+        connection.collections = {"RC"}
+        return client
+
+    yield install
+    connection.client = None
+    connection.collections = set()
+    connection._refresh_task = None
@@ -0,0 +1,127 @@
+"""검색 결과 / 키워드 / 답변 캐시 테스트"""
+import asyncio
+import pytest
+import app.routes.llm as llm
+from app.utils.cache import KeywordCache, QueryResultCache
+from tests.conftest import FakeLLM, FakeStream
+
+QUESTION = "dram bcat 불량"
+
+
+async def run_answer(question: str, candidates, generator_id: str):
+    """답변 노드를 실행하여 (전송된 청크, answer_delta 메시지, 최종 상태) 반환"""
+    generator = llm.SSEGenerator(generator_id)
+    llm.sse_generators[generator_id] = generator
+    try:
+        chunks, update = [], None
+        state = {'question': question, 'keyword': [question], 'candidates_each': [candidates],
+                 'candidates_total': candidates, 'response': candidates, 'generator_id': generator_id}
+        async for item in llm.node_rc_answer(state):
+            if isinstance(item, dict):
+                update = item
+            else:
+                chunks.append(item)
+        await generator.close()
+        deltas = []
+        while (message := generator.message_queue.get_nowait()) is not None:
+            if message["status"] == "answer_delta":
+                deltas.append(message["result"]["delta"])
+        return chunks, deltas, update
+    finally:
+        llm.sse_generators.pop(generator_id, None)
+
+
+def test_answer_cache_replays_stream_without_llm(qdrant_env, monkeypatch):
+    fake = FakeLLM(lambda messages: FakeStream("문서 기반 답변입니다"))
+    monkeypatch.setattr(llm, "OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(llm, "AsyncOpenAI", fake)
+
+    async def scenario():
+        client = await qdrant_env()
+        await llm.corpus_store.get(client, llm.QDRANT_COLLECTION)
+        candidates = await llm.direct_document_search(
+            "question", 5, [QUESTION], llm.QDRANT_HOST, llm.QDRANT_PORT, llm.QDRANT_COLLECTION
+        )
+        assert candidates
+        first = await run_answer(QUESTION, candidates, "first")
+        # 공백·대소문자만 다른 질문도 같은 답변을 재생
+        second = await run_answer(f"  {QUESTION.upper()} ", candidates, "second")
+        return first, second
+
+    (chunks, deltas, update), (replayed_chunks, replayed_deltas, replayed_update) = asyncio.run(scenario())
+    assert len(fake.calls) == 1
+    assert replayed_chunks == chunks and len(chunks) > 1
+    assert replayed_deltas == deltas and "".join(deltas) == "문서 기반 답변입니다"
+    assert replayed_update['response']['answer'] == update['response']['answer'] == "문서 기반 답변입니다"
+    assert llm.answer_cache.stats()["hits"] == 1
+
+
+def test_keyword_cache_skips_second_llm_call(qdrant_env, monkeypatch):
+    fake = FakeLLM(lambda messages: FakeStream("dram, wafer test"))
+    monkeypatch.setattr(llm, "OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(llm, "AsyncOpenAI", fake)
+
+    async def scenario():
+        await qdrant_env()
+        keywords = []
+        for _ in range(2):
+            async for update in llm.node_rc_keyword({'question': QUESTION}):
+                pass
+            keywords.append(update['keyword'])
+        return keywords
+
+    first, second = asyncio.run(scenario())
+    assert len(fake.calls) == 1
+    assert first == second and QUESTION in first and len(first) > 1
+    assert llm.keyword_cache.stats()["memory_hits"] == 1
+
+
+def test_keyword_cache_persists_to_sqlite(tmp_path):
+    db_path = str(tmp_path / "cache" / "keywords.db")
+
+    async def scenario():
+        writer = KeywordCache(db_path=db_path)
+        await writer.set(QUESTION, ["dram", "wafer"], 1.5)
+        writer.close()
+
+        reader = KeywordCache(db_path=db_path)
+        try:
+            assert await reader.get(QUESTION) == ["dram", "wafer"]
+            assert await reader.get(QUESTION) == ["dram", "wafer"]
+            # 모델이 다르면 저장된 결과를 쓰지 않음
+            assert await KeywordCache(db_path=db_path, model="other-model").get(QUESTION) is None
+            return reader.stats()
+        finally:
+            reader.close()
+
+    stats = asyncio.run(scenario())
+    assert stats["disk_hits"] == 1 and stats["memory_hits"] == 1
+    assert stats["saved_seconds"] == pytest.approx(3.0)
+
+
+def test_query_result_cache_hits_until_corpus_version_changes(qdrant_env):
+    args = ("question", 5, [QUESTION], llm.QDRANT_HOST, llm.QDRANT_PORT, llm.QDRANT_COLLECTION)
+
+    async def scenario():
+        client = await qdrant_env()
+        await llm.corpus_store.get(client, llm.QDRANT_COLLECTION)
+        first = await llm.direct_document_search(*args)
+        hits = llm.query_result_cache.stats()["hits"]
+        second = await llm.direct_document_search(*args)
+        assert second == first
+        assert llm.query_result_cache.stats()["hits"] == hits + 1
+
+    asyncio.run(scenario())
+
+
+def test_query_result_cache_invalidates_previous_version():
+    cache = QueryResultCache(max_size=10, ttl=None)
+    cache.set("Wafer  Yield", "RC", 5, 1, ["hit"])
+    assert cache.get("wafer yield", "RC", 5, 1) == ["hit"]
+    assert cache.get("wafer yield", "RC", 10, 1) is None
+
+    # 새 버전이 조회되면 이전 버전 항목은 제거되고, 교체 전 스냅샷의 요청은 저장·적중하지 않음
+    assert cache.get("wafer yield", "RC", 5, 2) is None
+    assert len(cache.cache) == 0
+    cache.set("wafer yield", "RC", 5, 1, ["stale"])
+    assert cache.get("wafer yield", "RC", 5, 1) is None and len(cache.cache) == 0
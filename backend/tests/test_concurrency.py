@@ -0,0 +1,110 @@
+"""선행 작업 저장소 테스트"""
+import gc
+import asyncio
+import warnings
+import pytest
+from app.utils.concurrency import SpeculativeTasks, bounded_gather, gather_within
+
+
+def test_take_releases_waiter_when_consumer_times_out():
+    async def scenario():
+        tasks = SpeculativeTasks(ttl=60)
+        started = tasks.start("q", lambda: asyncio.sleep(10, result="late"))
+        assert tasks.take("missing") is None
+
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(tasks.take("q"), timeout=0.01)
+        # 기다리는 요청이 없으므로 항목을 정리하고 작업도 중단
+        assert len(tasks) == 0
+        await asyncio.sleep(0)
+        assert started.cancelled()
+
+    asyncio.run(scenario())
+
+
+def test_shared_task_survives_one_cancelled_consumer():
+    async def scenario():
+        tasks = SpeculativeTasks(ttl=60)
+        first = tasks.start("q", lambda: asyncio.sleep(0.05, result="hits"))
+        second = tasks.start("q", lambda: asyncio.sleep(0.05, result="other"))
+        assert first is second
+
+        waiting = asyncio.ensure_future(tasks.take("q"))
+        impatient = asyncio.ensure_future(tasks.take("q"))
+        await asyncio.sleep(0)
+        impatient.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await impatient
+
+        assert len(tasks) == 1
+        assert await waiting == "hits"
+        assert len(tasks) == 0
+
+    asyncio.run(scenario())
+
+
+def test_entry_kept_while_consumer_waits():
+    async def scenario():
+        tasks = SpeculativeTasks(ttl=60)
+        tasks.start("q", lambda: asyncio.sleep(0.05, result="hits"))
+        waiting = asyncio.ensure_future(tasks.take("q"))
+        await asyncio.sleep(0)
+        # 기다리는 중에 같은 키로 시작하면 새로 시작하지 않고 공유
+        shared = tasks.start("q", lambda: asyncio.sleep(0.05, result="again"))
+        assert await tasks.take("q") == "hits"
+        assert await waiting == "hits"
+        assert shared.result() == "hits"
+        assert len(tasks) == 0
+
+    asyncio.run(scenario())
+
+
+def test_untaken_entry_expires_without_another_request():
+    async def scenario():
+        tasks = SpeculativeTasks(ttl=0.05)
+        finished = tasks.start("q", lambda: asyncio.sleep(0, result="hits"))
+        running = tasks.start("r", lambda: asyncio.sleep(10, result="late"))
+        await asyncio.sleep(0.01)
+        assert finished.done() and len(tasks) == 2
+        # 아무도 가져가지 않아도 ttl 뒤 예약된 정리로 항목과 진행 중 작업이 정리됨
+        await asyncio.sleep(0.1)
+        assert tasks._tasks == {}
+        assert running.cancelled()
+        assert tasks.take("q") is None
+
+    asyncio.run(scenario())
+
+
+def test_gather_within_keeps_finished_and_closes_queued_work():
+    async def work(delay: float, value: int) -> int:
+        await asyncio.sleep(delay)
+        return value
+
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        # limit 1 이므로 두 번째 작업이 시간 초과되면 세 번째 작업은 시작도 못 하고 취소됨
+        results, unfinished = asyncio.run(gather_within([work(0, 1), work(1.0, 2), work(0, 3)], 1, 0.1))
+        gc.collect()
+
+    assert results == [1] and unfinished == 2
+    assert not [w for w in caught if "never awaited" in str(w.message)]
+
+
+def test_bounded_gather_cancelled_before_start_closes_work():
+    async def work() -> int:
+        return 1
+
+    async def scenario():
+        task = asyncio.ensure_future(bounded_gather([work(), work()], 2))
+        await asyncio.sleep(0)
+        # 묶음 태스크들이 첫 실행 전에 함께 취소됨
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        asyncio.run(scenario())
+        gc.collect()
+
+    assert not [w for w in caught if "never awaited" in str(w.message)]
@@ -0,0 +1,48 @@
+"""스냅샷 저장소 로드/동기화 테스트"""
+import asyncio
+from app.utils import corpus, index_store
+from app.utils.corpus import CorpusStore
+from tests.conftest import create_collection
+
+
+def test_get_ready_does_not_wait_for_running_build(tmp_path, monkeypatch):
+    """최초 구축이 진행 중이어도 get_ready 는 디스크만 확인하고 바로 None 반환 (스트리밍 경로로 진행)"""
+    probes = []
+    original_load = index_store.load_snapshot
+
+    def counting_load(*args, **kwargs):
+        probes.append(args[0])
+        return original_load(*args, **kwargs)
+
+    monkeypatch.setattr(index_store, "load_snapshot", counting_load)
+
+    async def scenario():
+        client = await create_collection(50)
+        store = CorpusStore(index_dir=str(tmp_path), count_check_interval=60)
+        released = asyncio.Event()
+        original_scroll = corpus.scroll_all_documents
+
+        async def slow_scroll(*args, **kwargs):
+            await released.wait()
+            return await original_scroll(*args, **kwargs)
+
+        monkeypatch.setattr(corpus, "scroll_all_documents", slow_scroll)
+        build = asyncio.create_task(store.get(client, "RC"))
+        await asyncio.sleep(0)
+
+        assert await asyncio.wait_for(store.get_ready(client, "RC"), timeout=1.0) is None
+        # 디스크에 스냅샷이 없다는 결과는 재사용
+        assert await asyncio.wait_for(store.get_ready(client, "RC"), timeout=1.0) is None
+        assert probes == ["RC"]
+
+        released.set()
+        snapshot = await asyncio.wait_for(build, timeout=10.0)
+        assert len(snapshot) == 50
+        assert await store.get_ready(client, "RC") is snapshot
+
+        # 무효화하면 디스크를 다시 확인
+        store.invalidate("RC")
+        assert await store.get_ready(client, "RC") is None
+        assert probes == ["RC", "RC"]
+
+    asyncio.run(scenario())
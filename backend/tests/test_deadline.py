@@ -0,0 +1,119 @@
+"""요청 마감 시각에 따른 단계별 축소 테스트"""
+import time
+import asyncio
+import pytest
+import app.routes.llm as llm
+from app.utils.deadline import remaining_budget
+from tests.conftest import FakeLLM, FakeStream
+
+QUESTION = "dram bcat 불량"
+
+
+@pytest.fixture
+def short_budgets(monkeypatch):
+    """테스트용으로 단계별 최소 예산을 줄임"""
+    monkeypatch.setattr(llm, "OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(llm, "RAG_KEYWORD_MIN_BUDGET", 0.3)
+    monkeypatch.setattr(llm, "RAG_RETRIEVAL_MIN_BUDGET", 0.4)
+    monkeypatch.setattr(llm, "RAG_ANSWER_MIN_BUDGET", 0.2)
+
+
+def test_keyword_timeout_leaves_retrieval_budget(short_budgets, qdrant_env, monkeypatch):
+    # 끝나지 않는 키워드 스트림
+    stream = FakeStream("dram, wafer, " * 50, delay=0.05)
+    monkeypatch.setattr(llm, "AsyncOpenAI", FakeLLM(lambda messages: stream))
+
+    async def scenario():
+        await qdrant_env()
+        state = {'question': QUESTION, 'deadline': time.monotonic() + 1.0}
+        async for update in llm.node_rc_keyword(state):
+            pass
+        # 키워드 증강은 검색 + 답변 몫을 남기고 중단
+        assert remaining_budget(state) >= 0.4 + 0.2 - 0.1
+        assert update['keyword'][0] == QUESTION
+        # 중단한 업스트림 응답은 닫음
+        assert stream.closed and stream.items
+
+    asyncio.run(scenario())
+
+
+def test_rag_keeps_finished_speculative_search_after_deadline(qdrant_env):
+    async def scenario():
+        await qdrant_env()
+        llm.start_question_search(QUESTION, llm.QDRANT_HOST, llm.QDRANT_PORT, llm.QDRANT_COLLECTION)
+        expected = await llm.direct_document_search('question', llm.QUESTION_SEARCH_LIMIT, [QUESTION],
+                                                    llm.QDRANT_HOST, llm.QDRANT_PORT, llm.QDRANT_COLLECTION)
+        await asyncio.sleep(0.05)
+
+        # 마감이 이미 지났어도 완료된 선행 질문 검색 결과는 사용
+        result = await llm.node_rc_rag({'question': QUESTION, 'keyword': [], 'deadline': time.monotonic() - 1})
+        assert [c['res_id'] for c in result['candidates_total']] == [hit['res_id'] for hit in expected]
+
+    asyncio.run(scenario())
+
+
+def test_rag_falls_back_to_question_top1_when_nothing_finished(qdrant_env, monkeypatch):
+    async def never_finishes(*args, **kwargs):
+        await asyncio.sleep(60)
+
+    async def scenario():
+        await qdrant_env()
+        expected = await llm.direct_document_search('question', 1, [QUESTION],
+                                                    llm.QDRANT_HOST, llm.QDRANT_PORT, llm.QDRANT_COLLECTION)
+        monkeypatch.setattr(llm, "RETRIEVAL_MODE", "hybrid")
+        monkeypatch.setattr(llm, "hybrid_document_search", never_finishes)
+
+        result = await llm.node_rc_rag({'question': QUESTION, 'keyword': ["wafer test"],
+                                        'deadline': time.monotonic() + 0.1})
+        assert [c['res_id'] for c in result['candidates_total']] == [expected[0]['res_id']]
+
+    asyncio.run(scenario())
+
+
+def test_answer_without_budget_skips_llm(short_budgets, qdrant_env, monkeypatch):
+    fake = FakeLLM(lambda messages: FakeStream("LLM 답변"))
+    monkeypatch.setattr(llm, "AsyncOpenAI", fake)
+
+    async def scenario():
+        await qdrant_env()
+        rag = await llm.node_rc_rag({'question': QUESTION, 'keyword': []})
+        top = rag['candidates_total'][:1]
+        outputs = [item async for item in llm.node_rc_answer({
+            'question': QUESTION, 'keyword': [], 'response': top, 'candidates_total': top,
+            'deadline': time.monotonic() + 0.1,
+        })]
+        final = outputs[-1]
+        assert fake.calls == []
+        assert "응답 시간 제한" in final['response']['answer']
+        assert top[0]['res_payload']['document_name'] in final['response']['answer']
+
+    asyncio.run(scenario())
+
+
+def test_hydration_keeps_compact_payloads_at_deadline(short_budgets, qdrant_env, monkeypatch):
+    async def hangs(*args, **kwargs):
+        await asyncio.sleep(60)
+
+    async def scenario():
+        await qdrant_env()
+        llm.start_question_search(QUESTION, llm.QDRANT_HOST, llm.QDRANT_PORT, llm.QDRANT_COLLECTION)
+        await asyncio.sleep(0.05)
+        monkeypatch.setattr(llm, "fetch_payloads", hangs)
+
+        started = time.monotonic()
+        rag = await llm.node_rc_rag({'question': QUESTION, 'keyword': [], 'deadline': started + 0.5})
+        # 답변 몫(0.2초)을 남기고 전체 payload 조회를 포기
+        assert time.monotonic() - started < 0.45
+        top = rag['candidates_total'][:1]
+        assert top and "vector" not in top[0]['res_payload']
+
+        started = time.monotonic()
+        outputs = [item async for item in llm.node_rc_answer({
+            'question': QUESTION, 'keyword': [], 'response': top, 'candidates_total': top,
+            'deadline': started + 0.5,
+        })]
+        # 상위 문서 재조회도 시간 안에 포기하고 제목만으로 답변 진행
+        assert time.monotonic() - started < 0.45
+        assert top[0]['res_payload']['document_name'] in outputs[-1]['response']['answer']
+
+    asyncio.run(scenario())
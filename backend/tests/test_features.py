@@ -0,0 +1,95 @@
+"""토큰 사전/문서 특징 테스트"""
+import pytest
+from app.utils.corpus import CorpusSnapshot
+from app.utils.features import DocumentFeatures, FeatureStore, Vocabulary, vocabulary, feature_store
+from app.utils.streaming_search import score_page
+
+DOCUMENTS = [
+    {'id': i, 'payload': {'document_name': f"문서{i} dram", 'vector': {'text': text}}}
+    for i, text in enumerate(["bcat 불량 분석 고유토큰가", "wafer test yield 고유토큰나", "dram dram fail bit"])
+]
+
+
+def test_query_features_do_not_grow_vocabulary():
+    store = FeatureStore()
+    doc_features = store.get(0, DOCUMENTS[0]['payload'])
+    size = len(store.vocab)
+
+    query = "bcat 불량 처음보는질의토큰 또다른질의토큰"
+    query_features = DocumentFeatures.for_query(query, store.vocab)
+    assert len(store.vocab) == size
+    # 임시 ID 를 쓴 쿼리 특징도 사전에 등록한 경우와 같은 유사도
+    expected = DocumentFeatures.from_text(query, store.vocab).similarity(doc_features)
+    assert query_features.similarity(doc_features) == pytest.approx(expected)
+    assert list(query_features.term_ids) == sorted(query_features.term_ids)
+
+
+def test_builds_use_private_vocabularies():
+    size = len(vocabulary)
+    snapshot = CorpusSnapshot.build("RC", DOCUMENTS, len(DOCUMENTS), 1)
+    score_page(DOCUMENTS, ["dram 고유토큰가"], 2)
+    assert len(vocabulary) == size
+    assert "고유토큰가" in snapshot.engine.vocabulary
+    assert feature_store.vocab is vocabulary
+
+
+def test_similarity_calculator_does_not_grow_vocabulary():
+    from app.routes.llm import DirectSimilarityCalculator
+
+    size = len(vocabulary)
+    calculator = DirectSimilarityCalculator()
+    score = calculator.calculate_combined_similarity("계산기전용토큰 dram", "계산기전용토큰 dram bcat")
+    assert len(vocabulary) == size
+    vocab = Vocabulary()
+    expected = DocumentFeatures.from_text("계산기전용토큰 dram", vocab).similarity(
+        DocumentFeatures.from_text("계산기전용토큰 dram bcat", vocab))
+    assert score == pytest.approx(expected)
+
+
+def test_feature_store_revalidates_and_skips_uncached_payloads():
+    store = FeatureStore()
+    first = store.get(0, DOCUMENTS[0]['payload'])
+    assert store.get(0, DOCUMENTS[0]['payload']) is first
+
+    # 내용이 바뀐 문서는 지문이 달라 다시 계산
+    changed = {'document_name': "문서0 dram", 'vector': {'text': "완전히 바뀐 본문"}}
+    assert store.get(0, changed) is not first
+
+    # 저장하지 않도록 요청한 특징은 기존 항목을 덮어쓰지 않음
+    compact = {'document_name': "문서0 dram"}
+    store.get(0, compact, store=False)
+    assert store.get(0, changed) is store.get(0, changed)
+    assert store.get(1, compact, store=False) is not None and len(store) == 1
+
+
+def test_rerank_uses_current_text_and_one_query_lookup(monkeypatch):
+    import asyncio
+    import app.routes.llm as llm
+
+    store = FeatureStore(vocab=Vocabulary())
+    monkeypatch.setattr(llm, "feature_store", store)
+    calls = []
+    for_query = DocumentFeatures.for_query
+    monkeypatch.setattr(DocumentFeatures, "for_query",
+                        staticmethod(lambda text, vocab: calls.append(text) or for_query(text, vocab)))
+
+    question = "wafer test yield"
+    # 이전 버전 본문의 특징이 캐시에 남아 있는 문서
+    store.get(1, {'document_name': "문서1", 'vector': {'text': "bcat 불량"}})
+    current = {'document_name': "문서1", 'vector': {'text': "wafer test yield"}}
+    compact = {'document_name': "문서2 wafer"}
+    candidates = [
+        {'res_id': 1, 'res_score': 0.5, 'res_payload': current},
+        {'res_id': 2, 'res_score': 0.5, 'res_payload': compact},
+        {'res_id': 3, 'res_score': 0.5, 'res_payload': {}, 'res_features': {'similarity': 0.25}},
+    ]
+    result = asyncio.run(llm.node_rc_rerank({'question': question, 'keyword': [question], 'candidates_total': candidates}))
+
+    relevance = {candidate['res_id']: candidate['res_relevance'] for candidate in result['candidates_total']}
+    vocab = Vocabulary()
+    assert relevance[1] == pytest.approx(DocumentFeatures.from_text(question, vocab).similarity(
+        DocumentFeatures.from_text("문서1 wafer test yield", vocab)))
+    assert relevance[3] == 0.25
+    assert calls == [question]
+    # 본문 없는 축약 payload 의 특징은 캐시하지 않음
+    assert len(store) == 1
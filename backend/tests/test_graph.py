@@ -0,0 +1,73 @@
+"""LangGraph 전체 흐름 테스트"""
+import json
+import asyncio
+import pytest
+import app.routes.llm as llm
+from app.utils.metrics import branch_latency
+from tests.conftest import FakeLLM, FakeStream
+
+
+@pytest.fixture(scope="module")
+def graph():
+    """create_langgraph 는 llm2.py 에 있고 llm.py 의 이름을 그대로 사용하므로 같은 네임스페이스에서 실행"""
+    namespace = vars(llm)
+    if "create_langgraph" not in namespace:
+        with open(llm.__file__.replace("llm.py", "llm2.py"), encoding="utf-8") as f:
+            exec(compile(f.read(), "app/routes/llm2.py", "exec"), namespace)
+    return namespace["create_langgraph"]()
+
+
+async def run_graph(graph, question: str):
+    """SSE 제너레이터를 등록하고 그래프를 실행하여 (발행된 메시지 목록, 최종 상태) 반환"""
+    generator_id = "test-generator"
+    generator = llm.SSEGenerator(generator_id)
+    llm.sse_generators[generator_id] = generator
+    try:
+        result = await graph.ainvoke({"question": question, "generator_id": generator_id})
+        await generator.close()
+        messages = []
+        while (message := generator.message_queue.get_nowait()) is not None:
+            json.dumps(message)     # SSE 로 직렬화 가능해야 함
+            messages.append(message)
+        return messages, result
+    finally:
+        llm.sse_generators.pop(generator_id, None)
+
+
+def test_no_result_question_publishes_plain_answer(graph, qdrant_env, monkeypatch):
+    monkeypatch.setattr(llm, "OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(llm, "AsyncOpenAI", FakeLLM(lambda messages: FakeStream("없는용어가, 없는용어나")))
+
+    async def scenario():
+        await qdrant_env()
+        return await run_graph(graph, "전혀 없는 주제 질문")
+
+    messages, result = asyncio.run(scenario())
+    stages = [(message["stage"], message["status"]) for message in messages]
+    assert stages == [("A", "completed"), ("B", "completed"), ("C", "completed"), ("D", "completed")]
+
+    final = messages[-1]["result"]
+    assert "관련 정보를 찾을 수 없습니다" in final["answer"]
+    assert final["document_titles"] == [] and final["search_results"] == []
+    assert result["response"]["answer"] == final["answer"]
+    assert result["candidates_total"] == []
+
+
+def test_result_question_streams_answer(graph, qdrant_env, monkeypatch):
+    monkeypatch.setattr(llm, "OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(llm, "AsyncOpenAI", FakeLLM(
+        lambda messages: FakeStream("dram, wafer test" if "키워드" in messages[-1]["content"] else "문서 기반 답변입니다")
+    ))
+
+    async def scenario():
+        await qdrant_env()
+        return await run_graph(graph, "dram bcat 불량")
+
+    before = branch_latency.snapshot(router="judge_rc_ragscore", branch="Y")["count"]
+    messages, result = asyncio.run(scenario())
+    # 검색 결과가 있는 분기의 요청 시작부터 판단까지 시간 기록
+    assert branch_latency.snapshot(router="judge_rc_ragscore", branch="Y")["count"] == before + 1
+    deltas = [message["result"]["delta"] for message in messages if message["status"] == "answer_delta"]
+    assert "".join(deltas) == "문서 기반 답변입니다"
+    assert messages[-1]["stage"] == "D" and messages[-1]["status"] == "completed"
+    assert result["response"]["answer"] == "문서 기반 답변입니다"
@@ -0,0 +1,76 @@
+"""어휘 + 벡터 검색 융합 테스트"""
+import asyncio
+import pytest
+import app.routes.llm as llm
+import app.utils.hybrid as hybrid
+from app.utils.hybrid import (HashingEmbedding, dense_search, fuse_rankings, reciprocal_rank_fusion,
+                              set_embedding_function, weighted_score_fusion)
+
+QUERIES = ["dram bcat 불량", "wafer yield"]
+DIM = 64
+
+
+@pytest.fixture
+def embedding(monkeypatch):
+    """테스트 동안만 해싱 임베딩을 하이브리드 검색에 설정"""
+    monkeypatch.setattr(hybrid, "_embedding_function", hybrid._embedding_function)
+    monkeypatch.setattr(hybrid, "_embedding_loaded", hybrid._embedding_loaded)
+    embed = HashingEmbedding(DIM)
+    set_embedding_function(embed)
+    return embed
+
+
+def test_rrf_scores_top_document_in_every_list_as_one():
+    fused = reciprocal_rank_fusion([[("a", 9.0), ("b", 1.0)], [("a", 0.8), ("c", 0.7)]])
+    assert fused[0] == ("a", pytest.approx(1.0))
+    assert [doc_id for doc_id, _ in fused] == ["a", "b", "c"]
+    assert reciprocal_rank_fusion([[("a", 1.0)], [("b", 1.0)]], top_k=1)[0][1] == pytest.approx(0.5)
+
+
+def test_weighted_fusion_sums_weighted_scores():
+    fused = weighted_score_fusion([[("a", 1.0), ("b", 0.5)], [("b", 1.0), ("c", -0.3)]], [0.25, 0.75])
+    assert fused == [("b", pytest.approx(0.875)), ("a", pytest.approx(0.25)), ("c", 0.0)]
+    with pytest.raises(ValueError):
+        fuse_rankings([], [], strategy="unknown")
+
+
+def test_hybrid_search_fuses_lexical_and_dense_results(qdrant_env, embedding):
+    async def scenario():
+        client = await qdrant_env(size=DIM, embed=embedding)
+        args = (llm.QDRANT_HOST, llm.QDRANT_PORT, llm.QDRANT_COLLECTION)
+        await llm.corpus_store.get(client, llm.QDRANT_COLLECTION)
+
+        results = await llm.hybrid_document_search("question", 5, QUERIES, *args)
+
+        # 같은 입력으로 융합 순위를 직접 계산
+        lexical = await llm.direct_document_search("question", llm.HYBRID_CANDIDATE_LIMIT, QUERIES, *args)
+        dense = await dense_search(client, llm.QDRANT_COLLECTION, QUERIES, llm.HYBRID_CANDIDATE_LIMIT, embedding)
+        lexical_scores, dense_scores = {}, {}
+        for item in lexical:
+            lexical_scores[item['res_id']] = max(lexical_scores.get(item['res_id'], 0.0), item['res_score'])
+        for hits in dense:
+            for hit in hits:
+                dense_scores[hit.id] = max(dense_scores.get(hit.id, float('-inf')), hit.score)
+        expected = fuse_rankings(sorted(lexical_scores.items(), key=lambda x: x[1], reverse=True),
+                                 sorted(dense_scores.items(), key=lambda x: x[1], reverse=True), top_k=5)
+
+        assert dense_scores and lexical_scores
+        assert [item['res_id'] for item in results] == [doc_id for doc_id, _ in expected]
+        assert [item['res_score'] for item in results] == pytest.approx([score for _, score in expected])
+        assert all(item['type_vector'] == 'hybrid' and item['res_payload'] for item in results)
+
+    asyncio.run(scenario())
+
+
+def test_hybrid_search_without_embedding_returns_lexical_results(qdrant_env, monkeypatch):
+    monkeypatch.setattr(hybrid, "_embedding_function", None)
+    monkeypatch.setattr(hybrid, "_embedding_loaded", True)
+
+    async def scenario():
+        client = await qdrant_env()
+        args = (llm.QDRANT_HOST, llm.QDRANT_PORT, llm.QDRANT_COLLECTION)
+        await llm.corpus_store.get(client, llm.QDRANT_COLLECTION)
+        results = await llm.hybrid_document_search("question", 5, QUERIES, *args)
+        assert results == await llm.direct_document_search("question", 5, QUERIES, *args)
+
+    asyncio.run(scenario())
@@ -0,0 +1,64 @@
+"""키워드 스트리밍 중 선행 검색 테스트"""
+import asyncio
+import pytest
+import app.routes.llm as llm
+from tests.conftest import FakeLLM, FakeStream
+
+QUESTION = "dram bcat 불량"
+KEYWORDS = "wafer, test, yield, fail, bit, 분석"
+
+
+@pytest.fixture
+def keyword_llm(monkeypatch):
+    monkeypatch.setattr(llm, "OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(llm, "AsyncOpenAI", FakeLLM(lambda messages: FakeStream(KEYWORDS)))
+
+
+@pytest.fixture
+def scrolls(monkeypatch):
+    """스트리밍 검색(컬렉션 전체 스크롤) 호출 횟수 기록"""
+    calls = []
+    stream_search = llm.stream_search
+
+    async def counting(*args, **kwargs):
+        calls.append(args[2])
+        return await stream_search(*args, **kwargs)
+
+    monkeypatch.setattr(llm, "stream_search", counting)
+    return calls
+
+
+async def run_keyword_and_rag():
+    async for update in llm.node_rc_keyword({'question': QUESTION}):
+        pass
+    started = len(llm.speculative_searches)
+    rag = await llm.node_rc_rag({'question': QUESTION, 'keyword': update['keyword']})
+    return update['keyword'], started, rag
+
+
+def test_keywords_without_index_share_one_streaming_pass(keyword_llm, scrolls, qdrant_env, monkeypatch):
+    monkeypatch.setattr(llm, "RAG_STREAMING_SEARCH", "always")
+
+    async def scenario():
+        await qdrant_env()
+        return await run_keyword_and_rag()
+
+    keywords, started, rag = asyncio.run(scenario())
+    assert len(keywords) == 7
+    # 키워드별 검색은 시작하지 않고, 질문 검색 1회 + 키워드 전체 1회만 스크롤
+    assert started == 0
+    assert len(scrolls) == 2 and sorted(map(len, scrolls)) == [1, len(keywords)]
+    assert rag['candidates_total']
+
+
+def test_keywords_with_ready_index_start_per_keyword(keyword_llm, scrolls, qdrant_env):
+    async def scenario():
+        client = await qdrant_env()
+        await llm.corpus_store.get(client, llm.QDRANT_COLLECTION)
+        return await run_keyword_and_rag()
+
+    keywords, started, rag = asyncio.run(scenario())
+    # 준비된 색인이 있으면 키워드가 완성되는 즉시 (원 질문 포함) 키워드별 검색 시작, 스크롤 없음
+    assert started == len(keywords)
+    assert scrolls == []
+    assert rag['candidates_total']
@@ -0,0 +1,38 @@
+"""지표 수집 테스트"""
+import time
+from app.utils.cache import answer_cache, cache_stats, keyword_cache
+from app.utils.metrics import branch_decisions, branch_latency, instrument_router, registry
+
+
+def test_router_records_branch_latency_summary():
+    router = instrument_router("test_router", lambda state: "Y" if state["ok"] else "N")
+    before = branch_decisions.value(router="test_router", branch="Y")
+    assert router({"ok": True, "started_at": time.monotonic() - 0.5}) == "Y"
+    assert router({"ok": False, "started_at": time.monotonic() - 0.1}) == "N"
+    # 시작 시각이 없는 상태는 횟수만 기록
+    assert router({"ok": True}) == "Y"
+
+    assert branch_decisions.value(router="test_router", branch="Y") == before + 2
+    yes = branch_latency.snapshot(router="test_router", branch="Y")
+    no = branch_latency.snapshot(router="test_router", branch="N")
+    assert yes["count"] == 1 and yes["sum"] >= 0.5 and yes["p50"] == yes["p95"] == yes["p99"] == yes["sum"]
+    assert no["count"] == 1 and 0.1 <= no["sum"] < 0.5
+    text = registry.render()
+    assert 'langgraph_branch_latency_seconds_count{router="test_router",branch="Y"} 1' in text
+    assert 'langgraph_branch_latency_seconds{router="test_router",branch="N",quantile="0.95"}' in text
+
+
+def test_cache_stats_exported_on_metrics(monkeypatch):
+    answer_cache.set("질문", (1, 2), "RC", 1, ["청크"])
+    answer_cache.get("질문", (1, 2), "RC", 1)
+    answer_cache.get("다른 질문", (1, 2), "RC", 1)
+    monkeypatch.setattr(keyword_cache, "saved_seconds", 1.5)
+
+    stats = cache_stats()
+    text = registry.render()
+    assert f'cache_hits_total{{cache="answer_cache"}} {float(stats["answer_cache"]["hits"])!r}' in text
+    assert f'cache_misses_total{{cache="answer_cache"}} {float(stats["answer_cache"]["misses"])!r}' in text
+    assert 'cache_entries{cache="answer_cache"} 1.0' in text
+    assert 'cache_hits_total{cache="keyword_cache"}' in text
+    assert "keyword_cache_saved_seconds_total 1.5" in text
+    assert "# TYPE cache_entries gauge" in text
@@ -0,0 +1,97 @@
+"""CSR 점수 계산 / MaxScore / 샤드 검색 테스트 (DirectSimilarityCalculator 와 같은 결과)"""
+import asyncio
+import random
+import pytest
+from app.routes.llm import DirectSimilarityCalculator
+from app.utils.corpus import CorpusSnapshot
+from app.utils.scoring_pool import ScoringExecutor, shard_range
+from tests.conftest import WORDS
+
+QUERIES = ["dram bcat 불량", "wafer, test!! yield yield", "", "fail", "없는용어 분석"]
+
+
+def make_documents(count: int, seed: int = 0, start: int = 0):
+    rng = random.Random(seed)
+    return [
+        {'id': i, 'payload': {'document_name': ' '.join(rng.choices(WORDS, k=2)),
+                              'vector': {'text': ' '.join(rng.choices(WORDS, k=rng.randint(0, 12)))}}}
+        for i in range(start, start + count)
+    ]
+
+
+@pytest.fixture(scope="module")
+def snapshot():
+    return CorpusSnapshot.build("RC", make_documents(400), 400, 1)
+
+
+@pytest.fixture(scope="module")
+def merged_snapshot(snapshot):
+    # 증분 동기화로 만든 (병합 행렬) 스냅샷
+    changed = make_documents(40, seed=1, start=380)
+    deleted = list(range(0, 400, 7))
+    return snapshot.apply_delta(changed, deleted, 400, 2)
+
+
+def test_shard_ranges_cover_all_documents():
+    for num_documents in (0, 1, 7, 400):
+        for num_shards in (1, 2, 3, 8):
+            ranges = [shard_range(num_documents, (index, num_shards)) for index in range(num_shards)]
+            assert ranges[0][0] == 0 and ranges[-1][1] == num_documents
+            assert all(prev[1] == cur[0] for prev, cur in zip(ranges, ranges[1:]))
+
+
+@pytest.mark.parametrize("strategy", ["matrix", "maxscore"])
+@pytest.mark.parametrize("num_shards", [2, 3, 8])
+@pytest.mark.parametrize("which", ["snapshot", "merged_snapshot"])
+def test_sharded_scoring_matches_unsharded(request, which, num_shards, strategy):
+    target = request.getfixturevalue(which)
+    expected = target.engine.search_batch(QUERIES, 7)
+    rankings = asyncio.run(ScoringExecutor("thread", shards=num_shards).score(target, QUERIES, 7, strategy))
+    assert [[doc_no for doc_no, _ in ranking] for ranking in rankings] == \
+        [[doc_no for doc_no, _ in ranking] for ranking in expected]
+    for ranking, expected_ranking in zip(rankings, expected):
+        assert [score for _, score in ranking] == pytest.approx([score for _, score in expected_ranking])
+
+
+def test_doc_range_returns_only_documents_in_range(snapshot):
+    for doc_range in [(0, 100), (150, 151), (399, 400), (10, 10)]:
+        for rankings in (snapshot.engine.search_batch(QUERIES, 50, doc_range),
+                         snapshot.engine.search_many_top_k(QUERIES, 50, doc_range)):
+            assert all(doc_range[0] <= doc_no < doc_range[1] for ranking in rankings for doc_no, _ in ranking)
+
+
+def calculator_ranking(documents, query: str, top_k: int):
+    """기준 구현: 문서마다 텍스트 유사도를 계산해 상위 k (일치 용어가 없는 0점 문서는 제외)"""
+    ranked = DirectSimilarityCalculator().find_similar_documents(query, [doc['payload'] for doc in documents], top_k)
+    positions = {id(doc['payload']): doc_no for doc_no, doc in enumerate(documents)}
+    return [(positions[id(item['document'])], item['similarity']) for item in ranked if item['similarity'] > 0]
+
+
+def assert_matches_calculator(documents, queries, rankings):
+    for query, ranking in zip(queries, rankings):
+        expected = calculator_ranking(documents, query, 10)
+        assert [doc_no for doc_no, _ in ranking] == [doc_no for doc_no, _ in expected], query
+        assert [score for _, score in ranking] == pytest.approx([score for _, score in expected])
+
+
+def test_matrix_scoring_matches_similarity_calculator():
+    documents = make_documents(300, seed=7)
+    target = CorpusSnapshot.build("RC", documents, len(documents), 1)
+    queries = [query for query in QUERIES if query]
+    assert_matches_calculator(documents, queries, target.engine.search_batch(queries, 10))
+
+
+def test_maxscore_matches_similarity_calculator():
+    documents = make_documents(300, seed=7)
+    target = CorpusSnapshot.build("RC", documents, len(documents), 1)
+    queries = [query for query in QUERIES if query]
+    assert_matches_calculator(documents, queries, target.engine.search_many_top_k(queries, 10))
+
+
+@pytest.mark.parametrize("strategy", ["matrix", "maxscore"])
+def test_sharded_scoring_matches_similarity_calculator(strategy):
+    documents = make_documents(300, seed=7)
+    target = CorpusSnapshot.build("RC", documents, len(documents), 1)
+    queries = [query for query in QUERIES if query]
+    rankings = asyncio.run(ScoringExecutor("thread", shards=3).score(target, queries, 10, strategy))
+    assert_matches_calculator(documents, queries, rankings)
@@ -0,0 +1,147 @@
+"""공유 메모리 색인 로더/워커 연결 테스트"""
+import sys
+import json
+import asyncio
+import subprocess
+import random
+import pytest
+import numpy as np
+import qdrant_client
+from app.utils import shared_index
+from app.utils.index_store import StringTable, TermTable, encode_strings, snapshot_arrays, snapshot_from_arrays
+from app.utils.corpus import CorpusSnapshot, CorpusStore
+from tests.conftest import WORDS, create_collection, make_point, ranked_ids
+
+QUERIES = ["dram bcat 불량", "wafer test", "yield 개선 원인"]
+
+WORKER = """
+import sys, json, asyncio
+from app.utils.corpus import CorpusStore
+store = CorpusStore(index_dir=sys.argv[1], shared=True)
+snapshot = asyncio.run(store.get(None, "RC"))
+rankings = snapshot.engine.search_batch(json.loads(sys.argv[2]), 5)
+print(json.dumps({"segment": snapshot.segment, "count": len(snapshot),
+                  "ids": [[snapshot.doc_ids[doc_no] for doc_no, _ in ranking] for ranking in rankings]}))
+"""
+
+
+def attach_in_worker(base_dir) -> dict:
+    """별도 워커 프로세스에서 게시본에 연결하여 검색"""
+    result = subprocess.run(
+        [sys.executable, "-c", WORKER, str(base_dir), json.dumps(QUERIES, ensure_ascii=False)],
+        capture_output=True, text=True, timeout=60,
+    )
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+async def wait_for_manifest(base_dir, previous=None, timeout: float = 10.0) -> dict:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while asyncio.get_running_loop().time() < deadline:
+        manifest = shared_index.read_manifest("RC", str(base_dir))
+        if manifest is not None and manifest["segment"] != previous:
+            return manifest
+        await asyncio.sleep(0.05)
+    raise AssertionError("로더가 매니페스트를 게시하지 않음")
+
+
+def test_loader_publishes_and_worker_attaches(tmp_path, monkeypatch):
+    # 워커 설정(shared 모드)이 기본값이어도 로더는 Qdrant 에서 직접 구축해야 함
+    class SharedByDefault(CorpusStore):
+        def __init__(self, *args, shared: bool = True, **kwargs):
+            super().__init__(*args, shared=shared, **kwargs)
+
+    async def scenario():
+        client = await create_collection(300, seed=3)
+        monkeypatch.setattr(qdrant_client, "AsyncQdrantClient", lambda **kwargs: client)
+        monkeypatch.setattr(shared_index, "CorpusStore", SharedByDefault)
+
+        loader = asyncio.create_task(shared_index.run_loader("RC", base_dir=str(tmp_path), interval=0.05))
+        try:
+            manifest = await wait_for_manifest(tmp_path)
+            expected = await CorpusStore(index_dir=None).refresh(client, "RC")
+
+            attached = await asyncio.to_thread(attach_in_worker, tmp_path)
+            assert attached["segment"] == manifest["segment"]
+            assert attached["count"] == 300
+            assert attached["ids"] == ranked_ids(expected, QUERIES, 5)
+
+            # 문서 추가 → 로더가 새 세그먼트를 게시하고 워커가 새 버전에 연결
+            rng = random.Random(4)
+            await client.upsert("RC", points=[make_point(i, rng) for i in range(300, 320)])
+            manifest = await wait_for_manifest(tmp_path, manifest["segment"])
+            attached = await asyncio.to_thread(attach_in_worker, tmp_path)
+            assert attached["segment"] == manifest["segment"]
+            assert attached["count"] == 320
+        finally:
+            loader.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await loader
+
+        # 로더 종료 시 매니페스트와 세그먼트 정리
+        assert shared_index.read_manifest("RC", str(tmp_path)) is None
+        with pytest.raises(FileNotFoundError):
+            shared_index.SharedMemory(name=manifest["segment"])
+
+    asyncio.run(scenario())
+
+
+def test_attach_matches_built_snapshot(tmp_path):
+    async def scenario():
+        client = await create_collection(200, seed=5)
+        snapshot = await CorpusStore(index_dir=None).refresh(client, "RC")
+        segment = shared_index.publish_snapshot(snapshot, str(tmp_path))
+        try:
+            manifest = shared_index.read_manifest("RC", str(tmp_path))
+            # 연결 관리자가 세그먼트를 보관하므로 배열을 쓰는 동안 유지해야 함
+            attacher = shared_index.SharedIndexAttacher()
+            attached = attacher.attach(manifest, snapshot.version + 1, untrack=False)
+            assert isinstance(attached, CorpusSnapshot)
+            assert list(attached.doc_ids) == list(snapshot.doc_ids)
+            assert ranked_ids(attached, QUERIES, 5) == ranked_ids(snapshot, QUERIES, 5)
+            del attached
+            attacher.segments["RC"][0].close()
+        finally:
+            segment.close()
+            segment.unlink()
+
+    asyncio.run(scenario())
+
+
+def make_snapshot(count: int, seed: int = 0) -> CorpusSnapshot:
+    rng = random.Random(seed)
+    documents = [
+        {'id': i, 'payload': {'document_name': f"문서{i}", 'vector': {'text': ' '.join(rng.choices(WORDS, k=8))}}}
+        for i in range(count)
+    ]
+    return CorpusSnapshot.build("RC", documents, count, 1)
+
+
+def test_loaded_vocabulary_is_looked_up_without_a_dict():
+    snapshot = make_snapshot(200)
+    loaded = snapshot_from_arrays(*snapshot_arrays(snapshot), version=2)
+    vocabulary = loaded.engine.vocabulary
+
+    assert isinstance(vocabulary, TermTable) and not isinstance(vocabulary, dict)
+    assert list(vocabulary) == list(snapshot.engine.vocabulary)
+    assert all(vocabulary[term] == row for term, row in snapshot.engine.vocabulary.items())
+    assert vocabulary.get("없는용어") is None and "없는용어" not in vocabulary
+    assert ranked_ids(loaded, QUERIES, 5) == ranked_ids(snapshot, QUERIES, 5)
+
+    # 불러온 스냅샷에도 변경분 반영 가능
+    merged = loaded.apply_delta(
+        [{'id': 0, 'payload': {'document_name': "문서0", 'vector': {'text': "새로운용어 dram"}}}], [], 200, 3
+    )
+    assert merged.engine.vocabulary["새로운용어"] == len(snapshot.engine.vocabulary)
+    assert merged.engine.vocabulary["dram"] == snapshot.engine.vocabulary["dram"]
+
+
+def test_term_table_resolves_hash_collisions(monkeypatch):
+    from app.utils import index_store
+
+    terms = ["가", "나", "다"]
+    blob, offsets = encode_strings(terms)
+    # 모든 용어의 해시가 같아도 문자열 비교로 정확한 행을 찾음
+    monkeypatch.setattr(index_store, "term_hash", lambda term: 0)
+    table = TermTable(StringTable(blob, offsets), np.zeros(3, dtype=np.uint64), np.array([2, 0, 1]))
+    assert [table.get(term) for term in terms + ["라"]] == [0, 1, 2, None]